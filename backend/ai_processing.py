@@ -2,46 +2,59 @@
 
 import os
 import re
-from collections import Counter
-import numpy as np
-import google.generativeai as genai
 from dotenv import load_dotenv
-import pdfplumber # Import pdfplumber
-import docx # Import python-docx
 from typing import List
+import analysis_cache
+import fingerprint
+import resume_text_store
+import parse_worker
+import llm_client
+import screening
 
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini API
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY environment variable is not set.")
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel('gemini-pro')
+# The Gemini client and the resume parsers are initialized on first use (see
+# llm_client.get_client and parse_worker), so importing this module stays cheap
+# and doesn't require GEMINI_API_KEY.
+
+def _model_name() -> str:
+    """Name of the model behind the shared LLM client (part of analysis cache keys)."""
+    return llm_client.get_client().model_name
+
+# Bump whenever the resume analysis prompt or its parsing changes,
+# so cached results from the old prompt are no longer reused.
+RESUME_PROMPT_VERSION = "resume-v1"
+RESUME_BATCH_PROMPT_VERSION = "resume-batch-v1"
+
+# Batched analysis: several compacted resumes share one prompt within a token budget
+BATCH_TOKEN_BUDGET = int(os.getenv("AI_BATCH_TOKEN_BUDGET", "24000"))
+BATCH_MAX_RESUMES = int(os.getenv("AI_BATCH_MAX_RESUMES", "8"))
+BATCH_RESUME_MAX_CHARS = int(os.getenv("AI_BATCH_RESUME_MAX_CHARS", "8000"))
 
 def parse_resume(resume_path: str) -> str:
-    """Parses PDF or DOCX resume and extracts text content."""
+    """Parses PDF or DOCX resume and extracts text content (in the parse worker pool)."""
     print(f"Parsing resume: {resume_path}")
-    text = ""
-    try:
-        if resume_path.lower().endswith('.pdf'):
-            with pdfplumber.open(resume_path) as pdf:
-                for page in pdf.pages:
-                    text += page.extract_text() or ""
-        elif resume_path.lower().endswith(('.doc', '.docx')):
-            doc = docx.Document(resume_path)
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + '\n'
-        else:
-            # Handle other formats or raise an error
-            print(f"Unsupported file format: {resume_path}")
-            return "Unsupported file format"
-    except Exception as e:
-        print(f"Error parsing {resume_path}: {str(e)}")
-        return f"Error parsing resume: {str(e)}"
-    
-    return text
+    return parse_worker.parse_resume(resume_path)
+
+def is_parse_failure(resume_text: str) -> bool:
+    """True when parse_resume returned an error message instead of resume text."""
+    return resume_text.startswith("Error parsing resume") or resume_text.startswith("Unsupported file format")
+
+def load_resume_text(resume_path: str, resume_hash: str = None) -> str:
+    """
+    Returns the text of a resume, extracting it only the first time a given
+    file content is seen. Later calls (any scoring path) reuse the stored text.
+    """
+    resume_hash = resume_hash or fingerprint.sha256_file(resume_path)
+    stored = resume_text_store.lookup(resume_hash)
+    if stored is not None:
+        return stored
+
+    resume_text = parse_resume(resume_path)
+    if not is_parse_failure(resume_text):
+        resume_text_store.save(resume_hash, resume_text)
+    return resume_text
 
 def simple_text_similarity(text1: str, text2: str) -> float:
     """Calculate similarity between two texts using basic word overlap."""
@@ -58,37 +71,20 @@ def simple_text_similarity(text1: str, text2: str) -> float:
 def compare_resume_to_job(job_requirements: str, resume_text: str) -> float:
     """Compares resume text to job requirements using simple text similarity."""
     print("Comparing resume to job requirements (simple similarity)...")
-    
-    # Split requirements into individual skills/requirements (simple comma split)
-    requirements = [req.strip() for req in job_requirements.split(',') if req.strip()]
-    
-    if not requirements:
-        return 0.0 # No requirements to compare
-        
-    # Calculate average similarity of each requirement against the whole resume text
-    similarities = [simple_text_similarity(req, resume_text) for req in requirements]
-    
-    return np.mean(similarities)
 
-def flag_suspicious_resume(resume_text: str) -> bool:
-    """Flags possible fake or suspicious resumes (basic checks)."""
-    print("Checking for suspicious resume...")
-    
-    # Simple checks
-    if len(resume_text) < 100:  # Too short (arbitrary threshold)
-        return True
-    
-    # Check for unusually high frequency of any single word (might indicate copy-paste or junk)
-    words = re.findall(r'\b\w+\b', resume_text.lower())
-    if not words: return False # Avoid division by zero
-    word_counts = Counter(words)
-    most_common_word_count = word_counts.most_common(1)[0][1] if word_counts else 0
-    
-    if most_common_word_count > len(words) * 0.15: # If most common word is more than 15% of total words
-         print(f"Flagged: Most common word count ({most_common_word_count}) > 15% of total words ({len(words)})")
-         return True
+    # Average similarity of each comma separated requirement against the whole resume text,
+    # computed by the vectorized matcher (resume tokenized once for all requirements).
+    # Imported on first use: it pulls in numpy.
+    import requirement_matcher
+    return float(requirement_matcher.get_matcher(job_requirements).score([resume_text])[0])
+
+def flag_suspicious_resume(resume_text: str, job_requirements: str = "", resume_path: str = None) -> bool:
+    """Flags possible fake or suspicious resumes with the local screening checks (see screening.py)."""
+    return screening.screen(resume_text, job_requirements, resume_path).flagged
 
-    return False
+def is_analysis_failure(analysis: str) -> bool:
+    """True when analyze_resume hit an unexpected error (e.g. the LLM call failed) and may succeed on retry."""
+    return analysis.startswith("Critical error during analysis")
 
 def determine_ai_status(score: float, is_flagged: bool) -> str:
     """Determines candidate AI status based on score and flags."""
@@ -101,7 +97,7 @@ def determine_ai_status(score: float, is_flagged: bool) -> str:
     else:
         return "Needs Review"
 
-def analyze_resume(resume_path: str, job_requirements: str) -> tuple[float, str]:
+def analyze_resume(resume_path: str, job_requirements: str, resume_hash: str = None) -> tuple[float, str]:
     """
     Analyzes a resume based on job requirements using Gemini AI.
     Returns a tuple of (relevance_score, detailed_analysis).
@@ -109,10 +105,20 @@ def analyze_resume(resume_path: str, job_requirements: str) -> tuple[float, str]
     """
     print(f"Analyzing resume {os.path.basename(resume_path)} against requirements: {job_requirements}")
     try:
-        # Parse resume content
-        resume_content = parse_resume(resume_path)
+        # Reuse a previous analysis of the same resume bytes against the same requirements
+        resume_hash = resume_hash or fingerprint.sha256_file(resume_path)
+        cache_key = fingerprint.analysis_key(
+            resume_hash, job_requirements, RESUME_PROMPT_VERSION, _model_name()
+        )
+        cached = analysis_cache.get(cache_key)
+        if cached is not None:
+            print(f"Analysis cache hit for {os.path.basename(resume_path)}")
+            return cached
 
-        if resume_content.startswith("Error parsing resume") or resume_content.startswith("Unsupported file format"):
+        # Parse resume content (or reuse text extracted earlier)
+        resume_content = load_resume_text(resume_path, resume_hash)
+
+        if is_parse_failure(resume_content):
              # If parsing failed, return a low score and the error message
              return 0.0, resume_content
         
@@ -135,9 +141,8 @@ def analyze_resume(resume_path: str, job_requirements: str) -> tuple[float, str]
         DETAILED ANALYSIS: [Your detailed analysis here]
         """
         
-        # Get AI response from Gemini
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
+        # Get AI response from Gemini (shared client: rate limited, retried, circuit broken)
+        response_text = llm_client.get_client().generate_sync(prompt).strip()
         print("Gemini Response:")
         print(response_text)
 
@@ -148,17 +153,129 @@ def analyze_resume(resume_path: str, job_requirements: str) -> tuple[float, str]
         score = float(score_match.group(1)) if score_match else 0.0
         analysis = analysis_match.group(1).strip() if analysis_match else "AI analysis could not be extracted from response."
 
-        # Basic check for suspicious content (optional, can be integrated differently)
-        # is_flagged = flag_suspicious_resume(resume_content)
-        # if is_flagged:
-        #     analysis = "[FLAGGED AS POTENTIALLY SUSPICIOUS] " + analysis
-        
+        # Only cache well-formed responses so a bad reply gets retried next time
+        if score_match:
+            analysis_cache.put(cache_key, score, analysis, _model_name(), RESUME_PROMPT_VERSION)
+
         return score, analysis
     
     except Exception as e:
         print(f"Critical error during resume analysis: {str(e)}")
         return 0.0, f"Critical error during analysis: {str(e)}"
 
+def compact_resume_text(resume_text: str, max_chars: int = BATCH_RESUME_MAX_CHARS) -> str:
+    """Collapses whitespace and truncates a resume so several fit in one prompt."""
+    return re.sub(r"\s+", " ", resume_text).strip()[:max_chars]
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token) used for batch packing."""
+    return len(text) // 4 + 1
+
+def plan_resume_batches(resume_texts: List[str], token_budget: int = BATCH_TOKEN_BUDGET,
+                        max_batch_size: int = BATCH_MAX_RESUMES) -> List[List[int]]:
+    """
+    Greedily packs resumes (by index) into batches whose compacted text stays
+    within the token budget. A resume larger than the budget gets its own batch.
+    """
+    batches, current, current_tokens = [], [], 0
+    for index, resume_text in enumerate(resume_texts):
+        tokens = estimate_tokens(compact_resume_text(resume_text))
+        if current and (current_tokens + tokens > token_budget or len(current) >= max_batch_size):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+def build_batch_prompt(job_requirements: str, resumes: List[tuple[str, str]]) -> str:
+    """Prompt asking for one scored block per (resume id, resume text)."""
+    sections = "\n\n".join(
+        f"=== RESUME {resume_id} ===\n{compact_resume_text(resume_text)}" for resume_id, resume_text in resumes
+    )
+    return f"""
+        You are an AI assistant specialized in analyzing resumes for job applications.
+        Your task is to evaluate EACH of the following resumes independently based on the provided job requirements.
+
+        Job Requirements: {job_requirements}
+
+        {sections}
+
+        For every resume, provide:
+        1. A RELEVANCE SCORE from 0 to 100, where 100 is a perfect match.
+        2. A DETAILED ANALYSIS explaining why the score was given, highlighting strengths related to requirements and noting any gaps or areas for improvement.
+
+        Format your response strictly as follows, with one block per resume, in the same order:
+        RESUME ID: [id]
+        RELEVANCE SCORE: [number]
+        DETAILED ANALYSIS: [Your detailed analysis here]
+        """
+
+def parse_batch_response(response_text: str, expected_ids: List[str]) -> dict:
+    """
+    Splits a batched reply into {resume id: (score, analysis)}. Blocks that are
+    missing, duplicated, unknown or without a score are left out, so the caller
+    can fall back to single-resume analysis for them.
+    """
+    results = {}
+    blocks = re.split(r"^\s*RESUME ID:\s*", response_text, flags=re.IGNORECASE | re.MULTILINE)
+    for block in blocks[1:]:
+        id_match = re.match(r"\[?(\w+)\]?", block)
+        score_match = re.search(r"RELEVANCE SCORE:\s*(\d+\.?\d*)", block, re.IGNORECASE)
+        analysis_match = re.search(r"DETAILED ANALYSIS:\s*(.*)", block, re.IGNORECASE | re.DOTALL)
+        if not id_match or not score_match or not analysis_match:
+            continue
+        resume_id = id_match.group(1)
+        if resume_id not in expected_ids or resume_id in results:
+            continue
+        results[resume_id] = (float(score_match.group(1)), analysis_match.group(1).strip())
+    return results
+
+def analyze_resume_batch(resumes: List[tuple[str, str, str]], job_requirements: str) -> List[tuple[float, str]]:
+    """
+    Analyzes several resumes with a single Gemini request.
+    `resumes` holds (resume_path, resume_hash, resume_text) tuples; results come back in
+    the same order. Cached resumes and parse failures are answered without the LLM, and
+    any resume the batched reply doesn't cover cleanly is re-analyzed on its own.
+    """
+    results: List = [None] * len(resumes)
+    pending = [] # (position, resume id in prompt, cache key)
+
+    for position, (resume_path, resume_hash, resume_text) in enumerate(resumes):
+        if is_parse_failure(resume_text):
+            results[position] = (0.0, resume_text)
+            continue
+        # A single-resume analysis is at least as good as a batched one, so reuse either
+        single_key = fingerprint.analysis_key(resume_hash, job_requirements, RESUME_PROMPT_VERSION, _model_name())
+        cache_key = fingerprint.analysis_key(resume_hash, job_requirements, RESUME_BATCH_PROMPT_VERSION, _model_name())
+        cached = analysis_cache.get(single_key) or analysis_cache.get(cache_key)
+        if cached is not None:
+            results[position] = cached
+            continue
+        pending.append((position, f"R{len(pending) + 1}", cache_key))
+
+    if pending:
+        print(f"Analyzing {len(pending)} resumes in one batched request")
+        parsed = {}
+        try:
+            prompt = build_batch_prompt(job_requirements, [(resume_id, resumes[position][2]) for position, resume_id, _ in pending])
+            response_text = llm_client.get_client().generate_sync(prompt)
+            parsed = parse_batch_response(response_text.strip(), [resume_id for _, resume_id, _ in pending])
+        except Exception as e:
+            print(f"Batched resume analysis failed, falling back to single requests: {str(e)}")
+
+        for position, resume_id, cache_key in pending:
+            if resume_id in parsed:
+                score, analysis = parsed[resume_id]
+                analysis_cache.put(cache_key, score, analysis, _model_name(), RESUME_BATCH_PROMPT_VERSION)
+                results[position] = (score, analysis)
+            else:
+                resume_path, resume_hash, _ = resumes[position]
+                results[position] = analyze_resume(resume_path, job_requirements, resume_hash)
+
+    return results
+
 def analyze_interview_answer(answer: str) -> str:
     """
     Analyze an interview answer using Gemini AI.
@@ -180,8 +297,7 @@ def analyze_interview_answer(answer: str) -> str:
         """
         
         # Get AI response
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        return llm_client.get_client().generate_sync(prompt).strip()
     
     except Exception as e:
         print(f"Error in interview answer analysis: {str(e)}")
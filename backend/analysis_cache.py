@@ -0,0 +1,129 @@
+# analysis_cache.py
+
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from database import SessionLocal, AnalysisCacheEntry
+
+# Entries older than the TTL are treated as misses and dropped
+CACHE_TTL_SECONDS = int(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+# Least recently used entries are evicted above this size
+CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "10000"))
+# A hit only writes last_accessed_at (and the hits counted since) when the stored value
+# is older than this, so cache hits are reads; LRU order is exact to within this window
+ACCESS_WRITE_INTERVAL_SECONDS = int(os.getenv("ANALYSIS_CACHE_ACCESS_WRITE_INTERVAL_SECONDS", "300"))
+# The cache size is checked against CACHE_MAX_ENTRIES every this many stores, not on each
+EVICTION_CHECK_INTERVAL = int(os.getenv("ANALYSIS_CACHE_EVICTION_CHECK_INTERVAL", "100"))
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+_unwritten_hits: Dict[str, int] = {} # Per key, hits not yet added to hit_count
+_stores_until_eviction_check = 0 # The first store in a process checks
+
+def _bump(counter: str, amount: int = 1):
+    with _stats_lock:
+        _stats[counter] += amount
+
+def get(key: str) -> Optional[Tuple[float, str]]:
+    """Returns the cached (score, analysis) for a key, or None on a miss."""
+    with SessionLocal() as db:
+        entry = db.get(AnalysisCacheEntry, key)
+        if entry is None:
+            _bump("misses")
+            return None
+
+        now = datetime.utcnow()
+        if entry.created_at < now - timedelta(seconds=CACHE_TTL_SECONDS):
+            db.delete(entry)
+            db.commit()
+            _bump("expired")
+            _bump("misses")
+            return None
+
+        result = (entry.score, entry.analysis)
+        with _stats_lock:
+            hits = _unwritten_hits.pop(key, 0) + 1
+            stale = entry.last_accessed_at is None or \
+                entry.last_accessed_at < now - timedelta(seconds=ACCESS_WRITE_INTERVAL_SECONDS)
+            if not stale:
+                _unwritten_hits[key] = hits
+        if stale:
+            entry.last_accessed_at = now
+            entry.hit_count = (entry.hit_count or 0) + hits
+            db.commit()
+
+    _bump("hits")
+    return result
+
+def _eviction_check_due() -> bool:
+    global _stores_until_eviction_check
+    with _stats_lock:
+        _stores_until_eviction_check -= 1
+        if _stores_until_eviction_check > 0:
+            return False
+        _stores_until_eviction_check = EVICTION_CHECK_INTERVAL
+        return True
+
+def put(key: str, score: float, analysis: str, model_name: str, prompt_version: str):
+    """
+    Stores an analysis result. Every EVICTION_CHECK_INTERVAL stores, evicts the least
+    recently used entries above CACHE_MAX_ENTRIES.
+    """
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        db.merge(AnalysisCacheEntry(
+            key=key,
+            score=score,
+            analysis=analysis,
+            model_name=model_name,
+            prompt_version=prompt_version,
+            created_at=now,
+            last_accessed_at=now,
+            hit_count=0
+        ))
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another worker stored the same key concurrently; its result is just as good
+            db.rollback()
+            return
+
+        overflow = 0
+        if _eviction_check_due():
+            overflow = db.query(AnalysisCacheEntry).count() - CACHE_MAX_ENTRIES
+        if overflow > 0:
+            stale_keys = [
+                row.key for row in db.query(AnalysisCacheEntry.key)
+                .order_by(AnalysisCacheEntry.last_accessed_at.asc())
+                .limit(overflow)
+            ]
+            db.query(AnalysisCacheEntry).filter(
+                AnalysisCacheEntry.key.in_(stale_keys)
+            ).delete(synchronize_session=False)
+            db.commit()
+            _bump("evictions", len(stale_keys))
+
+    _bump("stores")
+
+def stats() -> Dict[str, float]:
+    """Returns the in-process hit/miss counters plus the current cache size."""
+    with _stats_lock:
+        snapshot = dict(_stats)
+    lookups = snapshot["hits"] + snapshot["misses"]
+    snapshot["hit_rate"] = snapshot["hits"] / lookups if lookups else 0.0
+    with SessionLocal() as db:
+        snapshot["entries"] = db.query(AnalysisCacheEntry).count()
+    return snapshot
+
+def clear() -> int:
+    """Removes every cached analysis. Returns the number of entries deleted."""
+    with SessionLocal() as db:
+        deleted = db.query(AnalysisCacheEntry).delete()
+        db.commit()
+    with _stats_lock:
+        _unwritten_hits.clear()
+    return deleted
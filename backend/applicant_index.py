@@ -0,0 +1,215 @@
+# applicant_index.py
+#
+# Duplicate applicant index across all jobs. Every application adds keys to
+# applicant_keys, in the same transaction as the candidate write:
+#   email:<normalized email>, phone:<last 9 digits>   when the candidate is created
+#   lsh:<band>:<hash>                                 once the resume is parsed
+# The LSH keys are the bands of a MinHash signature of the resume's word
+# 3-shingles, so resumes with a high Jaccard similarity share at least one key.
+# "Is this a duplicate?" is one primary-key IN lookup plus a signature
+# comparison for the resume matches. Near-identical resumes analyzed against
+# the same requirements reuse the existing score instead of calling the LLM.
+# Existing candidates are indexed with:
+#
+#   python applicant_index.py --rebuild
+
+import argparse
+import hashlib
+import os
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from database import ApplicantKey, ApplicantSignature, Candidate, Job, ParsedResume, SessionLocal
+import fingerprint
+
+# 128 hash functions in 16 bands of 8: pairs above ~0.7 Jaccard almost always share a band
+NUM_PERM = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+# Estimated Jaccard similarity above which two resumes count as duplicates / share a score
+RESUME_DUPLICATE_SIMILARITY = float(os.getenv("RESUME_DUPLICATE_SIMILARITY", "0.8"))
+SCORE_REUSE_SIMILARITY = float(os.getenv("SCORE_REUSE_SIMILARITY", "0.95"))
+
+_PRIME = 4294967311 # Smallest prime above 2^32
+_permutations = None
+
+# --- Keys ---
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    """Lowercased, without +tags, and without dots for Gmail addresses."""
+    if not email or "@" not in email:
+        return None
+    local, _, domain = email.strip().lower().rpartition("@")
+    local = local.split("+", 1)[0]
+    if domain in ("gmail.com", "googlemail.com"):
+        local, domain = local.replace(".", ""), "gmail.com"
+    return f"{local}@{domain}" if local else None
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """The last 9 digits, so country code and trunk prefix variants match."""
+    digits = re.sub(r"\D", "", phone or "")
+    return digits[-9:] if len(digits) >= 7 else None
+
+def identity_keys(email: Optional[str], phone: Optional[str]) -> List[str]:
+    keys = []
+    if normalize_email(email):
+        keys.append(f"email:{normalize_email(email)}")
+    if normalize_phone(phone):
+        keys.append(f"phone:{normalize_phone(phone)}")
+    return keys
+
+# --- MinHash / LSH ---
+
+def _hash_functions():
+    global _permutations
+    if _permutations is None:
+        import numpy as np # Imported on first use, like the other numpy-based modules
+        generator = np.random.RandomState(1) # Fixed: stored signatures must stay comparable
+        _permutations = (
+            generator.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64),
+            generator.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64),
+        )
+    return _permutations
+
+def minhash(text: str) -> List[int]:
+    """MinHash signature (NUM_PERM 32-bit values) of the text's word 3-shingles."""
+    import numpy as np
+    words = re.findall(r'\b\w+\b', text.lower())
+    shingles = {" ".join(words[i:i + 3]) for i in range(max(len(words) - 2, 1))}
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "big") for s in shingles],
+        dtype=np.uint64
+    )
+    a, b = _hash_functions()
+    # (a*h + b) mod p stays below 2^64 for 32-bit a, b and h
+    permuted = (np.outer(a, hashes) + b[:, None]) % np.uint64(_PRIME)
+    return [int(value) for value in (permuted & np.uint64(0xFFFFFFFF)).min(axis=1)]
+
+def band_keys(signature: List[int]) -> List[str]:
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(",".join(map(str, rows)).encode("ascii"), digest_size=8).hexdigest()
+        keys.append(f"lsh:{band}:{digest}")
+    return keys
+
+def encode_signature(signature: List[int]) -> str:
+    return "".join(f"{value:08x}" for value in signature)
+
+def decode_signature(encoded: str) -> List[int]:
+    return [int(encoded[i:i + 8], 16) for i in range(0, len(encoded), 8)]
+
+def similarity(a: List[int], b: List[int]) -> float:
+    """Estimated Jaccard similarity of the two resumes."""
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a) if a and len(a) == len(b) else 0.0
+
+# --- Index updates (not committed: part of the caller's transaction) ---
+
+def index_identity(db: Session, candidates: List[Dict]):
+    """Adds email/phone keys for {"id", "email", "phone"} rows, with one executemany insert."""
+    rows = [{"key": key, "candidate_id": candidate["id"]}
+            for candidate in candidates for key in identity_keys(candidate.get("email"), candidate.get("phone"))]
+    if rows:
+        db.execute(insert(ApplicantKey), rows)
+
+def index_resume(db: Session, candidate: Candidate, resume_text: str, signature: Optional[List[int]] = None) -> List[int]:
+    """(Re)indexes the candidate's resume text (`signature` if already computed). Returns its signature."""
+    signature = signature or minhash(resume_text)
+    db.execute(delete(ApplicantKey).where(ApplicantKey.candidate_id == candidate.id, ApplicantKey.key.like("lsh:%")))
+    db.execute(insert(ApplicantKey), [{"key": key, "candidate_id": candidate.id} for key in band_keys(signature)])
+    db.merge(ApplicantSignature(candidate_id=candidate.id, minhash=encode_signature(signature)))
+    return signature
+
+# --- Lookups ---
+
+def find_duplicates(db: Session, email: Optional[str] = None, phone: Optional[str] = None,
+                    signature: Optional[List[int]] = None, exclude_id: Optional[str] = None) -> List[Dict]:
+    """
+    Earlier applications (any job) by the same email or phone, or with a resume
+    at least RESUME_DUPLICATE_SIMILARITY similar to `signature`. Returns
+    [{"candidate_id", "matched_on": [...], "similarity"}], most similar first.
+    """
+    keys = identity_keys(email, phone) + (band_keys(signature) if signature else [])
+    if not keys:
+        return []
+    query = db.query(ApplicantKey.key, ApplicantKey.candidate_id).filter(ApplicantKey.key.in_(keys))
+    if exclude_id is not None:
+        query = query.filter(ApplicantKey.candidate_id != exclude_id)
+
+    matches: Dict[str, set] = {}
+    for key, candidate_id in query:
+        kind = key.split(":", 1)[0]
+        matches.setdefault(candidate_id, set()).add("resume" if kind == "lsh" else kind)
+
+    # Sharing a band only makes a resume a candidate pair; confirm with the full signatures
+    similarities: Dict[str, float] = {}
+    resume_ids = [candidate_id for candidate_id, kinds in matches.items() if "resume" in kinds]
+    if resume_ids:
+        for row in db.query(ApplicantSignature).filter(ApplicantSignature.candidate_id.in_(resume_ids)):
+            similarities[row.candidate_id] = similarity(signature, decode_signature(row.minhash))
+    results = []
+    for candidate_id, kinds in matches.items():
+        if "resume" in kinds and similarities.get(candidate_id, 0.0) < RESUME_DUPLICATE_SIMILARITY:
+            kinds.discard("resume")
+        if kinds:
+            results.append({
+                "candidate_id": candidate_id,
+                "matched_on": sorted(kinds),
+                "similarity": round(similarities[candidate_id], 3) if candidate_id in similarities else None,
+            })
+    return sorted(results, key=lambda r: (-(r["similarity"] or 0), r["candidate_id"]))
+
+def duplicates_of(db: Session, candidate: Candidate) -> List[Dict]:
+    """Duplicates of an indexed candidate, by their stored identity keys and resume signature."""
+    stored = db.get(ApplicantSignature, candidate.id)
+    signature = decode_signature(stored.minhash) if stored else None
+    return find_duplicates(db, candidate.email, candidate.phone, signature, exclude_id=candidate.id)
+
+def reusable_analysis(db: Session, candidate: Candidate, signature: List[int]) -> Optional[Candidate]:
+    """
+    A scored candidate whose resume is near-identical (SCORE_REUSE_SIMILARITY) and
+    who was analyzed against the same requirements, so their score applies as is.
+    """
+    duplicates = [d for d in find_duplicates(db, signature=signature, exclude_id=candidate.id)
+                  if (d["similarity"] or 0) >= SCORE_REUSE_SIMILARITY]
+    if not duplicates:
+        return None
+    requirements = fingerprint.normalize_requirements(candidate.job.requirements or "")
+    scored = (db.query(Candidate).join(Job, Job.id == Candidate.job_id)
+              .filter(Candidate.id.in_([d["candidate_id"] for d in duplicates]), Candidate.ai_score.isnot(None),
+                      Candidate.ai_status.notin_(["Pending", "Flagged", "AI Processing Failed"]))
+              .order_by(Candidate.created_at.desc()))
+    for other in scored:
+        if fingerprint.normalize_requirements(other.job.requirements or "") == requirements:
+            return other
+    return None
+
+def rebuild(db: Session) -> Dict[str, int]:
+    """Re-indexes every candidate: identity keys, and resumes whose text was already extracted. Not committed."""
+    db.execute(delete(ApplicantKey))
+    db.execute(delete(ApplicantSignature))
+    counts = {"candidates": 0, "resumes": 0}
+    for candidate in db.query(Candidate):
+        index_identity(db, [{"id": candidate.id, "email": candidate.email, "phone": candidate.phone}])
+        counts["candidates"] += 1
+        parsed = db.get(ParsedResume, candidate.resume_hash) if candidate.resume_hash else None
+        if parsed is not None and parsed.text:
+            index_resume(db, candidate, parsed.text)
+            counts["resumes"] += 1
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or rebuild the duplicate applicant index.")
+    parser.add_argument("--rebuild", action="store_true", help="Re-index every candidate and stored resume text")
+    parser.add_argument("--candidate", help="List the duplicates of this candidate")
+    args = parser.parse_args()
+    with SessionLocal() as db:
+        if args.rebuild:
+            print(rebuild(db))
+            db.commit()
+        if args.candidate:
+            candidate = db.get(Candidate, args.candidate)
+            print(duplicates_of(db, candidate) if candidate else "No such candidate")
@@ -0,0 +1,56 @@
+# backfill_resume_text.py
+#
+# Extracts and stores text for resumes that were uploaded before the parsed
+# resume store existed, and links candidates to their file hash.
+# Run from the backend directory:  python backfill_resume_text.py [--dry-run]
+
+import argparse
+import os
+
+from database import SessionLocal, Candidate
+import ai_processing
+import fingerprint
+import resume_text_store
+
+def backfill(dry_run: bool = False) -> dict:
+    summary = {"candidates": 0, "linked": 0, "parsed": 0, "already_parsed": 0, "missing_file": 0, "failed": 0}
+
+    with SessionLocal() as db:
+        candidates = db.query(Candidate).filter(Candidate.resume_path.isnot(None)).all()
+        for candidate in candidates:
+            summary["candidates"] += 1
+            if not os.path.exists(candidate.resume_path):
+                summary["missing_file"] += 1
+                continue
+
+            resume_hash = fingerprint.sha256_file(candidate.resume_path)
+            if candidate.resume_hash != resume_hash:
+                candidate.resume_hash = resume_hash
+                summary["linked"] += 1
+
+            if resume_text_store.lookup(resume_hash) is not None:
+                summary["already_parsed"] += 1
+                continue
+            if dry_run:
+                summary["parsed"] += 1
+                continue
+
+            resume_text = ai_processing.parse_resume(candidate.resume_path)
+            if ai_processing.is_parse_failure(resume_text):
+                summary["failed"] += 1
+                continue
+            resume_text_store.save(resume_hash, resume_text)
+            summary["parsed"] += 1
+
+        if dry_run:
+            db.rollback()
+        else:
+            db.commit()
+
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill extracted resume text for existing candidates.")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be parsed without writing anything")
+    args = parser.parse_args()
+    print(backfill(dry_run=args.dry_run))
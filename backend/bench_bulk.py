@@ -0,0 +1,55 @@
+# bench_bulk.py
+#
+# Compares the per-row crud functions with the bulk ones on a scratch SQLite
+# database (same engine settings as the app). Run from the backend directory:
+#
+#   python bench_bulk.py [--rows 5000]
+
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, Job, make_engine
+import crud
+import schemas
+
+def timed(label: str, rows: int, fn) -> float:
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:28} {rows} rows in {elapsed:7.2f}s  ({rows / elapsed:9.1f} rows/s)")
+    return elapsed
+
+def run(rows: int):
+    engine = make_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-bulk-'), 'bench.db')}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    with Session() as db:
+        job = Job(title="Bench", description="", requirements="", location="", salary_range="")
+        db.add(job)
+        db.commit()
+        candidates = [
+            schemas.CandidateCreate(name=f"c{i}", email=f"c{i}@example.com", phone="0", job_id=job.id)
+            for i in range(rows)
+        ]
+
+        per_row = timed("create_candidate (per row)", rows, lambda: [crud.create_candidate(db, c) for c in candidates])
+        bulk = timed("bulk_create_candidates", rows, lambda: crud.bulk_create_candidates(db, candidates))
+        print(f"insert speedup: {per_row / bulk:.1f}x")
+
+        ids = [row.id for row in db.query(crud.Candidate.id).filter(crud.Candidate.job_id == job.id).limit(rows)]
+        per_row = timed("update_candidate_status", rows, lambda: [crud.update_candidate_status(db, i, "rejected") for i in ids])
+        updates = [schemas.CandidateStatusUpdate(candidate_id=i, status="screening") for i in ids]
+        bulk = timed("bulk_update_candidate_status", rows, lambda: crud.bulk_update_candidate_status(db, updates))
+        print(f"status update speedup: {per_row / bulk:.1f}x")
+    engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-row vs bulk candidate writes.")
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.rows)
@@ -0,0 +1,96 @@
+# bench_sqlite.py
+#
+# Local concurrency benchmark: writer threads insert candidates (one commit per
+# application, like the apply endpoint) while reader threads run the dashboard
+# query. Compares SQLite's defaults with the pragmas from database.py.
+# Run from the backend directory:
+#
+#   python bench_sqlite.py [--writers 4] [--readers 8] [--seconds 10] [--seed 5000]
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, Job, Candidate, make_engine, SQLITE_PRAGMAS
+
+# What SQLite does without any tuning
+DEFAULT_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL"}
+
+def run_config(label: str, pragmas: dict, writers: int, readers: int, seconds: float, seed: int) -> dict:
+    directory = tempfile.mkdtemp(prefix="bench-sqlite-")
+    engine = make_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}", pragmas=pragmas)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    with Session() as db:
+        job = Job(title="Bench", description="", requirements="python, sql", location="", salary_range="")
+        db.add(job)
+        db.commit()
+        job_id = job.id
+        db.add_all(
+            Candidate(name=f"seed{i}", email=f"seed{i}@example.com", phone="0", job_id=job_id, ai_score=random.random() * 100)
+            for i in range(seed)
+        )
+        db.commit()
+
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+    counts_lock = threading.Lock()
+    stop_at = time.monotonic() + seconds
+
+    def count(key: str):
+        with counts_lock:
+            counts[key] += 1
+
+    def writer(worker: int):
+        i = 0
+        while time.monotonic() < stop_at:
+            try:
+                with Session() as db:
+                    db.add(Candidate(name=f"w{worker}-{i}", email=f"w{worker}-{i}@example.com", phone="0",
+                                     job_id=job_id, ai_score=random.random() * 100))
+                    db.commit()
+                count("writes")
+            except OperationalError:
+                count("errors") # "database is locked"
+            i += 1
+
+    def reader():
+        while time.monotonic() < stop_at:
+            try:
+                with Session() as db:
+                    db.query(Candidate).filter(Candidate.job_id == job_id).order_by(Candidate.ai_score.desc()).limit(50).all()
+                count("reads")
+            except OperationalError:
+                count("errors")
+
+    threads = [threading.Thread(target=writer, args=(w,)) for w in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    return {
+        "config": label,
+        "writes/s": round(counts["writes"] / seconds, 1),
+        "reads/s": round(counts["reads"] / seconds, 1),
+        "errors": counts["errors"],
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare SQLite defaults with the tuned pragmas under concurrent load.")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=5000, help="Candidates inserted before the run")
+    args = parser.parse_args()
+
+    for label, pragmas in (("defaults", DEFAULT_PRAGMAS), ("tuned", SQLITE_PRAGMAS)):
+        print(run_config(label, pragmas, args.writers, args.readers, args.seconds, args.seed))
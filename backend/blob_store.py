@@ -0,0 +1,125 @@
+# blob_store.py
+
+import argparse
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, NamedTuple
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import ResumeBlob, Candidate, SessionLocal
+import uploads
+
+# Resumes are stored once per distinct content: <BLOB_DIR>/ab/cd/<sha256><ext>
+BLOB_DIR = Path(os.getenv("RESUME_BLOB_DIR", "backend/static/blobs"))
+INCOMING_DIR = BLOB_DIR / "incoming"
+# Unreferenced blobs (and incoming files) younger than this may belong to an upload
+# whose candidate is still being created, so the orphan sweep leaves them alone
+ORPHAN_GRACE_SECONDS = float(os.getenv("RESUME_BLOB_ORPHAN_GRACE_SECONDS", "3600"))
+
+class StoredBlob(NamedTuple):
+    path: Path
+    sha256: str
+    size: int
+    filename: str
+
+def blob_path(sha256: str, extension: str) -> Path:
+    """Sharded location of a blob; two directory levels keep directories small."""
+    return BLOB_DIR / sha256[:2] / sha256[2:4] / f"{sha256}{extension}"
+
+def ingest_file(db: Session, temp_path: Path, sha256: str, size: int, extension: str) -> Path:
+    """
+    Moves a fully written file into the blob store, or drops it if the same content
+    is already stored. Returns the blob path. Reference counts are not changed here.
+    """
+    blob = db.get(ResumeBlob, sha256)
+    if blob is not None and os.path.exists(blob.path):
+        os.remove(temp_path)
+        # Restarts the grace period, so the orphan sweep can't take a blob being reused
+        blob.created_at = datetime.utcnow()
+        db.commit()
+        return Path(blob.path)
+
+    target = blob_path(sha256, extension)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(temp_path, target)
+
+    if blob is None:
+        db.add(ResumeBlob(sha256=sha256, path=str(target), size=size, ref_count=0))
+        try:
+            db.commit()
+        except IntegrityError:
+            # Same content stored concurrently; the file we moved is identical
+            db.rollback()
+    else:
+        # Row survived but the file was lost; it has been restored above
+        blob.path = str(target)
+        db.commit()
+    return target
+
+async def save_upload(db: Session, upload: UploadFile) -> StoredBlob:
+    """Streams an upload into the blob store, deduplicating by content hash."""
+    filename = uploads.safe_filename(upload.filename)
+    extension = os.path.splitext(filename)[1].lower()
+    stored = await uploads.save_upload(upload, INCOMING_DIR, f"{uuid.uuid4().hex}{extension}")
+    # The DB lookup and the file move block, so they run in the thread pool
+    path = await run_in_threadpool(ingest_file, db, stored.path, stored.sha256, stored.size, extension)
+    return StoredBlob(path, stored.sha256, stored.size, filename)
+
+def add_reference(db: Session, sha256: str):
+    """Counts one more candidate using a blob (committed by the caller)."""
+    db.query(ResumeBlob).filter(ResumeBlob.sha256 == sha256).update(
+        {ResumeBlob.ref_count: ResumeBlob.ref_count + 1}, synchronize_session=False
+    )
+
+def reconcile_ref_counts(db: Session, sweep_orphans: bool = True) -> Dict[str, int]:
+    """
+    Recomputes every blob's reference count from candidates, then (optionally)
+    deletes blobs no candidate uses and abandoned incoming files, once they are
+    older than ORPHAN_GRACE_SECONDS. Files are removed only after the rows are gone.
+    """
+    counts = dict(
+        db.query(Candidate.resume_hash, func.count(Candidate.id))
+        .filter(Candidate.resume_hash.isnot(None))
+        .group_by(Candidate.resume_hash)
+        .all()
+    )
+    summary = {"recounted": 0, "deleted": 0, "incoming_deleted": 0}
+    cutoff = datetime.utcnow() - timedelta(seconds=ORPHAN_GRACE_SECONDS)
+    orphans = []
+    for blob in db.query(ResumeBlob).all():
+        actual = counts.get(blob.sha256, 0)
+        if blob.ref_count != actual:
+            blob.ref_count = actual
+            summary["recounted"] += 1
+        if sweep_orphans and actual == 0 and blob.created_at is not None and blob.created_at < cutoff:
+            orphans.append(blob.path)
+            db.delete(blob)
+    db.commit()
+    if not sweep_orphans:
+        return summary
+
+    for path in orphans:
+        if os.path.exists(path):
+            os.remove(path)
+        summary["deleted"] += 1
+    if INCOMING_DIR.exists():
+        for entry in INCOMING_DIR.iterdir():
+            if entry.is_file() and entry.stat().st_mtime < time.time() - ORPHAN_GRACE_SECONDS:
+                entry.unlink()
+                summary["incoming_deleted"] += 1
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recount resume blob references and delete unused blobs.")
+    parser.add_argument("--no-sweep", action="store_true", help="Only recount, keep unreferenced blobs")
+    args = parser.parse_args()
+    with SessionLocal() as db:
+        print(reconcile_ref_counts(db, sweep_orphans=not args.no_sweep))
@@ -1,11 +1,26 @@
 # crud.py
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from database import Job, Candidate, InterviewAnswer
+from sqlalchemy.orm import Session, defer
+from sqlalchemy import tuple_, insert, update
+from sqlalchemy.exc import SQLAlchemyError
+from database import Job, Candidate, InterviewAnswer, InterviewAnalysis
 import schemas
+import applicant_index
+import blob_store
+import job_counters
+import interview_rollup
+import question_bank
+import version_stamps
+import events
+import base64
+import json
 import uuid
-from typing import List, Dict
+from collections import Counter
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+
+# Rows per transaction in the bulk operations
+BULK_BATCH_SIZE = 500
 
 def get_job(db: Session, job_id: str):
     return db.query(Job).filter(Job.id == job_id).first()
@@ -16,40 +31,338 @@ def get_jobs(db: Session, skip: int = 0, limit: int = 100):
 def create_job(db: Session, job: schemas.JobCreate):
     db_job = Job(**job.dict())
     db.add(db_job)
+    db.flush() # Assigns the id
+    version_stamps.bump(db, version_stamps.JOBS_SCOPE)
+    version_stamps.bump(db, version_stamps.job_scope(db_job.id))
     db.commit()
     db.refresh(db_job)
     return db_job
 
+def update_job(db: Session, job_id: str, job: schemas.JobUpdate):
+    db_job = get_job(db, job_id)
+    if db_job is None:
+        return None
+    changes = job.dict(exclude_unset=True)
+    for field, value in changes.items():
+        setattr(db_job, field, value)
+    version_stamps.bump(db, version_stamps.JOBS_SCOPE)
+    version_stamps.bump(db, version_stamps.job_scope(job_id))
+    db.commit()
+    db.refresh(db_job)
+    if changes.keys() & {"title", "description", "requirements"}:
+        # Its question bank is stale now; the next lookup generates a new version
+        question_bank.invalidate(job_id)
+    return db_job
+
 def get_candidate(db: Session, candidate_id: str):
     return db.query(Candidate).filter(Candidate.id == candidate_id).first()
 
 def get_candidates_for_job(db: Session, job_id: str):
     return db.query(Candidate).filter(Candidate.job_id == job_id).all()
 
-def create_candidate(db: Session, candidate: schemas.CandidateCreate):
-    db_candidate = Candidate(**candidate.dict())
+CANDIDATE_SORTS = ("ai_score", "created_at")
+
+def encode_cursor(sort: str, value, candidate_id: str) -> str:
+    """Opaque page cursor: the sort key and id of the last row returned."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps({"s": sort, "v": value, "id": candidate_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[object, str]:
+    """Returns (sort value, candidate id). Raises ValueError for a malformed or mismatched cursor."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        value, candidate_id = payload["v"], payload["id"]
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if payload.get("s") != sort:
+        raise ValueError("Cursor was issued for a different sort order")
+    if sort == "created_at":
+        value = datetime.fromisoformat(value)
+    return value, candidate_id
+
+def get_candidates_page(
+    db: Session,
+    job_id: str,
+    sort: str = "ai_score",
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    status: Optional[str] = None,
+    ai_status: Optional[str] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    include_analysis: bool = False
+) -> Tuple[List[Candidate], Optional[str]]:
+    """
+    One page of a job's candidates, newest/best first, using keyset pagination:
+    each page continues after the (sort value, id) of the previous page's last row,
+    so the cost doesn't grow with the page number. Unscored candidates come last
+    when sorting by score. Returns (candidates, cursor for the next page or None).
+    """
+    if sort not in CANDIDATE_SORTS:
+        raise ValueError(f"sort must be one of: {', '.join(CANDIDATE_SORTS)}")
+    sort_column = getattr(Candidate, sort)
+
+    query = db.query(Candidate).filter(Candidate.job_id == job_id)
+    if not include_analysis:
+        query = query.options(defer(Candidate.ai_analysis))
+    if status is not None:
+        query = query.filter(Candidate.status == status)
+    if ai_status is not None:
+        query = query.filter(Candidate.ai_status == ai_status)
+    if min_score is not None:
+        query = query.filter(Candidate.ai_score >= min_score)
+    if max_score is not None:
+        query = query.filter(Candidate.ai_score <= max_score)
+
+    after_value, after_id = decode_cursor(cursor, sort) if cursor else (None, None)
+    order = (sort_column.desc(), Candidate.id.desc())
+    rows: List[Candidate] = []
+
+    # Rows with a sort value, seeking past the cursor with a row-value comparison
+    if cursor is None or after_value is not None:
+        page = query.filter(sort_column.isnot(None))
+        if cursor is not None:
+            page = page.filter(tuple_(sort_column, Candidate.id) < tuple_(after_value, after_id))
+        rows = page.order_by(*order).limit(limit + 1).all()
+
+    # Then unscored rows (only possible for ai_score without a score range filter)
+    scoreless_allowed = sort == "ai_score" and min_score is None and max_score is None
+    if scoreless_allowed and len(rows) <= limit:
+        page = query.filter(sort_column.is_(None))
+        if cursor is not None and after_value is None:
+            page = page.filter(Candidate.id < after_id)
+        rows += page.order_by(Candidate.id.desc()).limit(limit + 1 - len(rows)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, getattr(last, sort), last.id)
+    return rows, next_cursor
+
+def create_candidate(db: Session, candidate: schemas.CandidateCreate, resume_path: str = None, resume_hash: str = None,
+                     ai_status: str = None, resume_filename: str = None):
+    db_candidate = Candidate(**candidate.dict(), resume_path=resume_path, resume_hash=resume_hash,
+                             ai_status=ai_status, resume_filename=resume_filename)
     db.add(db_candidate)
+    # Column defaults only apply on flush, but the counters need the initial buckets now
+    db_candidate.status = db_candidate.status or "new"
+    db_candidate.interview_stage = db_candidate.interview_stage or "Applied"
+    if resume_hash:
+        # Same transaction as the insert, so the blob reference count can't drift
+        blob_store.add_reference(db, resume_hash)
+    job_counters.record_insert(db, db_candidate)
+    version_stamps.bump(db, version_stamps.job_scope(db_candidate.job_id))
+    db.flush() # Fills id and created_at for the event
+    applicant_index.index_identity(db, [{"id": db_candidate.id, "email": db_candidate.email, "phone": db_candidate.phone}])
+    events.emit(db, db_candidate.job_id, "candidate_created",
+                candidate=schemas.CandidateSummary.model_validate(db_candidate).model_dump(mode="json"))
     db.commit()
     db.refresh(db_candidate)
     return db_candidate
 
+def get_candidate_duplicates(db: Session, candidate: Candidate) -> List[Dict]:
+    """Earlier applications by the same person or with a near-identical resume, with their candidate rows."""
+    return _with_candidates(db, applicant_index.duplicates_of(db, candidate))
+
+def find_duplicate_applicants(db: Session, email: Optional[str] = None, phone: Optional[str] = None) -> List[Dict]:
+    return _with_candidates(db, applicant_index.find_duplicates(db, email=email, phone=phone))
+
+def _with_candidates(db: Session, duplicates: List[Dict]) -> List[Dict]:
+    ids = [duplicate["candidate_id"] for duplicate in duplicates]
+    candidates = {c.id: c for c in db.query(Candidate).options(defer(Candidate.ai_analysis)).filter(Candidate.id.in_(ids))} if ids else {}
+    return [{**duplicate, "candidate": candidates[duplicate["candidate_id"]]}
+            for duplicate in duplicates if duplicate["candidate_id"] in candidates]
+
 def update_candidate_status(db: Session, candidate_id: str, status: str):
     candidate = get_candidate(db, candidate_id)
     if candidate:
+        job_counters.record_change(db, candidate.job_id, "status", candidate.status, status)
+        events.emit(db, candidate.job_id, "candidate_status_changed",
+                    candidate_id=candidate_id, status=status, previous_status=candidate.status)
         candidate.status = status
+        version_stamps.bump(db, version_stamps.job_scope(candidate.job_id))
         db.commit()
         db.refresh(candidate)
     return candidate
 
-def update_candidate_ai_analysis(db: Session, candidate_id: str, ai_score: float, ai_analysis: str):
+def update_candidate_ai_analysis(db: Session, candidate_id: str, ai_score: float, ai_analysis: str, ai_status: str = None):
     candidate = get_candidate(db, candidate_id)
     if candidate:
         candidate.ai_score = ai_score
         candidate.ai_analysis = ai_analysis
+        if ai_status is not None:
+            job_counters.record_change(db, candidate.job_id, "ai_status", candidate.ai_status, ai_status)
+            candidate.ai_status = ai_status
+        version_stamps.bump(db, version_stamps.job_scope(candidate.job_id))
+        events.emit(db, candidate.job_id, "candidate_scored",
+                    candidate_id=candidate_id, ai_score=ai_score, ai_status=candidate.ai_status)
+        db.commit()
+        db.refresh(candidate)
+    return candidate
+
+def update_candidate_interview_stage(db: Session, candidate_id: str, interview_stage: str):
+    candidate = get_candidate(db, candidate_id)
+    if candidate:
+        job_counters.record_change(db, candidate.job_id, "interview_stage", candidate.interview_stage, interview_stage)
+        events.emit(db, candidate.job_id, "candidate_stage_changed", candidate_id=candidate_id,
+                    interview_stage=interview_stage, previous_stage=candidate.interview_stage)
+        candidate.interview_stage = interview_stage
+        version_stamps.bump(db, version_stamps.job_scope(candidate.job_id))
         db.commit()
         db.refresh(candidate)
     return candidate
 
+# --- Bulk operations ---
+# One executemany statement and one commit per batch instead of a query, commit
+# and refresh per row. Each returns one outcome dict per input row, in order.
+
+def _outcome(index: int, candidate_id: Optional[str], outcome: str, detail: str = None) -> Dict:
+    return {"index": index, "candidate_id": candidate_id, "outcome": outcome, "detail": detail}
+
+def _emit_imported(db: Session, rows: List[Dict]):
+    by_job: Dict[str, List[str]] = {}
+    for row in rows:
+        by_job.setdefault(row["job_id"], []).append(row["id"])
+    for job_id, candidate_ids in by_job.items():
+        events.emit(db, job_id, "candidates_imported", candidate_ids=candidate_ids)
+
+def _count_insert(deltas: Counter, row: Dict):
+    deltas[(row["job_id"], "total", "")] += 1
+    for kind in job_counters.TRACKED_COLUMNS:
+        deltas[(row["job_id"], kind, job_counters.bucket_key(row.get(kind)))] += 1
+
+def bulk_create_candidates(db: Session, candidates: List[schemas.CandidateCreate], batch_size: int = BULK_BATCH_SIZE) -> List[Dict]:
+    """Inserts candidates (e.g. an ATS export) in batched transactions. No resumes, so no AI scoring."""
+    results: List[Optional[Dict]] = [None] * len(candidates)
+    job_ids = {candidate.job_id for candidate in candidates}
+    existing_jobs = {row.id for row in db.query(Job.id).filter(Job.id.in_(job_ids))} if job_ids else set()
+
+    for start in range(0, len(candidates), batch_size):
+        rows: List[Tuple[int, Dict]] = []
+        for index in range(start, min(start + batch_size, len(candidates))):
+            candidate = candidates[index]
+            if candidate.job_id not in existing_jobs:
+                results[index] = _outcome(index, None, "error", "Job not found")
+                continue
+            rows.append((index, {
+                **candidate.dict(), "id": str(uuid.uuid4()), "status": "new",
+                "interview_stage": "Applied", "created_at": datetime.utcnow()
+            }))
+        if not rows:
+            continue
+
+        try:
+            db.execute(insert(Candidate), [row for _, row in rows])
+            applicant_index.index_identity(db, [row for _, row in rows])
+            deltas = Counter()
+            for _, row in rows:
+                _count_insert(deltas, row)
+            job_counters.bump_many(db, deltas)
+            version_stamps.bump_jobs(db, [row["job_id"] for _, row in rows])
+            _emit_imported(db, [row for _, row in rows])
+            db.commit()
+            for index, row in rows:
+                results[index] = _outcome(index, row["id"], "created")
+        except SQLAlchemyError:
+            # Find the offending rows: retry this batch one row per transaction
+            db.rollback()
+            for index, row in rows:
+                try:
+                    db.execute(insert(Candidate), [row])
+                    applicant_index.index_identity(db, [row])
+                    deltas = Counter()
+                    _count_insert(deltas, row)
+                    job_counters.bump_many(db, deltas)
+                    version_stamps.bump(db, version_stamps.job_scope(row["job_id"]))
+                    _emit_imported(db, [row])
+                    db.commit()
+                    results[index] = _outcome(index, row["id"], "created")
+                except SQLAlchemyError as e:
+                    db.rollback()
+                    results[index] = _outcome(index, None, "error", str(e.__cause__ or e))
+    return results
+
+def _write_updates(db: Session, planned: List[Tuple[int, str, str, Dict, Counter]]):
+    """Writes planned (index, candidate_id, job_id, values, counter deltas) updates and commits them."""
+    deltas, touched_jobs = Counter(), {}
+    for _, candidate_id, job_id, values, row_deltas in planned:
+        deltas.update(row_deltas)
+        touched_jobs.setdefault(job_id, []).append(
+            {"candidate_id": candidate_id, **{k: v for k, v in values.items() if k not in ("id", "ai_analysis")}}
+        )
+    db.execute(update(Candidate), [values for _, _, _, values, _ in planned])
+    job_counters.bump_many(db, deltas)
+    version_stamps.bump_jobs(db, touched_jobs)
+    for job_id, changes in touched_jobs.items():
+        events.emit(db, job_id, "candidates_updated", updates=changes)
+    db.commit()
+
+def _bulk_update_candidates(db: Session, updates: List[Dict], tracked: List[str], batch_size: int) -> List[Dict]:
+    """
+    Shared by the bulk updates: `updates` are {"id": ..., column: value} dicts.
+    Loads the current tracked values per batch (one IN query) to keep the counters
+    right, then applies an ORM bulk UPDATE by primary key.
+    """
+    results: List[Optional[Dict]] = [None] * len(updates)
+    for start in range(0, len(updates), batch_size):
+        batch = updates[start:start + batch_size]
+        current = {
+            row.id: row for row in db.query(Candidate.id, Candidate.job_id, *[getattr(Candidate, c) for c in tracked])
+            .filter(Candidate.id.in_({u["id"] for u in batch}))
+        }
+        state = {candidate_id: {c: getattr(row, c) for c in tracked} for candidate_id, row in current.items()}
+
+        planned = []
+        for offset, values in enumerate(batch):
+            index, candidate_id = start + offset, values["id"]
+            if candidate_id not in current:
+                results[index] = _outcome(index, candidate_id, "not_found")
+                continue
+            job_id, row_deltas = current[candidate_id].job_id, Counter()
+            for column in tracked:
+                old, new = state[candidate_id][column], values.get(column)
+                if column in values and job_counters.bucket_key(old) != job_counters.bucket_key(new):
+                    row_deltas[(job_id, column, job_counters.bucket_key(old))] -= 1
+                    row_deltas[(job_id, column, job_counters.bucket_key(new))] += 1
+                    state[candidate_id][column] = new
+            planned.append((index, candidate_id, job_id, values, row_deltas))
+        if not planned:
+            continue
+
+        try:
+            _write_updates(db, planned)
+            for index, candidate_id, _, _, _ in planned:
+                results[index] = _outcome(index, candidate_id, "updated")
+        except SQLAlchemyError:
+            # Find the offending rows: retry this batch one row per transaction
+            db.rollback()
+            for row in planned:
+                index, candidate_id = row[0], row[1]
+                try:
+                    _write_updates(db, [row])
+                    results[index] = _outcome(index, candidate_id, "updated")
+                except SQLAlchemyError as e:
+                    db.rollback()
+                    results[index] = _outcome(index, candidate_id, "error", str(e.__cause__ or e))
+    return results
+
+def bulk_update_candidate_status(db: Session, updates: List[schemas.CandidateStatusUpdate], batch_size: int = BULK_BATCH_SIZE) -> List[Dict]:
+    return _bulk_update_candidates(
+        db, [{"id": u.candidate_id, "status": u.status} for u in updates], ["status"], batch_size
+    )
+
+def bulk_update_candidate_ai_analysis(db: Session, updates: List[schemas.CandidateAIUpdate], batch_size: int = BULK_BATCH_SIZE) -> List[Dict]:
+    rows = []
+    for u in updates:
+        values = {"id": u.candidate_id, "ai_score": u.ai_score, "ai_analysis": u.ai_analysis}
+        if u.ai_status is not None:
+            values["ai_status"] = u.ai_status
+        rows.append(values)
+    return _bulk_update_candidates(db, rows, ["ai_status"], batch_size)
+
 def create_interview_answer(db: Session, answer: schemas.InterviewAnswerCreate):
     db_answer = InterviewAnswer(**answer.dict())
     db.add(db_answer)
@@ -57,26 +370,112 @@ def create_interview_answer(db: Session, answer: schemas.InterviewAnswerCreate):
     db.refresh(db_answer)
     return db_answer
 
+def replace_interview_answers(db: Session, candidate: Candidate, answers: List[Dict]) -> List[InterviewAnswer]:
+    """
+    Saves an interview submission ({question_number, question, answer} dicts) in place
+    of any earlier answers, in one transaction.
+    The candidate's rollup is rebuilt (empty until the new answers are analyzed), so a
+    resubmission never mixes two interviews.
+    """
+    db.query(InterviewAnswer).filter(InterviewAnswer.candidate_id == candidate.id).delete(synchronize_session=False)
+    db_answers = [InterviewAnswer(candidate_id=candidate.id, **answer) for answer in answers]
+    db.add_all(db_answers)
+    db.flush()
+    interview_rollup.rebuild(db, candidate)
+    version_stamps.bump(db, version_stamps.job_scope(candidate.job_id))
+    db.commit()
+    return db_answers
+
 def get_interview_answers(db: Session, candidate_id: str):
     return db.query(InterviewAnswer).filter(InterviewAnswer.candidate_id == candidate_id).all()
 
-def update_interview_answer_analysis(db: Session, answer_id: str, ai_analysis: str):
+def get_interview_answers_for_candidate(db: Session, candidate_id: str):
+    return (db.query(InterviewAnswer).filter(InterviewAnswer.candidate_id == candidate_id)
+            .order_by(InterviewAnswer.created_at).all())
+
+def update_interview_answer_analysis(db: Session, answer_id: str, ai_analysis: str, ai_score: Optional[float] = None,
+                                     dimensions: Optional[Dict[str, float]] = None):
     answer = db.query(InterviewAnswer).filter(InterviewAnswer.id == answer_id).first()
     if answer:
-        answer.ai_analysis = ai_analysis
+        if ai_score is None:
+            answer.ai_analysis = ai_analysis
+        else:
+            # Scored: the candidate's rollup moves from the previous result to this one
+            candidate = get_candidate(db, answer.candidate_id)
+            analysis = interview_rollup.record_analysis(db, candidate, answer, ai_analysis, ai_score, dimensions)
+            events.emit(db, candidate.job_id, "interview_analyzed", candidate_id=candidate.id,
+                        overall_score=analysis.overall_score, answer_count=analysis.answer_count)
+            version_stamps.bump(db, version_stamps.job_scope(candidate.job_id))
         db.commit()
         db.refresh(answer)
     return answer
 
+def get_interview_analysis(db: Session, candidate_id: str):
+    return db.get(InterviewAnalysis, candidate_id)
+
+def save_interview_analysis(db: Session, candidate: Candidate, answers: List[InterviewAnswer], results: List[Dict],
+                            interview_stage: str = "Interview Complete") -> InterviewAnalysis:
+    """
+    Stores each answer's {"summary", "score", "dimensions"} result, folds it into the
+    candidate's interview rollup and moves them to `interview_stage`, in one transaction.
+    """
+    analysis = None
+    for answer, result in zip(answers, results):
+        analysis = interview_rollup.record_analysis(
+            db, candidate, answer, result["summary"], result["score"], result.get("dimensions")
+        )
+    if analysis is None:
+        analysis = interview_rollup.get_or_create(db, candidate)
+
+    if candidate.interview_stage != interview_stage:
+        job_counters.record_change(db, candidate.job_id, "interview_stage", candidate.interview_stage, interview_stage)
+        events.emit(db, candidate.job_id, "candidate_stage_changed", candidate_id=candidate.id,
+                    interview_stage=interview_stage, previous_stage=candidate.interview_stage)
+        candidate.interview_stage = interview_stage
+    events.emit(db, candidate.job_id, "interview_analyzed", candidate_id=candidate.id,
+                overall_score=analysis.overall_score, answer_count=analysis.answer_count)
+    version_stamps.bump(db, version_stamps.job_scope(candidate.job_id))
+    db.commit()
+    db.refresh(analysis)
+    return analysis
+
+INTERVIEW_SORTS = ("overall_score",) + tuple(f"{name}_score" for name in interview_rollup.DIMENSIONS)
+
+def get_interview_rankings(
+    db: Session,
+    job_id: str,
+    sort: str = "overall_score",
+    cursor: Optional[str] = None,
+    limit: int = 50
+) -> Tuple[List[Tuple[InterviewAnalysis, Candidate]], Optional[str]]:
+    """
+    One page of a job's interviewed candidates, best first by the overall or a
+    dimension score, read from the rollups only (no answers or analysis text).
+    Keyset pagination as in get_candidates_page. Returns ((rollup, candidate) rows, next cursor).
+    """
+    if sort not in INTERVIEW_SORTS:
+        raise ValueError(f"sort must be one of: {', '.join(INTERVIEW_SORTS)}")
+    sort_column = getattr(InterviewAnalysis, sort)
+
+    query = (db.query(InterviewAnalysis, Candidate)
+             .join(Candidate, Candidate.id == InterviewAnalysis.candidate_id)
+             .options(defer(Candidate.ai_analysis), defer(InterviewAnalysis.totals))
+             .filter(InterviewAnalysis.job_id == job_id, sort_column.isnot(None)))
+    if cursor is not None:
+        after_value, after_id = decode_cursor(cursor, sort)
+        query = query.filter(tuple_(sort_column, InterviewAnalysis.candidate_id) < tuple_(after_value, after_id))
+    rows = query.order_by(sort_column.desc(), InterviewAnalysis.candidate_id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        next_cursor = encode_cursor(sort, getattr(last, sort), last.candidate_id)
+    return rows, next_cursor
+
 def get_candidates_count_by_status(db: Session, job_id: str):
-    counts = db.query(
-        Candidate.status,
-        func.count(Candidate.id)
-    ).filter(
-        Candidate.job_id == job_id
-    ).group_by(
-        Candidate.status
-    ).all()
+    # Read from the materialized counters instead of grouping every candidate
+    counts = job_counters.get_counts(db, job_id)
     
     # Initialize counts with 0
     status_counts = {
@@ -89,9 +488,24 @@ def get_candidates_count_by_status(db: Session, job_id: str):
         "rejected": 0
     }
     
-    # Update counts from database
-    for status, count in counts:
+    # Update counts from the counters
+    for status, count in counts["status"].items():
         status_counts[status] = count
-        status_counts["total"] += count
+    status_counts["total"] = counts["total"].get("", 0)
     
-    return status_counts 
\ No newline at end of file
+    return status_counts
+
+def get_dashboard_stats(db: Session, job_id: str) -> Dict[str, int]:
+    """Status counts plus AI fit and interview stage counts, from the materialized counters."""
+    counts = job_counters.get_counts(db, job_id)
+    stats = get_candidates_count_by_status(db, job_id)
+    stats.update({
+        "total_candidates": stats["total"],
+        "top_fit_count": counts["ai_status"].get("Top Fit", 0),
+        "potential_fit_count": counts["ai_status"].get("Potential Fit", 0),
+        "flagged_count": counts["ai_status"].get("Flagged", 0),
+        "applied_count": counts["interview_stage"].get("Applied", 0),
+        "interview_sent_count": counts["interview_stage"].get("Interview Sent", 0),
+        "interview_complete_count": counts["interview_stage"].get("Interview Complete", 0),
+    })
+    return stats
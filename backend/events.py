@@ -0,0 +1,121 @@
+# events.py
+#
+# In-process pub/sub for per-job dashboard events (candidate created, scored,
+# status/stage changed, counter deltas). crud.py queues events on the session
+# with emit(); they are published only after the transaction commits, and
+# dropped on rollback. Subscribers (WebSocket/SSE connections) each get a
+# bounded queue: a slow client never blocks writers, it just misses events and
+# receives a "resync" event telling it to refetch the dashboard.
+
+import asyncio
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Set
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "256"))
+
+_PENDING = "pending_events"
+
+class Subscription:
+    """One listener on a job's events, consumed on the event loop that created it."""
+
+    def __init__(self, job_id: str, loop: asyncio.AbstractEventLoop, max_queue: int = EVENTS_QUEUE_SIZE):
+        self.job_id = job_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.dropped = 0
+
+    def _offer(self, event: Dict):
+        # Runs on the subscriber's loop
+        if self.dropped:
+            if self.queue.full():
+                self.dropped += 1
+                return
+            # Room again: tell the client what it missed before carrying on
+            self.queue.put_nowait({"type": "resync", "job_id": self.job_id, "dropped": self.dropped})
+            self.dropped = 0
+        if self.queue.full():
+            self.dropped += 1
+            return
+        self.queue.put_nowait(event)
+
+    async def get(self) -> Dict:
+        return await self.queue.get()
+
+_subscribers: Dict[str, Set[Subscription]] = {}
+_lock = threading.Lock()
+_stats = {"published": 0, "delivered": 0}
+
+def subscribe(job_id: str) -> Subscription:
+    """Must be called from the event loop that will consume the events."""
+    subscription = Subscription(job_id, asyncio.get_running_loop())
+    with _lock:
+        _subscribers.setdefault(job_id, set()).add(subscription)
+    return subscription
+
+def unsubscribe(subscription: Subscription):
+    with _lock:
+        subscribers = _subscribers.get(subscription.job_id)
+        if subscribers:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del _subscribers[subscription.job_id]
+
+def publish(job_id: str, event: Dict):
+    """Thread-safe: hands the event to every subscriber's loop without waiting."""
+    with _lock:
+        subscribers = list(_subscribers.get(job_id, ()))
+    delivered = 0
+    for subscription in subscribers:
+        try:
+            subscription.loop.call_soon_threadsafe(subscription._offer, event)
+            delivered += 1
+        except RuntimeError:
+            # The subscriber's loop is closed
+            unsubscribe(subscription)
+    # Publishers are scoring worker threads as well as the event loop
+    with _lock:
+        _stats["published"] += 1
+        _stats["delivered"] += delivered
+
+def emit(db, job_id: str, event_type: str, **data):
+    """Queues an event on the session; published after the next commit."""
+    db.info.setdefault(_PENDING, []).append({"type": event_type, "job_id": job_id, **data})
+
+def _merge_counters(pending: List[Dict]) -> List[Dict]:
+    """Collapses the per-counter deltas of a transaction into one event per job."""
+    merged: List[Dict] = []
+    deltas: Dict[str, Counter] = {}
+    for event in pending:
+        if event["type"] != "counter":
+            merged.append(event)
+            continue
+        deltas.setdefault(event["job_id"], Counter())[(event["kind"], event["bucket"])] += event["delta"]
+    for job_id, counter in deltas.items():
+        changes = [{"kind": kind, "bucket": bucket, "delta": delta} for (kind, bucket), delta in counter.items() if delta]
+        if changes:
+            merged.append({"type": "counters", "job_id": job_id, "deltas": changes})
+    return merged
+
+@sa_event.listens_for(Session, "after_commit")
+def _publish_pending(session):
+    pending = session.info.pop(_PENDING, None)
+    if not pending:
+        return
+    now = time.time()
+    for event in _merge_counters(pending):
+        publish(event["job_id"], {**event, "ts": now})
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING, None)
+
+def stats() -> Dict:
+    with _lock:
+        subscribers = sum(len(s) for s in _subscribers.values())
+        return {**_stats, "subscribers": subscribers, "jobs": len(_subscribers)}
@@ -0,0 +1,27 @@
+# fingerprint.py
+
+import hashlib
+import re
+
+CHUNK_SIZE = 1024 * 1024
+
+def sha256_file(path: str) -> str:
+    """Returns the hex SHA-256 of a file's bytes, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def normalize_requirements(requirements: str) -> str:
+    """
+    Normalizes a requirements string so cosmetic differences (case, spacing,
+    ordering of comma separated items) don't produce different cache keys.
+    """
+    items = [re.sub(r"\s+", " ", req).strip().lower() for req in requirements.split(",")]
+    return ",".join(sorted(item for item in items if item))
+
+def analysis_key(resume_hash: str, requirements: str, prompt_version: str, model_name: str) -> str:
+    """Content-addressed key for one (resume, requirements, prompt, model) analysis."""
+    raw = "\x1f".join([resume_hash, normalize_requirements(requirements), prompt_version, model_name])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
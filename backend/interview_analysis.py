@@ -1,31 +1,19 @@
 # interview_analysis.py
 
-import os
-import google.generativeai as genai
 from typing import List, Dict
 from dotenv import load_dotenv
+import llm_client
 
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini API
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY environment variable is not set.")
-genai.configure(api_key=GEMINI_API_KEY)
+# The Gemini client is created on first use by llm_client.get_client()
 
+# Scoring dimensions, each 0-1, reported alongside the overall answer score
+DIMENSIONS = ("relevance", "clarity", "depth", "professionalism")
 
-
-def analyze_interview_answer(answer_text: str, question: str) -> dict:
-    """Analyzes interview answer using Gemini API."""
-    print(f"Analyzing answer for question: {question}")
-    
-    try:
-        # Initialize Gemini model
-        model = genai.GenerativeModel('gemini-pro')
-        
-        # Create prompt for analysis
-        prompt = f"""
+def build_answer_prompt(answer_text: str, question: str) -> str:
+    return f"""
         Analyze the following interview answer and provide:
         1. A brief summary of the response
         2. A score from 0-1 based on:
@@ -40,46 +28,71 @@ def analyze_interview_answer(answer_text: str, question: str) -> dict:
         Provide the analysis in this format:
         Summary: [your summary]
         Score: [0-1 score]
+        Relevance: [0-1 score]
+        Clarity: [0-1 score]
+        Depth: [0-1 score]
+        Professionalism: [0-1 score]
         """
-        
-        # Generate response
-        response = model.generate_content(prompt)
-        response_text = response.text
-        
-        # Parse the response
-        summary = ""
-        score = 0.5  # Default score
-        
-        for line in response_text.split('\n'):
-            if line.startswith('Summary:'):
-                summary = line.replace('Summary:', '').strip()
-            elif line.startswith('Score:'):
-                try:
-                    score = float(line.replace('Score:', '').strip())
-                    # Ensure score is between 0 and 1
-                    score = max(0, min(1, score))
-                except ValueError:
-                    pass
-        
-        return {
-            "summary": summary or "No summary generated",
-            "score": score
-        }
+
+def parse_answer_response(response_text: str) -> dict:
+    summary = ""
+    score = 0.5  # Default score
+    dimensions = {}
+    
+    for line in response_text.split('\n'):
+        line = line.strip()
+        label, _, value = line.partition(':')
+        if line.startswith('Summary:'):
+            summary = line.replace('Summary:', '').strip()
+        elif line.startswith('Score:') or label.lower() in DIMENSIONS:
+            try:
+                # Ensure score is between 0 and 1
+                value = max(0, min(1, float(value.strip())))
+            except ValueError:
+                continue
+            if label == 'Score':
+                score = value
+            else:
+                dimensions[label.lower()] = value
+    
+    return {
+        "summary": summary or "No summary generated",
+        "score": score,
+        "dimensions": dimensions
+    }
+
+def fallback_answer_analysis(answer_text: str, question: str) -> dict:
+    """Basic analysis used when the LLM is unavailable."""
+    return {
+        "summary": f"Basic analysis: The candidate provided an answer regarding {question}.",
+        "score": min(1.0, len(answer_text) / 500.0),  # Simple length-based score
+        "dimensions": {}
+    }
+
+def analyze_interview_answer(answer_text: str, question: str) -> dict:
+    """Analyzes interview answer using Gemini API."""
+    print(f"Analyzing answer for question: {question}")
+    
+    try:
+        # Shared client: one model instance, rate limited and retried
+        response_text = llm_client.get_client().generate_sync(build_answer_prompt(answer_text, question))
+        return parse_answer_response(response_text)
         
     except Exception as e:
         print(f"Error analyzing answer with Gemini: {e}")
         # Fallback to basic analysis
-        return {
-            "summary": f"Basic analysis: The candidate provided an answer regarding {question}.",
-            "score": len(answer_text) / 500.0  # Simple length-based score
-        }
+        return fallback_answer_analysis(answer_text, question)
+
+async def analyze_interview_answer_async(answer_text: str, question: str) -> dict:
+    """Async variant of analyze_interview_answer for concurrent analysis of several answers."""
+    try:
+        response_text = await llm_client.get_client().generate(build_answer_prompt(answer_text, question))
+        return parse_answer_response(response_text)
+    except Exception as e:
+        print(f"Error analyzing answer with Gemini: {e}")
+        return fallback_answer_analysis(answer_text, question)
 
-def get_interview_questions(job_id: str) -> List[str]:
-    """Retrieves interview questions for a given job."""
-    # TODO: Implement logic to fetch or generate job-specific questions
-    # For now, return a static list:
-    return [
-        "Tell me about a time you faced a challenging technical problem and how you solved it.",
-        "Describe your experience with the key skills required for this role.",
-        "Why are you interested in this position and our company?"
-    ] 
\ No newline at end of file
+def get_interview_questions(db, job_id: str) -> List[Dict]:
+    """The job's current interview questions ({"number", "text", "weight"}), from its cached question bank."""
+    import question_bank # Imports the models; interview_analysis is loaded while database.py migrates
+    return question_bank.get_questions(db, job_id)
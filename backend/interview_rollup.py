@@ -0,0 +1,159 @@
+# interview_rollup.py
+#
+# Per-candidate interview rollup (interview_analyses): weighted mean of the
+# answer scores plus one mean per scoring dimension. It stores running weighted
+# sums, so each analyzed (or re-analyzed) answer only adds its contribution and
+# removes the previous one instead of reloading every answer. The percentile
+# within the job is computed at read time from the job's scores, since it
+# changes whenever any other candidate is scored. A rebuild from the answers
+# repairs a rollup:
+#
+#   python interview_rollup.py [--candidate CANDIDATE_ID]
+
+import argparse
+import bisect
+import json
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database import Candidate, InterviewAnalysis, InterviewAnswer, SessionLocal
+from interview_analysis import DIMENSIONS
+import version_stamps
+
+# Totals key of the overall answer score, next to one key per dimension
+OVERALL = "overall"
+
+def _contribution(score: Optional[float], dimensions: Dict[str, float], weight: float) -> Dict[str, List[float]]:
+    """{key: [weighted sum, weight]} an analyzed answer adds to the rollup."""
+    if score is None:
+        return {}
+    parts = {OVERALL: [score * weight, weight]}
+    for name, value in dimensions.items():
+        if name in DIMENSIONS and value is not None:
+            parts[name] = [value * weight, weight]
+    return parts
+
+def answer_dimensions(answer: InterviewAnswer) -> Dict[str, float]:
+    return json.loads(answer.ai_dimensions) if answer.ai_dimensions else {}
+
+def _refresh(analysis: InterviewAnalysis, totals: Dict[str, List[float]]):
+    """Derives the stored scores and summary from the running totals."""
+    analysis.totals = json.dumps(totals, separators=(",", ":"))
+    means = {key: total / weight for key, (total, weight) in totals.items() if weight > 0}
+    analysis.overall_score = means.get(OVERALL)
+    for name in DIMENSIONS:
+        setattr(analysis, f"{name}_score", means.get(name))
+
+    if analysis.overall_score is None:
+        analysis.summary = "No answers analyzed yet."
+        return
+    summary = f"{analysis.answer_count} answer(s) analyzed, weighted score {analysis.overall_score:.2f}."
+    scored = {name: means[name] for name in DIMENSIONS if name in means}
+    if scored:
+        strongest = max(scored, key=scored.get)
+        weakest = min(scored, key=scored.get)
+        summary += f" Strongest: {strongest} ({scored[strongest]:.2f}); weakest: {weakest} ({scored[weakest]:.2f})."
+    analysis.summary = summary
+
+def get_or_create(db: Session, candidate: Candidate) -> InterviewAnalysis:
+    analysis = db.get(InterviewAnalysis, candidate.id)
+    if analysis is None:
+        analysis = InterviewAnalysis(candidate_id=candidate.id, job_id=candidate.job_id, answer_count=0, totals="{}")
+        db.add(analysis)
+        db.flush() # So the next db.get() in this transaction finds it
+    return analysis
+
+def record_analysis(db: Session, candidate: Candidate, answer: InterviewAnswer, summary: str, score: float,
+                    dimensions: Optional[Dict[str, float]] = None) -> InterviewAnalysis:
+    """
+    Stores an answer's analysis and moves the candidate's rollup from the answer's
+    previous result (if any) to the new one. Not committed.
+    """
+    analysis = get_or_create(db, candidate)
+    weight = answer.weight if answer.weight is not None else 1.0
+    old = _contribution(answer.ai_score, answer_dimensions(answer), weight)
+    new = _contribution(score, dimensions or {}, weight)
+
+    answer.ai_analysis = summary
+    answer.ai_score = score
+    answer.ai_dimensions = json.dumps(dimensions or {})
+
+    totals = json.loads(analysis.totals or "{}")
+    for key in old.keys() | new.keys():
+        total, total_weight = totals.get(key, [0.0, 0.0])
+        old_sum, old_weight = old.get(key, [0.0, 0.0])
+        new_sum, new_weight = new.get(key, [0.0, 0.0])
+        totals[key] = [total - old_sum + new_sum, total_weight - old_weight + new_weight]
+    if not old:
+        analysis.answer_count = (analysis.answer_count or 0) + 1
+    analysis.job_id = candidate.job_id
+    _refresh(analysis, totals)
+    return analysis
+
+def rebuild(db: Session, candidate: Candidate) -> Optional[InterviewAnalysis]:
+    """Recomputes a candidate's rollup from all their analyzed answers. Not committed."""
+    answers = db.query(InterviewAnswer).filter(
+        InterviewAnswer.candidate_id == candidate.id, InterviewAnswer.ai_score.isnot(None)
+    ).all()
+    analysis = db.get(InterviewAnalysis, candidate.id)
+    if not answers and analysis is None:
+        return None
+    analysis = analysis or get_or_create(db, candidate)
+
+    totals: Dict[str, List[float]] = {}
+    for answer in answers:
+        weight = answer.weight if answer.weight is not None else 1.0
+        for key, (total, key_weight) in _contribution(answer.ai_score, answer_dimensions(answer), weight).items():
+            running = totals.setdefault(key, [0.0, 0.0])
+            running[0] += total
+            running[1] += key_weight
+    analysis.answer_count = len(answers)
+    analysis.job_id = candidate.job_id
+    _refresh(analysis, totals)
+    return analysis
+
+def rebuild_all(db: Session, candidate_id: Optional[str] = None) -> int:
+    """Rebuilds the rollup of every interviewed candidate (or one). Not committed."""
+    query = db.query(Candidate).filter(Candidate.id.in_(select(InterviewAnswer.candidate_id)))
+    if candidate_id is not None:
+        query = query.filter(Candidate.id == candidate_id)
+    rebuilt_jobs = []
+    for candidate in query:
+        if rebuild(db, candidate) is not None:
+            rebuilt_jobs.append(candidate.job_id)
+    # Cached dashboard responses for these jobs may show the old scores
+    version_stamps.bump_jobs(db, rebuilt_jobs)
+    db.flush()
+    return len(rebuilt_jobs)
+
+def percentiles(db: Session, job_id: str, scores: List[Optional[float]]) -> List[Optional[float]]:
+    """
+    Percentile (0-100) of each score among the job's interviewed candidates: the
+    share of the others scoring strictly lower. One index-ordered read of the job's scores.
+    """
+    job_scores = [row[0] for row in db.execute(
+        select(InterviewAnalysis.overall_score)
+        .where(InterviewAnalysis.job_id == job_id, InterviewAnalysis.overall_score.isnot(None))
+        .order_by(InterviewAnalysis.overall_score)
+    )]
+    others = len(job_scores) - 1
+    result = []
+    for score in scores:
+        if score is None or not job_scores:
+            result.append(None)
+        elif others <= 0:
+            result.append(100.0)
+        else:
+            result.append(round(100.0 * bisect.bisect_left(job_scores, score) / others, 1))
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild candidate interview rollups from their analyzed answers.")
+    parser.add_argument("--candidate", help="Only rebuild this candidate's rollup")
+    args = parser.parse_args()
+    with SessionLocal() as db:
+        rebuilt = rebuild_all(db, args.candidate)
+        db.commit()
+    print(f"{rebuilt} interview rollup(s) rebuilt")
@@ -0,0 +1,160 @@
+# job_counters.py
+#
+# Per-job candidate counters (total, and one count per status, AI fit bucket and
+# interview stage), kept up to date by crud.py in the same transaction as the
+# candidate write, so dashboard stats are a single primary-key range read.
+# A reconciliation pass recomputes them from the candidates table to repair drift:
+#
+#   python job_counters.py [--job JOB_ID]
+
+import argparse
+import os
+import threading
+from typing import Dict, Optional
+
+from sqlalchemy import delete, func, select, update
+
+from database import Candidate, JobCandidateCounter, SessionLocal, upsert_increment
+import version_stamps
+import events
+
+# How often the background reconciler runs; 0 disables it
+COUNTER_RECONCILE_INTERVAL_SECONDS = float(os.getenv("COUNTER_RECONCILE_INTERVAL_SECONDS", "3600"))
+
+counters = JobCandidateCounter.__table__
+
+# Counter kind -> candidate column it buckets by. "total" has a single "" bucket.
+TRACKED_COLUMNS = {
+    "status": Candidate.status,
+    "ai_status": Candidate.ai_status,
+    "interview_stage": Candidate.interview_stage,
+}
+
+def bucket_key(value) -> str:
+    """Counter bucket for a column value."""
+    return "" if value is None else str(value)
+
+def bump(db, job_id: str, kind: str, bucket, delta: int):
+    """Adds `delta` to one counter with an upsert. Not committed: part of the caller's transaction."""
+    upsert_increment(db, counters, {"job_id": job_id, "kind": kind, "bucket": bucket_key(bucket)}, "count", delta)
+    # Merged into one "counters" event per job when the transaction commits
+    events.emit(db, job_id, "counter", kind=kind, bucket=bucket_key(bucket), delta=delta)
+
+def bump_many(db, deltas: Dict[tuple, int]):
+    """Applies aggregated {(job_id, kind, bucket): delta} changes, one upsert per counter."""
+    for (job_id, kind, bucket), delta in deltas.items():
+        if delta:
+            bump(db, job_id, kind, bucket, delta)
+
+def record_insert(db, candidate: Candidate):
+    """Counts a new candidate under every tracked column."""
+    bump(db, candidate.job_id, "total", "", 1)
+    for kind in TRACKED_COLUMNS:
+        bump(db, candidate.job_id, kind, getattr(candidate, kind), 1)
+
+def record_change(db, job_id: str, kind: str, old_value, new_value):
+    """Moves one candidate from the old bucket to the new one."""
+    if bucket_key(old_value) == bucket_key(new_value):
+        return
+    bump(db, job_id, kind, old_value, -1)
+    bump(db, job_id, kind, new_value, 1)
+
+def get_counts(db, job_id: str) -> Dict[str, Dict[str, int]]:
+    """{kind: {bucket: count}} for one job, e.g. counts["status"]["new"]."""
+    result: Dict[str, Dict[str, int]] = {"total": {}, **{kind: {} for kind in TRACKED_COLUMNS}}
+    rows = db.execute(select(counters.c.kind, counters.c.bucket, counters.c.count).where(counters.c.job_id == job_id))
+    for kind, bucket, count in rows:
+        result.setdefault(kind, {})[bucket] = count
+    return result
+
+def compute_counts(db, job_id: Optional[str] = None) -> Dict[tuple, int]:
+    """Counts straight from the candidates table: {(job_id, kind, bucket): count}."""
+    actual: Dict[tuple, int] = {}
+    for kind, column in {"total": None, **TRACKED_COLUMNS}.items():
+        group = [Candidate.job_id] + ([column] if column is not None else [])
+        query = select(*group, func.count(Candidate.id)).group_by(*group)
+        if job_id is not None:
+            query = query.where(Candidate.job_id == job_id)
+        for row in db.execute(query):
+            bucket = bucket_key(row[1]) if column is not None else ""
+            actual[(row[0], kind, bucket)] = row[-1]
+    return actual
+
+def reconcile_counts(db, job_id: Optional[str] = None) -> int:
+    """
+    Rewrites counters that differ from the candidates table (one job, or all).
+    Returns the number of counters repaired. Not committed.
+    """
+    actual = compute_counts(db, job_id)
+    query = select(counters.c.job_id, counters.c.kind, counters.c.bucket, counters.c.count)
+    if job_id is not None:
+        query = query.where(counters.c.job_id == job_id)
+    stored = {(row[0], row[1], row[2]): row[3] for row in db.execute(query)}
+
+    repaired, repaired_jobs = 0, set()
+    for key in stored.keys() - actual.keys():
+        db.execute(delete(counters).where(
+            counters.c.job_id == key[0], counters.c.kind == key[1], counters.c.bucket == key[2]
+        ))
+        if stored[key] != 0: # Emptied buckets are just cleaned up, not drift
+            repaired += 1
+            repaired_jobs.add(key[0])
+    for key, count in actual.items():
+        if key not in stored:
+            db.execute(counters.insert().values(job_id=key[0], kind=key[1], bucket=key[2], count=count))
+        elif stored[key] != count:
+            db.execute(update(counters).where(
+                counters.c.job_id == key[0], counters.c.kind == key[1], counters.c.bucket == key[2]
+            ).values(count=count))
+        else:
+            continue
+        repaired += 1
+        repaired_jobs.add(key[0])
+    # Cached stats responses and clients' running totals for these jobs are stale now
+    version_stamps.bump_jobs(db, repaired_jobs)
+    for repaired_job in repaired_jobs:
+        events.emit(db, repaired_job, "resync", reason="counters reconciled")
+    return repaired
+
+def reconcile(job_id: Optional[str] = None) -> int:
+    """Reconciles in its own session and commits."""
+    with SessionLocal() as db:
+        repaired = reconcile_counts(db, job_id)
+        db.commit()
+    if repaired:
+        print(f"Repaired {repaired} job counter(s)")
+    return repaired
+
+# --- Background reconciler ---
+
+_reconciler: Optional[threading.Thread] = None
+_stop_event = threading.Event()
+
+def _reconcile_loop(interval: float):
+    while not _stop_event.wait(interval):
+        try:
+            reconcile()
+        except Exception as e:
+            print(f"Job counter reconciliation failed: {e}")
+
+def start_reconciler(interval: float = COUNTER_RECONCILE_INTERVAL_SECONDS):
+    """Periodically repairs counter drift (called on application startup)."""
+    global _reconciler
+    if _reconciler is not None or interval <= 0:
+        return
+    _stop_event.clear()
+    _reconciler = threading.Thread(target=_reconcile_loop, args=(interval,), name="counter-reconciler", daemon=True)
+    _reconciler.start()
+
+def stop_reconciler(timeout: float = 5.0):
+    global _reconciler
+    _stop_event.set()
+    if _reconciler is not None:
+        _reconciler.join(timeout)
+        _reconciler = None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute per-job candidate counters from the candidates table.")
+    parser.add_argument("--job", help="Only reconcile this job id")
+    args = parser.parse_args()
+    print(f"{reconcile(args.job)} counter(s) repaired")
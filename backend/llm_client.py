@@ -0,0 +1,315 @@
+# llm_client.py
+
+import asyncio
+import http.client
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-pro")
+
+# Client-side limits shared by every AI call site in the process
+LLM_RATE_PER_SECOND = float(os.getenv("LLM_RATE_PER_SECOND", "5"))
+LLM_BURST = int(os.getenv("LLM_BURST", "10"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "1"))
+LLM_ATTEMPT_TIMEOUT_SECONDS = float(os.getenv("LLM_ATTEMPT_TIMEOUT_SECONDS", "60"))
+LLM_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "120"))
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+# When set, requests go to a local stub server instead of Gemini (offline load testing)
+LLM_STUB_URL = os.getenv("LLM_STUB_URL", "")
+# Which registered provider backs the client: gemini, http-stub or offline
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "http-stub" if LLM_STUB_URL else "gemini")
+
+class LLMError(Exception):
+    """The LLM call failed after retries, or could not be attempted."""
+
+class CircuitOpenError(LLMError):
+    """Calls are short-circuited because the provider has been failing."""
+
+class TokenBucket:
+    """Async token bucket: `rate` requests per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and rejects calls for `reset_seconds`.
+    Then one trial call is let through (half-open): success closes it, failure re-opens it.
+    """
+
+    def __init__(self, threshold: int, reset_seconds: float):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        state = self.state
+        if state == "open" or (state == "half-open" and self.trial_in_flight):
+            raise CircuitOpenError("LLM circuit breaker is open after repeated failures")
+        if state == "half-open":
+            self.trial_in_flight = True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+    def release_trial(self):
+        """The trial call ended without a result (e.g. cancelled): let the next call be the trial."""
+        self.trial_in_flight = False
+
+class GeminiTransport:
+    """Gemini via google-generativeai; one GenerativeModel reused for every call."""
+
+    def __init__(self, model_name: str = MODEL_NAME):
+        import google.generativeai as genai
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise LLMError("GEMINI_API_KEY environment variable is not set.")
+        genai.configure(api_key=api_key)
+        self.name = model_name
+        self.model = genai.GenerativeModel(model_name)
+
+    async def generate(self, prompt: str) -> str:
+        response = await self.model.generate_content_async(prompt)
+        return response.text
+
+class HTTPStubTransport:
+    """
+    Posts {"prompt": ...} to a local stub server and reads {"text": ...} back.
+    Keeps one HTTP/1.1 keep-alive connection per worker thread.
+    """
+
+    def __init__(self, url: str, max_connections: int = LLM_MAX_CONCURRENCY):
+        parsed = urlparse(url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.path = parsed.path or "/generate"
+        self.name = f"stub:{self.host}:{self.port}"
+        self.local = threading.local()
+        # Own threads, so the default executor size doesn't cap concurrency
+        self.executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="llm-stub")
+
+    def _post(self, prompt: str) -> str:
+        body = json.dumps({"prompt": prompt}).encode("utf-8")
+        for attempt in range(2):
+            connection = getattr(self.local, "connection", None)
+            if connection is None:
+                connection = self.local.connection = http.client.HTTPConnection(self.host, self.port, timeout=LLM_ATTEMPT_TIMEOUT_SECONDS)
+            try:
+                connection.request("POST", self.path, body, {"Content-Type": "application/json"})
+                response = connection.getresponse()
+                payload = response.read()
+            except (http.client.HTTPException, ConnectionError):
+                # Server closed the kept-alive connection; reconnect once
+                connection.close()
+                self.local.connection = None
+                if attempt == 0:
+                    continue
+                raise
+            if response.status != 200:
+                raise LLMError(f"Stub server returned HTTP {response.status}")
+            return json.loads(payload)["text"]
+
+    async def generate(self, prompt: str) -> str:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self._post, prompt)
+
+def fake_response(prompt: str) -> str:
+    """Deterministic canned answer in whichever format the prompt asks for."""
+    score = sum(prompt.encode("utf-8")) % 101
+    resume_ids = re.findall(r"=== RESUME (\w+) ===", prompt)
+    if resume_ids:
+        return "\n".join(
+            f"RESUME ID: {resume_id}\nRELEVANCE SCORE: {(score + i * 7) % 101}\nDETAILED ANALYSIS: Stub analysis for {resume_id}."
+            for i, resume_id in enumerate(resume_ids)
+        )
+    if "=== INTERVIEW QUESTIONS ===" in prompt:
+        count = int(re.search(r"Write (\d+) interview questions", prompt).group(1))
+        return "\n".join(f"Question {i}: Stub interview question {i}?" for i in range(1, count + 1))
+    if "RELEVANCE SCORE" in prompt:
+        return f"RELEVANCE SCORE: {score}\nDETAILED ANALYSIS: Stub analysis of the resume."
+    answer = f"Summary: Stub summary of the answer.\nScore: {score / 100:.2f}"
+    if "Professionalism:" in prompt:
+        answer += "".join(f"\n{name}: {(score + i * 13) % 101 / 100:.2f}"
+                          for i, name in enumerate(("Relevance", "Clarity", "Depth", "Professionalism")))
+    return answer
+
+class OfflineStubTransport:
+    """In-process fake provider: no network, no API key. For tests and local development."""
+
+    name = "offline-stub"
+
+    async def generate(self, prompt: str) -> str:
+        return fake_response(prompt)
+
+class LLMClient:
+    """
+    Shared LLM client. All calls run on one background event loop so the rate limiter,
+    concurrency limit and circuit breaker are shared by async and sync callers alike.
+    """
+
+    def __init__(self, transport, rate_per_second: float = LLM_RATE_PER_SECOND, burst: int = LLM_BURST,
+                 max_concurrency: int = LLM_MAX_CONCURRENCY, max_retries: int = LLM_MAX_RETRIES,
+                 attempt_timeout: float = LLM_ATTEMPT_TIMEOUT_SECONDS, deadline: float = LLM_DEADLINE_SECONDS,
+                 breaker: CircuitBreaker = None):
+        self.transport = transport
+        self.max_retries = max_retries
+        self.attempt_timeout = attempt_timeout
+        self.deadline = deadline
+        self.breaker = breaker or CircuitBreaker(LLM_BREAKER_THRESHOLD, LLM_BREAKER_RESET_SECONDS)
+        self.stats = {"requests": 0, "successes": 0, "failures": 0, "retries": 0, "rejected": 0}
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="llm-client", daemon=True)
+        self.thread.start()
+        # asyncio primitives must be created on the loop that uses them
+        self.bucket = self._run(self._make_bucket(rate_per_second, burst)).result()
+        self.semaphore = self._run(self._make_semaphore(max_concurrency)).result()
+
+    @property
+    def model_name(self) -> str:
+        return self.transport.name
+
+    async def _make_bucket(self, rate: float, capacity: int) -> TokenBucket:
+        return TokenBucket(rate, capacity)
+
+    async def _make_semaphore(self, limit: int) -> asyncio.Semaphore:
+        return asyncio.Semaphore(limit)
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    async def _generate(self, prompt: str, deadline: float) -> str:
+        self.stats["requests"] += 1
+        expires_at = time.monotonic() + deadline
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                self.stats["rejected"] += 1
+                raise
+
+            try:
+                await self.bucket.acquire()
+                async with self.semaphore:
+                    remaining = expires_at - time.monotonic()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError()
+                    text = await asyncio.wait_for(self.transport.generate(prompt), timeout=min(self.attempt_timeout, remaining))
+                self.breaker.record_success()
+                self.stats["successes"] += 1
+                return text
+            except Exception as e:
+                self.breaker.record_failure()
+                last_error = e if not isinstance(e, asyncio.TimeoutError) else LLMError("LLM call timed out")
+            except BaseException:
+                # Cancelled (client disconnected) or shutting down: neither a success nor a
+                # failure, but a half-open trial must not stay in flight forever
+                self.breaker.release_trial()
+                raise
+
+            # Exponential backoff with full jitter, never past the overall deadline
+            delay = random.uniform(0, LLM_RETRY_BASE_SECONDS * (2 ** attempt))
+            if attempt == self.max_retries or time.monotonic() + delay >= expires_at:
+                break
+            self.stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+        self.stats["failures"] += 1
+        raise LLMError(f"LLM call failed after {attempt + 1} attempt(s): {last_error}")
+
+    async def generate(self, prompt: str, deadline: float = None) -> str:
+        """Async entry point, usable from any event loop."""
+        return await asyncio.wrap_future(self._run(self._generate(prompt, deadline or self.deadline)))
+
+    def generate_sync(self, prompt: str, deadline: float = None) -> str:
+        """Blocking entry point for code running in worker threads."""
+        return self._run(self._generate(prompt, deadline or self.deadline)).result()
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "breaker": self.breaker.state, "model": self.model_name}
+
+# --- Provider registry ---
+
+_providers: Dict[str, Callable[[], object]] = {
+    "gemini": lambda: GeminiTransport(),
+    "http-stub": lambda: HTTPStubTransport(LLM_STUB_URL or "http://127.0.0.1:8765/generate"),
+    "offline": lambda: OfflineStubTransport(),
+}
+
+def register_provider(name: str, factory: Callable[[], object]):
+    """
+    Registers a transport factory. A transport needs a `name` attribute and an
+    `async generate(prompt) -> str` method. Select it with LLM_PROVIDER=<name>.
+    """
+    _providers[name] = factory
+
+_client: Optional[LLMClient] = None
+_client_lock = threading.Lock()
+
+def get_client() -> LLMClient:
+    """
+    Returns the process-wide client. Nothing is imported or configured until the
+    first AI call, so the API starts without google-generativeai or an API key.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            if LLM_PROVIDER not in _providers:
+                raise LLMError(f"Unknown LLM provider '{LLM_PROVIDER}'. Registered: {', '.join(sorted(_providers))}")
+            _client = LLMClient(_providers[LLM_PROVIDER]())
+        return _client
+
+def set_provider(name: str):
+    """Switches provider; the next get_client() builds a fresh client for it."""
+    global LLM_PROVIDER, _client
+    with _client_lock:
+        LLM_PROVIDER = name
+        _client = None
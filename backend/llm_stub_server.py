@@ -0,0 +1,89 @@
+# llm_stub_server.py
+#
+# Local stand-in for the Gemini API, used to exercise and load-test the shared
+# LLM client offline.
+#
+#   python llm_stub_server.py --port 8765 --latency 0.2 --error-rate 0.05
+#   LLM_STUB_URL=http://127.0.0.1:8765/generate uvicorn main:app
+#
+# Or run a self-contained load test against an in-process stub:
+#
+#   python llm_stub_server.py --load-test 500 --latency 0.1 --error-rate 0.1
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import llm_client
+
+def make_handler(latency: float, error_rate: float):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # keep-alive, like the real API
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            prompt = json.loads(self.rfile.read(length) or b"{}").get("prompt", "")
+            time.sleep(random.uniform(latency * 0.5, latency * 1.5))
+
+            if random.random() < error_rate:
+                status, payload = 503, {"error": "stub overloaded"}
+            else:
+                status, payload = 200, {"text": llm_client.fake_response(prompt)}
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass # Keep load tests quiet
+
+    return StubHandler
+
+def serve(port: int, latency: float, error_rate: float) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency, error_rate))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def load_test(requests: int, latency: float, error_rate: float):
+    server = serve(0, latency, error_rate)
+    url = f"http://127.0.0.1:{server.server_address[1]}/generate"
+    client = llm_client.LLMClient(llm_client.HTTPStubTransport(url))
+
+    async def run():
+        async def one(i):
+            try:
+                await client.generate(f"RELEVANCE SCORE prompt {i}")
+                return True
+            except llm_client.LLMError:
+                return False
+        return await asyncio.gather(*(one(i) for i in range(requests)))
+
+    started = time.monotonic()
+    results = asyncio.run(run())
+    elapsed = time.monotonic() - started
+    server.shutdown()
+
+    print(f"{requests} requests in {elapsed:.2f}s ({requests / elapsed:.1f} req/s), "
+          f"{sum(results)} succeeded, {requests - sum(results)} failed")
+    print(client.get_stats())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Gemini stub server for offline testing.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="Mean response latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 503")
+    parser.add_argument("--load-test", type=int, metavar="N", help="Send N requests through LLMClient and report throughput")
+    args = parser.parse_args()
+
+    if args.load_test:
+        load_test(args.load_test, args.latency, args.error_rate)
+    else:
+        serve(args.port, args.latency, args.error_rate)
+        print(f"Stub LLM listening on http://127.0.0.1:{args.port}/generate")
+        threading.Event().wait()
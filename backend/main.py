@@ -9,6 +9,9 @@ import models
 import schemas
 from database import SessionLocal, engine
 from routers import jobs, candidates, interview, dashboard, ai
+import parse_worker
+import task_queue
+import job_counters
 
 # Create database tables
 models.Base.metadata.create_all(bind=engine)
@@ -39,6 +42,17 @@ app.include_router(interview.router, prefix="/api/interview", tags=["interview"]
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["dashboard"])
 app.include_router(ai.router, prefix="/api/ai", tags=["ai"])
 
+@app.on_event("startup")
+def start_scoring_workers():
+    task_queue.start_workers()
+    job_counters.start_reconciler()
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    task_queue.stop_workers()
+    job_counters.stop_reconciler()
+    parse_worker.shutdown()
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Talent Acquisition Platform API"}
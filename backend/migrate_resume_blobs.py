@@ -0,0 +1,77 @@
+# migrate_resume_blobs.py
+#
+# Moves resumes from the old per-job layout (static/resumes/<job_id>/<filename>)
+# into the content-addressed blob store and points candidates at their blob.
+# Identical files are stored once. Run from the backend directory:
+#
+#   python migrate_resume_blobs.py [--dry-run] [--keep-originals]
+
+import argparse
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+from database import SessionLocal, Candidate
+import blob_store
+import fingerprint
+
+def migrate(dry_run: bool = False, keep_originals: bool = False) -> dict:
+    summary = {"candidates": 0, "migrated": 0, "already_migrated": 0, "missing_file": 0,
+               "new_blobs": 0, "bytes_before": 0, "bytes_after": 0, "removed_files": 0}
+    blob_root = os.path.abspath(blob_store.BLOB_DIR)
+    migrated_files = set()
+    seen_hashes = set()
+
+    with SessionLocal() as db:
+        candidates = db.query(Candidate).filter(Candidate.resume_path.isnot(None)).all()
+        for candidate in candidates:
+            summary["candidates"] += 1
+            old_path = candidate.resume_path
+            if os.path.abspath(old_path).startswith(blob_root + os.sep):
+                summary["already_migrated"] += 1
+                continue
+            if not os.path.exists(old_path):
+                summary["missing_file"] += 1
+                continue
+
+            resume_hash = fingerprint.sha256_file(old_path)
+            size = os.path.getsize(old_path)
+            summary["bytes_before"] += size
+            if resume_hash not in seen_hashes and db.get(blob_store.ResumeBlob, resume_hash) is None:
+                summary["new_blobs"] += 1
+                summary["bytes_after"] += size
+            seen_hashes.add(resume_hash)
+            summary["migrated"] += 1
+            if dry_run:
+                continue
+
+            # Copy first: with the old layout one file may belong to several candidates
+            extension = Path(old_path).suffix.lower()
+            blob_store.INCOMING_DIR.mkdir(parents=True, exist_ok=True)
+            temp_path = blob_store.INCOMING_DIR / f"{uuid.uuid4().hex}{extension}"
+            shutil.copyfile(old_path, temp_path)
+            path = blob_store.ingest_file(db, temp_path, resume_hash, size, extension)
+
+            candidate.resume_filename = candidate.resume_filename or os.path.basename(old_path)
+            candidate.resume_path = str(path)
+            candidate.resume_hash = resume_hash
+            db.commit()
+            migrated_files.add(old_path)
+
+        if not dry_run:
+            blob_store.reconcile_ref_counts(db, sweep_orphans=False)
+
+    if not dry_run and not keep_originals:
+        for old_path in migrated_files:
+            os.remove(old_path)
+            summary["removed_files"] += 1
+
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move existing resumes into the content-addressed blob store.")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be migrated without writing anything")
+    parser.add_argument("--keep-originals", action="store_true", help="Leave the old per-job files in place")
+    args = parser.parse_args()
+    print(migrate(dry_run=args.dry_run, keep_originals=args.keep_originals))
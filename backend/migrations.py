@@ -0,0 +1,211 @@
+# migrations.py
+#
+# Versioned schema migrations. create_all() only creates missing tables, so
+# changes to existing tables (new columns, new indexes) are applied here, in
+# order, and recorded in schema_migrations. Steps must be idempotent: a fresh
+# database already has everything from create_all() and only records them.
+#
+# Run from the backend directory:
+#   python migrations.py              apply pending migrations
+#   python migrations.py --status     show applied/pending versions
+#   python migrations.py --explain    check the hot queries use indexes
+
+import argparse
+import sys
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, text
+
+_migration_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations", _migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String),
+    Column("applied_at", DateTime, default=datetime.utcnow),
+)
+
+def add_missing_columns(conn, metadata: MetaData):
+    """Adds model columns missing from existing tables with ALTER TABLE (they must be nullable)."""
+    inspector = inspect(conn)
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            if column.index:
+                conn.execute(text(
+                    f'CREATE INDEX IF NOT EXISTS ix_{table.name}_{column.name} ON {table.name} ({column.name})'
+                ))
+
+def create_indexes(conn, metadata: MetaData, names: List[str]):
+    """Creates indexes declared on the models, by name, unless they already exist."""
+    declared = {index.name: index for table in metadata.sorted_tables for index in table.indexes}
+    for name in names:
+        if name not in declared:
+            raise ValueError(f"Index {name} is not declared on the models")
+        declared[name].create(conn, checkfirst=True)
+
+def add_columns(conn, metadata: MetaData, table_name: str, names: List[str]):
+    """Adds the named model columns to an existing table unless they are already there."""
+    existing = {col["name"] for col in inspect(conn).get_columns(table_name)}
+    table = metadata.tables[table_name]
+    for name in names:
+        if name not in table.columns:
+            raise ValueError(f"Column {table_name}.{name} is not declared on the models")
+        if name not in existing:
+            column_type = table.columns[name].type.compile(dialect=conn.dialect)
+            conn.execute(text(f'ALTER TABLE {table_name} ADD COLUMN {name} {column_type}'))
+
+def drop_indexes(conn, names: List[str]):
+    for name in names:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+def hot_path_indexes(conn, metadata: MetaData):
+    create_indexes(conn, metadata, ["ix_candidates_job_id_status", "ix_interview_answers_candidate_id_created_at"])
+    # No longer declared on the models: migration 3 replaces it with (job_id, ai_score DESC, id DESC)
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_candidates_job_id_ai_score ON candidates (job_id, ai_score DESC)"))
+
+def keyset_pagination_indexes(conn, metadata: MetaData):
+    # (job_id, ai_score DESC, id DESC) supersedes (job_id, ai_score DESC)
+    create_indexes(conn, metadata, ["ix_candidates_job_id_ai_score_id", "ix_candidates_job_id_created_at_id"])
+    drop_indexes(conn, ["ix_candidates_job_id_ai_score"])
+
+def job_candidate_counters(conn, metadata: MetaData):
+    add_columns(conn, metadata, "candidates", ["interview_stage"])
+    conn.execute(text("UPDATE candidates SET interview_stage = 'Applied' WHERE interview_stage IS NULL"))
+    import job_counters # Needs the models, so only imported once database.py has defined them
+    job_counters.reconcile_counts(conn)
+
+def interview_rollups(conn, metadata: MetaData):
+    add_columns(conn, metadata, "interview_answers", ["weight", "ai_dimensions"])
+    add_columns(conn, metadata, "interview_analyses", [
+        "relevance_score", "clarity_score", "depth_score", "professionalism_score", "totals",
+    ])
+    conn.execute(text("UPDATE interview_answers SET weight = 1.0 WHERE weight IS NULL"))
+    create_indexes(conn, metadata, ["ix_interview_analyses_job_id_overall_score_candidate_id"])
+    from sqlalchemy.orm import Session
+    import interview_rollup # Needs the models, see job_candidate_counters
+    with Session(bind=conn) as db:
+        interview_rollup.rebuild_all(db)
+
+def applicant_index(conn, metadata: MetaData):
+    from sqlalchemy.orm import Session
+    import applicant_index # Needs the models, see job_candidate_counters
+    with Session(bind=conn) as db:
+        applicant_index.rebuild(db)
+        db.flush()
+
+def seed_version_stamps(conn, metadata: MetaData):
+    # Existing jobs start at version 1, so version 0 always means "no such job"
+    conn.execute(text(
+        "INSERT INTO version_stamps (scope, version) SELECT 'job:' || id, 1 FROM jobs "
+        "WHERE 'job:' || id NOT IN (SELECT scope FROM version_stamps)"
+    ))
+    conn.execute(text(
+        "INSERT INTO version_stamps (scope, version) SELECT 'jobs', 1 "
+        "WHERE NOT EXISTS (SELECT 1 FROM version_stamps WHERE scope = 'jobs')"
+    ))
+
+# (version, name, step). Append new steps; never edit or reorder applied ones.
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, "add columns introduced before versioned migrations", add_missing_columns),
+    (2, "candidate and interview answer hot-path indexes", hot_path_indexes),
+    (3, "keyset pagination indexes on candidates", keyset_pagination_indexes),
+    (4, "candidate interview stage and per-job counters", job_candidate_counters),
+    (5, "version stamps for existing jobs", seed_version_stamps),
+    (6, "interview answer question numbers and scores", lambda conn, metadata: add_columns(
+        conn, metadata, "interview_answers", ["question_number", "ai_score"]
+    )),
+    (7, "weighted interview rollups with dimension scores", interview_rollups),
+    (8, "question bank version of interview answers", lambda conn, metadata: add_columns(
+        conn, metadata, "interview_answers", ["question_bank_version"]
+    )),
+    (9, "duplicate applicant index", applicant_index),
+]
+
+def applied_versions(bind) -> set:
+    _migration_metadata.create_all(bind=bind)
+    with bind.connect() as conn:
+        return {row.version for row in conn.execute(schema_migrations.select())}
+
+def upgrade(bind, metadata: MetaData) -> List[int]:
+    """Applies pending migrations, each in its own transaction. Returns the versions applied."""
+    done = applied_versions(bind)
+    applied = []
+    for version, name, step in MIGRATIONS:
+        if version in done:
+            continue
+        with bind.begin() as conn:
+            step(conn, metadata)
+            conn.execute(schema_migrations.insert().values(version=version, name=name, applied_at=datetime.utcnow()))
+        print(f"Applied migration {version}: {name}")
+        applied.append(version)
+    return applied
+
+def hot_queries(db) -> List[Tuple[str, object]]:
+    """The queries behind the dashboard and interview pages, as SQLAlchemy queries."""
+    from sqlalchemy import func, tuple_
+    from database import Candidate, InterviewAnswer
+
+    job_id, candidate_id = "job-id", "candidate-id"
+    return [
+        ("candidates for job", db.query(Candidate).filter(Candidate.job_id == job_id)),
+        ("candidate counts by status", db.query(Candidate.status, func.count(Candidate.id))
+            .filter(Candidate.job_id == job_id).group_by(Candidate.status)),
+        ("candidates ranked by score", db.query(Candidate).filter(Candidate.job_id == job_id)
+            .order_by(Candidate.ai_score.desc()).limit(50)),
+        ("candidates page by score", db.query(Candidate).filter(Candidate.job_id == job_id, Candidate.ai_score.isnot(None))
+            .filter(tuple_(Candidate.ai_score, Candidate.id) < tuple_(50.0, "id"))
+            .order_by(Candidate.ai_score.desc(), Candidate.id.desc()).limit(51)),
+        ("candidates page by date", db.query(Candidate).filter(Candidate.job_id == job_id)
+            .order_by(Candidate.created_at.desc(), Candidate.id.desc()).limit(51)),
+        ("interview answers for candidate", db.query(InterviewAnswer)
+            .filter(InterviewAnswer.candidate_id == candidate_id).order_by(InterviewAnswer.created_at)),
+    ]
+
+def query_plans(bind, db) -> List[Tuple[str, List[str], bool]]:
+    """
+    (label, SQLite query plan steps, ok) for each hot query. A query is not ok if it
+    scans a whole table or sorts with a temporary B-tree instead of using an index.
+    """
+    plans = []
+    for label, query in hot_queries(db):
+        sql = str(query.statement.compile(dialect=bind.dialect, compile_kwargs={"literal_binds": True}))
+        with bind.connect() as conn:
+            plan = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+        bad = [step for step in plan if (step.startswith("SCAN") and "USING" not in step) or "TEMP B-TREE" in step]
+        plans.append((label, plan, not bad))
+    return plans
+
+def explain(bind, db) -> bool:
+    """Prints the hot queries' plans. Returns False if any of them doesn't use an index."""
+    ok = True
+    for label, plan, query_ok in query_plans(bind, db):
+        ok = ok and query_ok
+        print(f"{'ok' if query_ok else 'FULL SCAN':9} {label}: {'; '.join(plan)}")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply and inspect schema migrations.")
+    parser.add_argument("--status", action="store_true", help="List applied and pending migrations")
+    parser.add_argument("--explain", action="store_true", help="Check the hot queries' plans use indexes")
+    args = parser.parse_args()
+
+    # Importing database creates tables and applies pending migrations
+    from database import engine, SessionLocal, Base
+
+    if args.status:
+        done = applied_versions(engine)
+        for version, name, _ in MIGRATIONS:
+            print(f"{'applied' if version in done else 'pending':8} {version}: {name}")
+    elif args.explain:
+        with SessionLocal() as db:
+            sys.exit(0 if explain(engine, db) else 1)
+    else:
+        print(upgrade(engine, Base.metadata) or "Database is up to date")
@@ -20,7 +20,9 @@ class Candidate(Base):
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     job_id = Column(String) # Foreign key implicit
     name = Column(String)
-    email = Column(String, unique=True, index=True)
+    # Not unique: the same person may apply to several jobs (database.Candidate is the
+    # real schema). Repeat applications are detected by applicant_index.py instead.
+    email = Column(String, index=True)
     phone = Column(String, nullable=True)
     resume_path = Column(String) # Path to stored resume file
     extracted_skills = Column(Text, nullable=True)
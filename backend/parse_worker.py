@@ -0,0 +1,209 @@
+# parse_worker.py
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+# Resume parsing is CPU-bound (pdfplumber), so it runs in a separate process pool
+# instead of the API process. All limits can be tuned per deployment.
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(os.cpu_count() or 2)))
+PARSE_TIMEOUT_SECONDS = float(os.getenv("PARSE_TIMEOUT_SECONDS", "30"))
+PARSE_MAX_PAGES = int(os.getenv("PARSE_MAX_PAGES", "20"))
+PARSE_MEMORY_LIMIT_MB = int(os.getenv("PARSE_MEMORY_LIMIT_MB", "1024"))
+PARSE_MAX_CHARS = int(os.getenv("PARSE_MAX_CHARS", "200000"))
+# Extra wait past the timeout before a worker that ignores its own deadline is killed
+PARSE_KILL_GRACE_SECONDS = float(os.getenv("PARSE_KILL_GRACE_SECONDS", "5"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# At most one task per worker process in flight: a submitted parse starts at once,
+# so callers wait here (untimed) rather than in the pool's queue (timed)
+_slots = threading.BoundedSemaphore(PARSE_WORKERS)
+
+class ParseTimeout(Exception):
+    """The parse ran longer than its time limit."""
+
+def _init_worker(memory_limit_mb: int):
+    """Caps the address space of each parsing process (POSIX only)."""
+    try:
+        import resource
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        print(f"Could not set parse worker memory limit: {e}")
+
+def extract_text(resume_path: str, max_pages: int = PARSE_MAX_PAGES, max_chars: int = PARSE_MAX_CHARS) -> str:
+    """
+    Extracts text from a PDF or DOCX file. Runs inside a pool process, so the
+    parsers are imported here rather than in the API process.
+    Raises on unsupported formats or parser errors.
+    """
+    parts = []
+    if resume_path.lower().endswith('.pdf'):
+        import pdfplumber
+        with pdfplumber.open(resume_path) as pdf:
+            for page in pdf.pages[:max_pages]:
+                parts.append(page.extract_text() or "")
+    elif resume_path.lower().endswith(('.doc', '.docx')):
+        import docx
+        doc = docx.Document(resume_path)
+        for paragraph in doc.paragraphs:
+            parts.append(paragraph.text + '\n')
+    else:
+        raise ValueError("Unsupported file format")
+
+    return "".join(parts)[:max_chars]
+
+def _is_hidden_char(char: dict, page_width: float, page_height: float) -> bool:
+    """White (or near-white) fill, a microscopic font, or placed off the page."""
+    color = char.get("non_stroking_color")
+    if isinstance(color, (int, float)):
+        color = (color,)
+    if isinstance(color, (list, tuple)) and color and all(isinstance(c, (int, float)) for c in color):
+        if len(color) == 4: # CMYK: white is no ink
+            white = all(c <= 0.05 for c in color)
+        else: # Gray or RGB
+            white = all(c >= 0.95 for c in color)
+        if white:
+            return True
+    if (char.get("size") or 0) < 1.0:
+        return True
+    return char["x1"] < 0 or char["x0"] > page_width or char["bottom"] < 0 or char["top"] > page_height
+
+def hidden_text_stats(resume_path: str, max_pages: int = PARSE_MAX_PAGES) -> dict:
+    """
+    Counts the visible and hidden characters of a PDF (white text, tiny fonts,
+    text outside the page). Runs inside a pool process like extract_text.
+    """
+    import pdfplumber
+    total, hidden, sample = 0, 0, []
+    with pdfplumber.open(resume_path) as pdf:
+        for page in pdf.pages[:max_pages]:
+            for char in page.chars:
+                if not char.get("text", "").strip():
+                    continue
+                total += 1
+                if _is_hidden_char(char, page.width, page.height):
+                    hidden += 1
+                    if len(sample) < 200:
+                        sample.append(char["text"])
+    return {"chars": total, "hidden": hidden, "sample": "".join(sample)}
+
+def _run_with_deadline(function: Callable, seconds: float, *args):
+    """
+    Runs in the pool process, so the time limit starts when the work does. SIGALRM
+    interrupts the parser in the worker's main thread; the worker process survives.
+    """
+    import signal
+    if not hasattr(signal, "setitimer"): # Windows: only the parent's backstop applies
+        return function(*args)
+
+    def expire(signum, frame):
+        raise ParseTimeout(f"timed out after {seconds:g}s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        return function(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PARSE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(PARSE_MEMORY_LIMIT_MB,)
+            )
+        return _pool
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """Kills a pool whose worker is stuck or dead so the next call starts fresh ones."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    # ProcessPoolExecutor can't cancel a running task, so terminate its processes
+    for process in list(getattr(pool, "_processes", {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _run_in_pool(function: Callable, resume_path: str, timeout: float):
+    """
+    Runs function(resume_path) in the pool with a time limit counted from the start of
+    the work. Raises ParseTimeout, BrokenProcessPool or the function's own error. The
+    pool is only killed if the worker overran its deadline without stopping (stuck in C code).
+    """
+    _slots.acquire()
+    try:
+        pool = _get_pool()
+        future = pool.submit(_run_with_deadline, function, timeout, resume_path)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    try:
+        return future.result(timeout=timeout + PARSE_KILL_GRACE_SECONDS)
+    except FutureTimeoutError:
+        print(f"Parse worker ignored its {timeout:g}s deadline on {resume_path}, restarting parse workers")
+        _discard_pool(pool)
+        raise ParseTimeout(f"timed out after {timeout:g}s")
+
+def parse_resume(resume_path: str, timeout: float = PARSE_TIMEOUT_SECONDS) -> str:
+    """
+    Parses a resume in the worker pool. Like the original in-process parser, failures
+    are reported as an "Error parsing resume: ..." / "Unsupported file format" string.
+    """
+    if not resume_path.lower().endswith(('.pdf', '.doc', '.docx')):
+        print(f"Unsupported file format: {resume_path}")
+        return "Unsupported file format"
+
+    for attempt in range(2):
+        pool = _get_pool()
+        try:
+            return _run_in_pool(extract_text, resume_path, timeout)
+        except ParseTimeout as e:
+            print(f"Parsing {resume_path} {e}")
+            return f"Error parsing resume: {e}"
+        except BrokenProcessPool:
+            # A worker died (memory limit or a stuck worker killed); retry once on a fresh pool
+            _discard_pool(pool)
+            if attempt == 0:
+                continue
+            print(f"Parse worker crashed on {resume_path}")
+            return "Error parsing resume: parser process crashed (file too large or malformed)"
+        except MemoryError:
+            return "Error parsing resume: memory limit exceeded"
+        except Exception as e:
+            print(f"Error parsing {resume_path}: {str(e)}")
+            return f"Error parsing resume: {str(e)}"
+
+def scan_hidden_text(resume_path: str, timeout: float = PARSE_TIMEOUT_SECONDS) -> Optional[dict]:
+    """hidden_text_stats in the worker pool; None for non-PDF files or when the scan fails."""
+    if not resume_path.lower().endswith('.pdf'):
+        return None
+    pool = _get_pool()
+    try:
+        return _run_in_pool(hidden_text_stats, resume_path, timeout)
+    except ParseTimeout:
+        print(f"Hidden text scan of {resume_path} timed out")
+    except BrokenProcessPool:
+        _discard_pool(pool)
+    except Exception as e:
+        print(f"Error scanning {resume_path} for hidden text: {str(e)}")
+    return None
+
+def shutdown():
+    """Stops the worker processes (called on application shutdown)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,180 @@
+# question_bank.py
+#
+# Per-job interview question banks. Questions are generated once from the job's
+# title, description and requirements (by the LLM, or from templates when it is
+# unavailable) and stored as a numbered version in interview_question_banks.
+# Editing those job fields makes the stored bank stale; the next lookup
+# generates a new version, so answers keep pointing at the questions they
+# answered. Lookups are served from an in-process LRU cache, which crud.update_job
+# invalidates.
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import InterviewQuestionBank, Job, SessionLocal
+import llm_client
+
+# Where questions come from: llm (falls back to templates on failure) or template
+QUESTION_BANK_SOURCE = os.getenv("QUESTION_BANK_SOURCE", "llm")
+INTERVIEW_QUESTION_COUNT = int(os.getenv("INTERVIEW_QUESTION_COUNT", "5"))
+QUESTION_BANK_CACHE_MAX_ENTRIES = int(os.getenv("QUESTION_BANK_CACHE_MAX_ENTRIES", "256"))
+
+# Always asked, after the role-specific questions: (text, weight)
+GENERAL_QUESTIONS = [
+    ("Tell me about a time you faced a challenging technical problem and how you solved it.", 1.0),
+    ("Why are you interested in this position and our company?", 0.5),
+]
+SKILL_QUESTION_TEMPLATES = [
+    "Describe your experience with {skill}. What is the most complex thing you have built with it?",
+    "How would you use {skill} to solve a typical problem in this role?",
+    "What are common pitfalls when working with {skill}, and how do you avoid them?",
+]
+
+_cache: "OrderedDict[str, Dict]" = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "generated": 0}
+_invalidations = 0 # A lookup that started before an invalidation must not cache its result
+
+def job_fingerprint(job: Job) -> str:
+    """Changes whenever an edit to the job should change its questions."""
+    source = "\x1f".join(field or "" for field in (job.title, job.description, job.requirements))
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+def _skills(requirements: str) -> List[str]:
+    """Individual requirements, in order, from a comma/line/semicolon separated list."""
+    skills = []
+    for part in re.split(r"[,\n;]", requirements or ""):
+        skill = part.strip(" -*•.\t")
+        if skill and skill.lower() not in (s.lower() for s in skills):
+            skills.append(skill)
+    return skills
+
+def template_questions(job: Job, count: int = INTERVIEW_QUESTION_COUNT) -> List[Dict]:
+    """Role-specific questions from the job's requirements, then the general ones."""
+    role_count = max(count - len(GENERAL_QUESTIONS), 1)
+    skills = _skills(job.requirements) or [job.title or "the key skills required for this role"]
+    texts = [(SKILL_QUESTION_TEMPLATES[i // len(skills) % len(SKILL_QUESTION_TEMPLATES)].format(skill=skills[i % len(skills)]), 1.0)
+             for i in range(role_count)]
+    texts += GENERAL_QUESTIONS[:max(count - role_count, 0)]
+    return [{"number": number, "text": text, "weight": weight} for number, (text, weight) in enumerate(texts, start=1)]
+
+def build_question_prompt(job: Job, count: int = INTERVIEW_QUESTION_COUNT) -> str:
+    return f"""
+        Write {count} interview questions for candidates applying to this job.
+        Focus on the listed requirements; each question must be answerable in a few minutes.
+
+        === INTERVIEW QUESTIONS ===
+        Job title: {job.title}
+        Description: {job.description}
+        Requirements: {job.requirements}
+
+        Provide exactly {count} lines in this format:
+        Question 1: [question]
+        """
+
+def parse_question_response(response_text: str, count: int = INTERVIEW_QUESTION_COUNT) -> List[Dict]:
+    questions = []
+    for line in response_text.split('\n'):
+        match = re.match(r"\s*(?:Question\s*)?\d+\s*[:.)]\s*(.+)", line)
+        if match and match.group(1).strip():
+            questions.append({"number": len(questions) + 1, "text": match.group(1).strip(), "weight": 1.0})
+    return questions[:count]
+
+def generate_questions(job: Job) -> Dict:
+    """{"source", "questions"} for the job, from the LLM if enabled and usable."""
+    if QUESTION_BANK_SOURCE == "llm":
+        try:
+            questions = parse_question_response(llm_client.get_client().generate_sync(build_question_prompt(job)))
+            if len(questions) == INTERVIEW_QUESTION_COUNT:
+                return {"source": "llm", "questions": questions}
+            print(f"Question generation for job {job.id} returned {len(questions)} questions, using templates")
+        except Exception as e:
+            print(f"Error generating interview questions with Gemini: {e}")
+    return {"source": "template", "questions": template_questions(job)}
+
+def _as_entry(bank: InterviewQuestionBank) -> Dict:
+    return {"job_id": bank.job_id, "version": bank.version, "source": bank.source, "questions": json.loads(bank.questions)}
+
+def latest_bank(db: Session, job_id: str) -> Optional[InterviewQuestionBank]:
+    return (db.query(InterviewQuestionBank).filter(InterviewQuestionBank.job_id == job_id)
+            .order_by(InterviewQuestionBank.version.desc()).first())
+
+def ensure_bank(db: Session, job: Job) -> Dict:
+    """The job's current bank, generating and committing a new version if there is none or it is stale."""
+    fingerprint = job_fingerprint(job)
+    bank = latest_bank(db, job.id)
+    if bank is not None and bank.job_fingerprint == fingerprint:
+        return _as_entry(bank)
+
+    generated = generate_questions(job)
+    new_bank = InterviewQuestionBank(
+        job_id=job.id, version=(bank.version + 1) if bank else 1, source=generated["source"],
+        questions=json.dumps(generated["questions"]), job_fingerprint=fingerprint
+    )
+    db.add(new_bank)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another request generated this version first: use theirs
+        db.rollback()
+        return _as_entry(latest_bank(db, job.id))
+    _stats["generated"] += 1
+    print(f"Generated question bank v{new_bank.version} ({new_bank.source}) for job {job.id}")
+    return _as_entry(new_bank)
+
+def get_bank(db: Session, job_id: str) -> Optional[Dict]:
+    """
+    {"job_id", "version", "source", "questions"} for the job, or None if there is
+    no such job. Cached: after the first lookup this is a dictionary read.
+    """
+    with _lock:
+        entry = _cache.get(job_id)
+        if entry is not None:
+            _cache.move_to_end(job_id)
+            _stats["hits"] += 1
+            return entry
+        _stats["misses"] += 1
+        invalidations = _invalidations
+
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if job is None:
+        return None
+    entry = ensure_bank(db, job)
+    with _lock:
+        if invalidations != _invalidations:
+            return entry
+        _cache[job_id] = entry
+        while len(_cache) > QUESTION_BANK_CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return entry
+
+def get_questions(db: Session, job_id: str) -> List[Dict]:
+    bank = get_bank(db, job_id)
+    return bank["questions"] if bank else []
+
+def invalidate(job_id: str):
+    """Drops the job's cached bank, e.g. after its requirements were edited."""
+    global _invalidations
+    with _lock:
+        _invalidations += 1
+        _cache.pop(job_id, None)
+
+def warm(job_id: str):
+    """Generates and caches the job's bank in its own session (run after job create/edit responses)."""
+    try:
+        with SessionLocal() as db:
+            get_bank(db, job_id)
+    except Exception as e:
+        print(f"Error preparing interview questions for job {job_id}: {e}")
+
+def stats() -> Dict:
+    with _lock:
+        return {**_stats, "entries": len(_cache)}
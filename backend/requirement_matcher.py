@@ -0,0 +1,95 @@
+# requirement_matcher.py
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Sequence
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from database import Candidate, ParsedResume
+
+TOKEN_PATTERN = re.compile(r'\b\w+\b')
+
+def tokenize(text: str) -> set:
+    """Lowercased word set, same tokenization as simple_text_similarity."""
+    return set(TOKEN_PATTERN.findall(text.lower()))
+
+def split_requirements(job_requirements: str) -> List[str]:
+    """Splits requirements into individual skills/requirements (simple comma split)."""
+    return [req.strip() for req in job_requirements.split(',') if req.strip()]
+
+class RequirementMatcher:
+    """
+    Scores resumes against a fixed set of requirements with the same metric as
+    compare_resume_to_job (mean Jaccard similarity per requirement), but each
+    resume is tokenized once and all requirements are scored in one matrix product.
+
+    Only requirement words can contribute to an intersection, so the vocabulary is
+    limited to them; the rest of a resume only matters through its word count.
+    """
+
+    def __init__(self, job_requirements: str):
+        self.requirements = split_requirements(job_requirements)
+        requirement_tokens = [tokenize(req) for req in self.requirements]
+
+        vocabulary = sorted(set().union(*requirement_tokens)) if requirement_tokens else []
+        self.vocabulary: Dict[str, int] = {token: index for index, token in enumerate(vocabulary)}
+
+        # requirements x vocabulary incidence matrix
+        self.requirement_matrix = np.zeros((len(self.requirements), len(vocabulary)), dtype=np.float32)
+        for row, tokens in enumerate(requirement_tokens):
+            self.requirement_matrix[row, [self.vocabulary[token] for token in tokens]] = 1.0
+        self.requirement_sizes = self.requirement_matrix.sum(axis=1)
+
+    def encode(self, resume_texts: Sequence[str]):
+        """Returns (resumes x vocabulary incidence matrix, total distinct words per resume)."""
+        hits = np.zeros((len(resume_texts), len(self.vocabulary)), dtype=np.float32)
+        sizes = np.zeros(len(resume_texts), dtype=np.float32)
+        for row, text in enumerate(resume_texts):
+            tokens = tokenize(text or "")
+            sizes[row] = len(tokens)
+            columns = [self.vocabulary[token] for token in tokens if token in self.vocabulary]
+            if columns:
+                hits[row, columns] = 1.0
+        return hits, sizes
+
+    def score(self, resume_texts: Sequence[str]) -> np.ndarray:
+        """Mean Jaccard similarity of every resume against all requirements, shape (n,)."""
+        if not self.requirements or len(resume_texts) == 0:
+            return np.zeros(len(resume_texts), dtype=np.float32)
+
+        hits, sizes = self.encode(resume_texts)
+        intersection = hits @ self.requirement_matrix.T # resumes x requirements
+        union = sizes[:, None] + self.requirement_sizes[None, :] - intersection
+        similarity = np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+        return similarity.mean(axis=1)
+
+@lru_cache(maxsize=256)
+def get_matcher(job_requirements: str) -> RequirementMatcher:
+    """Matchers are immutable, so one per distinct requirements string is reused."""
+    return RequirementMatcher(job_requirements)
+
+def rank_candidates_for_job(db: Session, job_id: str, job_requirements: str, limit: int = None) -> List[Dict]:
+    """
+    Ranks every candidate of a job by local requirement match, using resume text
+    already stored in parsed_resumes (no parsing or LLM calls).
+    """
+    rows = db.query(Candidate.id, Candidate.name, Candidate.ai_score, ParsedResume.text).join(
+        ParsedResume, ParsedResume.content_hash == Candidate.resume_hash
+    ).filter(Candidate.job_id == job_id).all()
+
+    scores = get_matcher(job_requirements).score([row.text for row in rows])
+    order = np.argsort(-scores, kind="stable")
+    if limit:
+        order = order[:limit]
+
+    return [
+        {
+            "candidate_id": rows[i].id,
+            "name": rows[i].name,
+            "match_score": round(float(scores[i]), 4),
+            "ai_score": rows[i].ai_score
+        }
+        for i in order
+    ]
@@ -0,0 +1,78 @@
+# response_cache.py
+#
+# In-process LRU cache of serialized JSON responses, keyed by route, parameters
+# and the version stamp of the data they show, with ETag / If-None-Match support.
+# A changed version means a new key, so entries never need invalidating; stale
+# ones simply fall out of the LRU.
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, Request, Response
+from pydantic import TypeAdapter
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+
+_entries: "OrderedDict[str, bytes]" = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "not_modified": 0}
+_adapters = {}
+
+def _adapter(schema) -> TypeAdapter:
+    # TypeAdapter construction is not free, so one per response schema
+    if schema not in _adapters:
+        _adapters[schema] = TypeAdapter(schema)
+    return _adapters[schema]
+
+def make_etag(key: str, version: int) -> str:
+    return '"' + hashlib.sha1(f"{key}|{version}".encode("utf-8")).hexdigest()[:20] + '"'
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+def cached_json(request: Request, key: str, version: int, schema, build: Callable[[], Any],
+                not_found: Optional[str] = None) -> Response:
+    """
+    Returns 304 if the client already has this version, otherwise the cached body or
+    `build()` validated against `schema` (same output as a response_model) and cached.
+    With `not_found`, version 0 means the resource doesn't exist: 404 with that detail,
+    before If-None-Match is looked at (so "*" only matches existing resources).
+    """
+    if not_found is not None and version == 0:
+        raise HTTPException(status_code=404, detail=not_found)
+    etag = make_etag(key, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"} # Clients revalidate on every request
+    if _matches(request, etag):
+        _stats["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+
+    cache_key = f"{key}|{version}"
+    with _lock:
+        body = _entries.get(cache_key)
+        if body is not None:
+            _entries.move_to_end(cache_key)
+            _stats["hits"] += 1
+    if body is None:
+        _stats["misses"] += 1
+        adapter = _adapter(schema)
+        body = adapter.dump_json(adapter.validate_python(build(), from_attributes=True))
+        with _lock:
+            _entries[cache_key] = body
+            while len(_entries) > RESPONSE_CACHE_MAX_ENTRIES:
+                _entries.popitem(last=False)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def stats() -> dict:
+    with _lock:
+        return {**_stats, "entries": len(_entries), "max_entries": RESPONSE_CACHE_MAX_ENTRIES}
+
+def clear():
+    with _lock:
+        _entries.clear()
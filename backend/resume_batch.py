@@ -0,0 +1,237 @@
+# resume_batch.py
+
+import asyncio
+import os
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+import ai_processing
+import fingerprint
+import screening
+import uploads
+
+# Default number of resumes analyzed at the same time in one batch.
+# Can be overridden per deployment with the AI_BATCH_CONCURRENCY env var.
+DEFAULT_CONCURRENCY = int(os.getenv("AI_BATCH_CONCURRENCY", "8"))
+MAX_CONCURRENCY = 32
+
+def resolve_concurrency(requested: Optional[int]) -> int:
+    """Clamps the requested concurrency to a sane range."""
+    if not requested or requested < 1:
+        return DEFAULT_CONCURRENCY
+    return min(requested, MAX_CONCURRENCY)
+
+async def save_uploads(files: List[UploadFile], batch_dir: Path) -> List[Tuple[str, Path]]:
+    """Writes every uploaded file into the batch directory before analysis starts."""
+    saved = []
+    for index, file in enumerate(files):
+        # Prefix with the index so two uploads with the same name don't clash
+        stored = await uploads.save_upload(file, batch_dir, f"{index}_{uploads.safe_filename(file.filename)}")
+        saved.append((file.filename, stored.path))
+    return saved
+
+def _flagged_result(filename: str, result: screening.ScreeningResult) -> Dict:
+    return {
+        "filename": filename,
+        "score": None, # Not sent to the LLM
+        "analysis": result.describe(),
+        "status": ai_processing.determine_ai_status(0.0, True)
+    }
+
+def _screen_file(file_path: Path, requirements: str, resume_text: Optional[str] = None) -> Optional[screening.ScreeningResult]:
+    """Screening result for a parsed file, or None when it could not be parsed (analysis reports that)."""
+    if resume_text is None:
+        resume_text = ai_processing.load_resume_text(str(file_path))
+    if ai_processing.is_parse_failure(resume_text):
+        return None
+    return screening.screen(resume_text, requirements, str(file_path))
+
+def _analyze_file(filename: str, file_path: Path, requirements: str) -> Dict:
+    """Blocking analysis of a single file, meant to run in a worker thread."""
+    try:
+        result = _screen_file(file_path, requirements)
+        if result is not None and result.flagged:
+            return _flagged_result(filename, result)
+        ai_score, ai_analysis = ai_processing.analyze_resume(str(file_path), requirements)
+        return {
+            "filename": filename,
+            "score": ai_score,
+            "analysis": ai_analysis,
+            "status": ai_processing.determine_ai_status(ai_score, False)
+        }
+    except Exception as e:
+        # Log error for this specific file but continue with others
+        print(f"Error processing file {filename}: {e}")
+        return {
+            "filename": filename,
+            "score": None, # Indicate failure
+            "analysis": f"Failed to process file: {e}",
+            "status": "Failed"
+        }
+    finally:
+        # Clean up the temporary file immediately after processing
+        if file_path.exists():
+            os.remove(file_path)
+
+def _analyze_file_group(files: List[Tuple[str, Path, str, str]], requirements: str) -> List[Dict]:
+    """Blocking batched analysis of (filename, path, hash, text) entries with one LLM request."""
+    try:
+        results, to_analyze = [], []
+        for entry in files:
+            filename, file_path, _, resume_text = entry
+            screened = _screen_file(file_path, requirements, resume_text)
+            if screened is not None and screened.flagged:
+                results.append(_flagged_result(filename, screened))
+            else:
+                to_analyze.append(entry)
+        analyses = ai_processing.analyze_resume_batch(
+            [(str(file_path), resume_hash, resume_text) for _, file_path, resume_hash, resume_text in to_analyze],
+            requirements
+        ) if to_analyze else []
+        return results + [
+            {
+                "filename": filename,
+                "score": ai_score,
+                "analysis": ai_analysis,
+                "status": ai_processing.determine_ai_status(ai_score, False)
+            }
+            for (filename, _, _, _), (ai_score, ai_analysis) in zip(to_analyze, analyses)
+        ]
+    except Exception as e:
+        print(f"Error processing batch of {len(files)} files: {e}")
+        return [
+            {"filename": filename, "score": None, "analysis": f"Failed to process file: {e}", "status": "Failed"}
+            for filename, _, _, _ in files
+        ]
+    finally:
+        for _, file_path, _, _ in files:
+            if file_path.exists():
+                os.remove(file_path)
+
+def _load_file(file_path: Path) -> Tuple[str, str]:
+    """Hashes and parses one file (blocking). Returns (resume hash, resume text)."""
+    resume_hash = fingerprint.sha256_file(str(file_path))
+    return resume_hash, ai_processing.load_resume_text(str(file_path), resume_hash)
+
+async def load_files(saved_files: List[Tuple[str, Path]], concurrency: int) -> List[Tuple[str, str]]:
+    """Parses all files concurrently; the text is stored so later steps don't re-parse."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def load_one(file_path: Path) -> Tuple[str, str]:
+        async with semaphore:
+            return await run_in_threadpool(_load_file, file_path)
+
+    return await asyncio.gather(*(load_one(path) for _, path in saved_files))
+
+async def prerank_files(
+    saved_files: List[Tuple[str, Path]],
+    requirements: str,
+    top_k: int,
+    concurrency: int
+) -> Tuple[List[Tuple[str, Path]], List[Dict], Dict[str, float]]:
+    """
+    Local semantic pre-ranking: parses every file, embeds it and keeps the
+    `top_k` closest to the requirements.
+    Returns (files to send to the LLM, results for the files left out, prerank scores).
+    """
+    import semantic_index # Imported on first use: it pulls in numpy
+
+    loaded = await load_files(saved_files, concurrency)
+    texts = ["" if ai_processing.is_parse_failure(text) else text for _, text in loaded]
+    similarities = await run_in_threadpool(semantic_index.rank_texts, texts, requirements)
+
+    order = sorted(range(len(saved_files)), key=lambda i: -similarities[i])
+    prerank_scores = {str(saved_files[i][1]): round(float(similarities[i]), 4) for i in order}
+    selected = [saved_files[i] for i in order[:top_k]]
+    skipped = []
+    for i in order[top_k:]:
+        filename, file_path = saved_files[i]
+        skipped.append({
+            "filename": filename,
+            "score": None,
+            "analysis": "Not sent for AI analysis: ranked below the top candidates by local pre-ranking.",
+            "status": "Not Shortlisted",
+            "prerank_score": prerank_scores[str(file_path)]
+        })
+    return selected, skipped, prerank_scores
+
+async def iter_batch_results(
+    saved_files: List[Tuple[str, Path]],
+    requirements: str,
+    concurrency: int,
+    top_k: Optional[int] = None,
+    batched: bool = False
+) -> AsyncIterator[Dict]:
+    """
+    Analyzes saved resumes with at most `concurrency` LLM requests in flight and
+    yields each result as soon as it is ready (completion order, not upload order).
+    Parsing and the LLM call are blocking, so they run in the threadpool.
+    With `top_k`, only the best pre-ranked files go to the LLM; the rest are
+    yielded last with status "Not Shortlisted". With `batched`, several resumes
+    share one LLM request (results of a group are yielded together).
+    """
+    skipped, prerank_scores = [], {}
+    if top_k and top_k < len(saved_files):
+        saved_files, skipped, prerank_scores = await prerank_files(saved_files, requirements, top_k, concurrency)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    def with_prerank(results: List[Dict], file_paths: List[Path]) -> List[Dict]:
+        if prerank_scores:
+            for result, file_path in zip(results, file_paths):
+                result["prerank_score"] = prerank_scores[str(file_path)]
+        return results
+
+    async def run_one(filename: str, file_path: Path) -> List[Dict]:
+        async with semaphore:
+            result = await run_in_threadpool(_analyze_file, filename, file_path, requirements)
+        return with_prerank([result], [file_path])
+
+    async def run_group(group: List[Tuple[str, Path, str, str]]) -> List[Dict]:
+        async with semaphore:
+            results = await run_in_threadpool(_analyze_file_group, group, requirements)
+        return with_prerank(results, [file_path for _, file_path, _, _ in group])
+
+    if batched:
+        loaded = await load_files(saved_files, concurrency)
+        entries = [(name, path, resume_hash, text) for (name, path), (resume_hash, text) in zip(saved_files, loaded)]
+        groups = ai_processing.plan_resume_batches([text for _, _, _, text in entries])
+        tasks = [asyncio.ensure_future(run_group([entries[i] for i in group])) for group in groups]
+    else:
+        tasks = [asyncio.ensure_future(run_one(name, path)) for name, path in saved_files]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            for result in await next_done:
+                yield result
+        for result in skipped:
+            yield result
+    finally:
+        # If the consumer stops early (e.g. client disconnect), don't leave work running
+        for task in tasks:
+            task.cancel()
+
+def rank_results(results: List[Dict]) -> List[Dict]:
+    """
+    Ranks results by score (descending), putting failed ones at the end.
+    Candidates with higher scores appear first. None scores (failures and files
+    skipped by pre-ranking) go to the end, ordered by their pre-rank score.
+    """
+    return sorted(results, key=lambda x: (
+        x['score'] is not None,
+        x['score'] if x['score'] is not None else -1,
+        x.get('prerank_score', -1)
+    ), reverse=True)
+
+async def analyze_batch(
+    saved_files: List[Tuple[str, Path]],
+    requirements: str,
+    concurrency: int,
+    top_k: Optional[int] = None,
+    batched: bool = False
+) -> List[Dict]:
+    """Runs the whole batch concurrently and returns the ranked list."""
+    results = [result async for result in iter_batch_results(saved_files, requirements, concurrency, top_k, batched)]
+    return rank_results(results)
@@ -0,0 +1,29 @@
+# resume_text_store.py
+
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from database import SessionLocal, ParsedResume
+
+def lookup(content_hash: str) -> Optional[str]:
+    """Returns previously extracted text for a resume file hash, if any."""
+    with SessionLocal() as db:
+        parsed = db.get(ParsedResume, content_hash)
+        return parsed.text if parsed else None
+
+def save(content_hash: str, resume_text: str):
+    """Persists extracted text for a resume file hash (first writer wins)."""
+    with SessionLocal() as db:
+        if db.get(ParsedResume, content_hash) is not None:
+            return
+        db.add(ParsedResume(
+            content_hash=content_hash,
+            text=resume_text,
+            char_count=len(resume_text)
+        ))
+        try:
+            db.commit()
+        except IntegrityError:
+            # Parsed concurrently by another worker
+            db.rollback()
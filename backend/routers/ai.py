@@ -1,7 +1,14 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException, Form
-from typing import List, Dict, Any
-import ai_processing
-import os
+from fastapi import APIRouter, File, UploadFile, HTTPException, Form, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from database import get_db
+from typing import List, Dict, Any, Optional
+import resume_batch
+import analysis_cache
+import task_queue
+import llm_client
+import crud
+import json
 from pathlib import Path
 import uuid
 import shutil
@@ -16,56 +23,153 @@ TEMP_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 @router.post("/analyze-resumes")
 async def analyze_multiple_resumes(
     requirements: str = Form(...), # Add requirements as a form field
-    files: List[UploadFile] = File(...)
+    files: List[UploadFile] = File(...),
+    concurrency: Optional[int] = Form(None), # Max resumes analyzed at the same time
+    top_k: Optional[int] = Form(None, ge=1), # Only send the best K pre-ranked resumes to the LLM
+    batched: bool = Form(False) # Pack several resumes into each LLM request
 ):
     """
     Receives job requirements and multiple resume files, analyzes them using AI
     based on the requirements, and returns a list of analysis results ranked by AI score.
+    Files are analyzed concurrently (bounded by `concurrency`) off the event loop.
     """
-    results = []
     temp_batch_dir = TEMP_UPLOAD_DIR / str(uuid.uuid4()) # Use a temporary ID for this session
     temp_batch_dir.mkdir(exist_ok=True)
 
     try:
-        for file in files:
-            file_path = temp_batch_dir / file.filename
-            try:
-                # Save the file temporarily
-                with open(file_path, "wb") as f:
-                    content = await file.read()
-                    f.write(content)
-
-                # Analyze the resume with requirements
-                ai_score, ai_analysis = ai_processing.analyze_resume(str(file_path), requirements)
-
-                results.append({
-                    "filename": file.filename,
-                    "score": ai_score,
-                    "analysis": ai_analysis,
-                    "status": ai_processing.determine_ai_status(ai_score, False) # Add AI status based on score
-                })
-
-            except Exception as e:
-                # Log error for this specific file but continue with others
-                print(f"Error processing file {file.filename}: {e}")
-                results.append({
-                    "filename": file.filename,
-                    "score": None, # Indicate failure
-                    "analysis": f"Failed to process file: {e}",
-                    "status": "Failed"
-                })
-            finally:
-                # Clean up the temporary file immediately after processing
-                if file_path.exists():
-                    os.remove(file_path)
-
-        # Rank the results by score (descending), putting failed ones at the end
-        # Candidates with higher scores appear first. None scores (failures) go to the end.
-        ranked_results = sorted(results, key=lambda x: (x['score'] is not None, x['score'] if x['score'] is not None else -1), reverse=True)
-
-        return ranked_results
+        saved_files = await resume_batch.save_uploads(files, temp_batch_dir)
+        return await resume_batch.analyze_batch(
+            saved_files,
+            requirements,
+            resume_batch.resolve_concurrency(concurrency),
+            top_k,
+            batched
+        )
 
     finally:
         # Clean up the temporary batch directory after all files are processed
         if temp_batch_dir.exists():
-            shutil.rmtree(temp_batch_dir) 
\ No newline at end of file
+            shutil.rmtree(temp_batch_dir)
+
+def _format_event(event: str, payload: Dict[str, Any], stream_format: str) -> str:
+    """Serializes one stream event as an NDJSON line or a Server-Sent Event."""
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+    return json.dumps({"event": event, **payload}) + "\n"
+
+@router.post("/analyze-resumes/stream")
+async def analyze_multiple_resumes_stream(
+    requirements: str = Form(...),
+    files: List[UploadFile] = File(...),
+    concurrency: Optional[int] = Form(None),
+    top_k: Optional[int] = Form(None, ge=1),
+    batched: bool = Form(False),
+    stream_format: str = Form("ndjson") # "ndjson" or "sse"
+):
+    """
+    Streaming variant of /analyze-resumes. Emits a `result` event for each file as
+    soon as it is analyzed, followed by a final `summary` event with the ranked list.
+    """
+    if stream_format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="stream_format must be 'ndjson' or 'sse'")
+
+    temp_batch_dir = TEMP_UPLOAD_DIR / str(uuid.uuid4())
+    temp_batch_dir.mkdir(exist_ok=True)
+
+    # Save everything up front: the uploaded files are closed once this handler returns
+    try:
+        saved_files = await resume_batch.save_uploads(files, temp_batch_dir)
+    except Exception:
+        shutil.rmtree(temp_batch_dir, ignore_errors=True)
+        raise
+
+    async def event_stream():
+        results = []
+        try:
+            async for result in resume_batch.iter_batch_results(
+                saved_files,
+                requirements,
+                resume_batch.resolve_concurrency(concurrency),
+                top_k,
+                batched
+            ):
+                results.append(result)
+                yield _format_event("result", result, stream_format)
+
+            yield _format_event("summary", {
+                "total": len(results),
+                "failed": sum(1 for r in results if r["status"] == "Failed"),
+                "ranked": resume_batch.rank_results(results)
+            }, stream_format)
+        finally:
+            shutil.rmtree(temp_batch_dir, ignore_errors=True)
+
+    media_type = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        event_stream(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/cache/stats")
+def get_analysis_cache_stats():
+    """Hit/miss counters and size of the resume analysis cache."""
+    return analysis_cache.stats()
+
+@router.delete("/cache")
+def clear_analysis_cache():
+    """Drops every cached resume analysis (e.g. after changing scoring rules)."""
+    return {"deleted": analysis_cache.clear()}
+
+@router.get("/queue/stats")
+def get_scoring_queue_stats(db: Session = Depends(get_db)):
+    """Number of background resume scoring tasks in each state."""
+    return task_queue.queue_stats(db)
+
+@router.get("/match/{job_id}")
+def rank_candidates_by_requirements(job_id: str, limit: Optional[int] = Query(None, ge=1), db: Session = Depends(get_db)):
+    """
+    Ranks all candidates of a job by local requirement matching on their stored
+    resume text. No LLM calls, so it is cheap enough for thousands of applicants.
+    """
+    job = crud.get_job(db, job_id=job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    import requirement_matcher # Imported on first use: it pulls in numpy
+    return requirement_matcher.rank_candidates_for_job(db, job_id, job.requirements or "", limit)
+
+@router.get("/prerank/{job_id}")
+def prerank_candidates(job_id: str, top_k: int = Query(20, ge=1), db: Session = Depends(get_db)):
+    """
+    Top-K candidates of a job by embedding similarity to the job requirements,
+    served from the job's on-disk vector index. Use it to pick who gets a full LLM review.
+    """
+    job = crud.get_job(db, job_id=job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    import semantic_index
+    return semantic_index.JobVectorIndex(job_id).search(job.requirements or "", top_k)
+
+@router.post("/prerank/{job_id}/rebuild")
+def rebuild_prerank_index(job_id: str, db: Session = Depends(get_db)):
+    """Rebuilds a job's vector index from stored resume text (e.g. after changing the embedder)."""
+    job = crud.get_job(db, job_id=job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    import semantic_index
+    return {"indexed": semantic_index.rebuild_job_index(db, job_id)}
+
+@router.get("/llm/stats")
+def get_llm_client_stats():
+    """
+    Request, retry and failure counters plus circuit breaker state of the shared LLM
+    client; `"configured": false` with the reason when no provider can be set up.
+    """
+    try:
+        client = llm_client.get_client()
+    except (llm_client.LLMError, ImportError) as e: # Unknown provider, missing API key or SDK
+        return {"configured": False, "provider": llm_client.LLM_PROVIDER, "error": str(e)}
+    return {"configured": True, "provider": llm_client.LLM_PROVIDER, **client.get_stats()}
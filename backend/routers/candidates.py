@@ -1,20 +1,25 @@
 # routers/candidates.py
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Union
 import crud
 import schemas
 from database import get_db
-import ai_processing
-import os
-from pathlib import Path
+import task_queue
+import blob_store
 
 router = APIRouter()
 
-# Define upload directory
-UPLOAD_DIR = Path("backend/static/resumes")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+def _create_application(db: Session, candidate: schemas.CandidateCreate, stored: blob_store.StoredBlob):
+    """Creates the candidate for a stored resume and queues its scoring (blocking DB work)."""
+    db_candidate = crud.create_candidate(
+        db=db, candidate=candidate, resume_path=str(stored.path), resume_hash=stored.sha256,
+        ai_status="Pending", resume_filename=stored.filename
+    )
+    task_queue.enqueue_scoring(db, db_candidate.id)
+    return db_candidate
 
 # Endpoint to create a candidate (might be used internally or by HR)
 @router.post("/", response_model=schemas.Candidate)
@@ -26,38 +31,16 @@ async def create_candidate_internal(
     # This endpoint is kept for potential internal use, but application submission
     # should go through the /apply/{job_id} endpoint below.
 
-    # Verify job exists
-    job = crud.get_job(db, job_id=candidate.job_id)
+    # Verify job exists (DB work runs in the thread pool, off the event loop)
+    job = await run_in_threadpool(crud.get_job, db, candidate.job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    # Create job-specific directory
-    job_dir = UPLOAD_DIR / candidate.job_id
-    job_dir.mkdir(exist_ok=True)
-    
-    # Save resume
-    resume_path = job_dir / resume.filename
-    with open(resume_path, "wb") as f:
-        content = await resume.read()
-        f.write(content)
-    
-    # Create candidate
-    db_candidate = crud.create_candidate(db=db, candidate=candidate)
+    # Stream the resume into the content-addressed store
+    stored = await blob_store.save_upload(db, resume)
     
-    try:
-        # Process resume with AI
-        ai_score, ai_analysis = ai_processing.analyze_resume(str(resume_path))
-        crud.update_candidate_ai_analysis(
-            db=db,
-            candidate_id=db_candidate.id,
-            ai_score=ai_score,
-            ai_analysis=ai_analysis
-        )
-    except Exception as e:
-        # Log error but continue
-        print(f"Error processing resume: {str(e)}")
-    
-    return db_candidate
+    # Create candidate; AI scoring happens in the background task queue
+    return await run_in_threadpool(_create_application, db, candidate, stored)
 
 # Endpoint for candidates to apply for a specific job
 @router.post("/apply/{job_id}", response_model=schemas.Candidate)
@@ -69,21 +52,17 @@ async def apply_for_job_endpoint(
     resume: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
-    # Verify job exists
-    job = crud.get_job(db, job_id=job_id)
+    # Verify job exists (DB work runs in the thread pool, off the event loop)
+    job = await run_in_threadpool(crud.get_job, db, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    # Create job-specific directory
-    job_dir = UPLOAD_DIR / job_id
-    job_dir.mkdir(exist_ok=True)
-    
-    # Save resume
-    resume_path = job_dir / resume.filename
+    # Stream the resume into the content-addressed store (hashed while writing);
+    # identical files from other applications are stored only once
     try:
-        with open(resume_path, "wb") as f:
-            content = await resume.read()
-            f.write(content)
+        stored = await blob_store.save_upload(db, resume)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save resume file: {e}")
     
@@ -92,29 +71,34 @@ async def apply_for_job_endpoint(
         name=name,
         email=email,
         phone=phone,
-        resume_path=str(resume_path), # Store the path in the database
         job_id=job_id
     )
 
-    # Create candidate in DB
-    db_candidate = crud.create_candidate(db=db, candidate=candidate_create)
-    
-    try:
-        # Process resume with AI
-        ai_score, ai_analysis = ai_processing.analyze_resume(str(resume_path))
-        crud.update_candidate_ai_analysis(
-            db=db,
-            candidate_id=db_candidate.id,
-            ai_score=ai_score,
-            ai_analysis=ai_analysis
-        )
-    except Exception as e:
-        # Log error but continue, maybe set a status indicating AI processing failed
-        print(f"Error processing resume for candidate {db_candidate.id}: {str(e)}")
-        # Optionally update candidate status to indicate processing failed
-        # crud.update_candidate_status(db, db_candidate.id, "AI Processing Failed")
-    
-    return db_candidate
+    # Create candidate in DB, storing the resume path and content hash, and score the
+    # resume in the background so the applicant doesn't wait on the LLM. The worker
+    # retries with backoff and sets ai_status once the analysis is stored.
+    return await run_in_threadpool(_create_application, db, candidate_create, stored)
+
+@router.get("/duplicates", response_model=List[schemas.DuplicateApplicant])
+def find_duplicate_applicants(email: Optional[str] = None, phone: Optional[str] = None, db: Session = Depends(get_db)):
+    """Has this person applied before (to any job)? Matches normalized email and phone."""
+    if not email and not phone:
+        raise HTTPException(status_code=400, detail="Pass email and/or phone")
+    return crud.find_duplicate_applicants(db, email=email, phone=phone)
+
+# Bulk endpoints are declared before the /{candidate_id} routes so "bulk" isn't taken as an id
+@router.post("/bulk", response_model=schemas.BulkResult)
+def bulk_create_candidates(payload: schemas.CandidateBulkCreate, db: Session = Depends(get_db)):
+    """Imports candidates without resumes (e.g. from an ATS export); one outcome per row."""
+    return schemas.BulkResult.from_results(crud.bulk_create_candidates(db, payload.candidates))
+
+@router.put("/bulk/status", response_model=schemas.BulkResult)
+def bulk_update_candidate_status(payload: schemas.CandidateBulkStatusUpdate, db: Session = Depends(get_db)):
+    return schemas.BulkResult.from_results(crud.bulk_update_candidate_status(db, payload.updates))
+
+@router.put("/bulk/ai-analysis", response_model=schemas.BulkResult)
+def bulk_update_candidate_ai_analysis(payload: schemas.CandidateBulkAIUpdate, db: Session = Depends(get_db)):
+    return schemas.BulkResult.from_results(crud.bulk_update_candidate_ai_analysis(db, payload.updates))
 
 @router.get("/job/{job_id}", response_model=List[schemas.Candidate])
 def read_candidates_for_job(job_id: str, db: Session = Depends(get_db)):
@@ -125,6 +109,37 @@ def read_candidates_for_job(job_id: str, db: Session = Depends(get_db)):
     
     return crud.get_candidates_for_job(db=db, job_id=job_id)
 
+@router.get("/job/{job_id}/page", response_model=Union[schemas.CandidatePage, schemas.CandidateSummaryPage])
+def read_candidates_page(
+    job_id: str,
+    sort: str = Query("ai_score", description="ai_score or created_at, descending"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    status: Optional[str] = None,
+    ai_status: Optional[str] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    include_analysis: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Paginated candidates for a job; leaves out the AI analysis text unless include_analysis
+    is set. Serialized with the page model of the view, so neither view borrows the other's fields.
+    """
+    job = crud.get_job(db, job_id=job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    try:
+        rows, next_cursor = crud.get_candidates_page(
+            db, job_id, sort=sort, cursor=cursor, limit=limit, status=status, ai_status=ai_status,
+            min_score=min_score, max_score=max_score, include_analysis=include_analysis
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page = schemas.candidate_page(rows, next_cursor, limit, include_analysis)
+    return Response(content=page.model_dump_json(), media_type="application/json")
+
 @router.get("/{candidate_id}", response_model=schemas.Candidate)
 def read_candidate(candidate_id: str, db: Session = Depends(get_db)):
     candidate = crud.get_candidate(db, candidate_id=candidate_id)
@@ -132,6 +147,14 @@ def read_candidate(candidate_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Candidate not found")
     return candidate
 
+@router.get("/{candidate_id}/duplicates", response_model=List[schemas.DuplicateApplicant])
+def read_candidate_duplicates(candidate_id: str, db: Session = Depends(get_db)):
+    """Earlier applications (any job) by the same person or with a near-identical resume."""
+    candidate = crud.get_candidate(db, candidate_id=candidate_id)
+    if candidate is None:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    return crud.get_candidate_duplicates(db, candidate)
+
 @router.put("/{candidate_id}/status")
 def update_candidate_status(
     candidate_id: str,
@@ -1,10 +1,20 @@
 # routers/dashboard.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from typing import Optional, Union
+import asyncio
+import json
 import crud
+import events
+import interview_rollup
+import job_counters
+import response_cache
 import schemas
-from database import get_db
+import version_stamps
+from database import get_db, SessionLocal
 
 router = APIRouter()
 
@@ -20,25 +30,190 @@ def test_dashboard():
     }
 
 @router.get("/job/{job_id}", response_model=schemas.JobDashboard)
-def get_job_dashboard(job_id: str, db: Session = Depends(get_db)):
-    # Get job details
+def get_job_dashboard(job_id: str, request: Request, db: Session = Depends(get_db)):
+    def build():
+        # Get job details
+        job = crud.get_job(db, job_id=job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        # Get candidates for this job
+        candidates = crud.get_candidates_for_job(db, job_id=job_id)
+        
+        return {
+            "job": job,
+            "candidates": candidates
+        }
+
+    # Polling clients get 304 (or a cached body) until something in the job changes
+    version = version_stamps.current(db, version_stamps.job_scope(job_id))
+    return response_cache.cached_json(
+        request, f"dashboard:{job_id}", version, schemas.JobDashboard, build, not_found="Job not found"
+    )
+
+@router.get("/job/{job_id}/candidates", response_model=Union[schemas.JobDashboardPage, schemas.JobDashboardSummaryPage])
+def get_job_dashboard_page(
+    job_id: str,
+    sort: str = Query("ai_score", description="ai_score or created_at, descending"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    status: Optional[str] = None,
+    ai_status: Optional[str] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    include_analysis: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Paginated version of the job dashboard, for jobs with many applicants."""
     job = crud.get_job(db, job_id=job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    
-    # Get candidates for this job
-    candidates = crud.get_candidates_for_job(db, job_id=job_id)
-    
-    return {
-        "job": job,
-        "candidates": candidates
-    }
 
-@router.get("/stats/{job_id}", response_model=schemas.CandidateStatusCounts)
-def get_dashboard_stats(job_id: str, db: Session = Depends(get_db)):
-    # Verify job exists
+    try:
+        rows, next_cursor = crud.get_candidates_page(
+            db, job_id, sort=sort, cursor=cursor, limit=limit, status=status, ai_status=ai_status,
+            min_score=min_score, max_score=max_score, include_analysis=include_analysis
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Serialized with the page model of the requested view (see read_candidates_page)
+    page_schema = schemas.JobDashboardPage if include_analysis else schemas.JobDashboardSummaryPage
+    page = page_schema(
+        job=schemas.Job.model_validate(job), candidates=schemas.candidate_page(rows, next_cursor, limit, include_analysis)
+    )
+    return Response(content=page.model_dump_json(), media_type="application/json")
+
+@router.get("/job/{job_id}/interviews", response_model=schemas.InterviewRankingPage)
+def get_interview_ranking(
+    job_id: str,
+    sort: str = Query("overall_score", description="overall_score or a dimension (relevance_score, ...), descending"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """Interviewed candidates ranked by their interview rollup, for the job dashboard."""
+    job = crud.get_job(db, job_id=job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    try:
+        rows, next_cursor = crud.get_interview_rankings(db, job_id, sort=sort, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    percentiles = interview_rollup.percentiles(db, job_id, [analysis.overall_score for analysis, _ in rows])
+    items = []
+    for (analysis, candidate), percentile in zip(rows, percentiles):
+        items.append(schemas.InterviewRanking.model_validate({
+            **schemas.InterviewScores.model_validate(analysis).model_dump(),
+            "percentile": percentile,
+            "candidate_id": candidate.id,
+            "name": candidate.name,
+            "email": candidate.email,
+            "status": candidate.status,
+            "ai_score": candidate.ai_score,
+            "interview_stage": candidate.interview_stage,
+        }))
+    return {"items": items, "next_cursor": next_cursor, "limit": limit}
+
+@router.get("/stats/{job_id}", response_model=schemas.JobStats)
+def get_dashboard_stats(job_id: str, request: Request, db: Session = Depends(get_db)):
+    def build():
+        # Verify job exists
+        job = crud.get_job(db, job_id=job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        # Status, AI fit and interview stage counts from the materialized counters
+        return crud.get_dashboard_stats(db, job_id=job_id)
+
+    version = version_stamps.current(db, version_stamps.job_scope(job_id))
+    return response_cache.cached_json(
+        request, f"stats:{job_id}", version, schemas.JobStats, build, not_found="Job not found"
+    )
+
+@router.get("/cache/stats")
+def get_response_cache_stats():
+    """Hit/miss/304 counts of the dashboard and job response cache."""
+    return response_cache.stats()
+
+@router.post("/stats/{job_id}/reconcile")
+def reconcile_dashboard_stats(job_id: str, db: Session = Depends(get_db)):
+    """Recomputes the job's counters from its candidates, repairing any drift."""
     job = crud.get_job(db, job_id=job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    
-    return crud.get_candidates_count_by_status(db, job_id=job_id) 
\ No newline at end of file
+
+    repaired = job_counters.reconcile_counts(db, job_id)
+    db.commit()
+    return {"job_id": job_id, "repaired": repaired} 
+
+# --- Realtime events ---
+# Incremental updates for one job (candidate_created, candidate_scored,
+# candidate_status_changed, candidate_stage_changed, candidates_imported,
+# candidates_updated, counters). On "resync" the client should refetch the
+# dashboard and stats (cheap with If-None-Match).
+
+SSE_KEEPALIVE_SECONDS = 15
+
+def _job_exists(job_id: str) -> bool:
+    # Short-lived session: event connections stay open for a long time.
+    # Blocking: the async handlers run it in the thread pool.
+    with SessionLocal() as db:
+        return crud.get_job(db, job_id=job_id) is not None
+
+@router.websocket("/ws/{job_id}")
+async def job_events_websocket(websocket: WebSocket, job_id: str):
+    if not await run_in_threadpool(_job_exists, job_id):
+        await websocket.close(code=4404)
+        return
+
+    await websocket.accept()
+    subscription = events.subscribe(job_id)
+
+    async def pump():
+        while True:
+            await websocket.send_json(await subscription.get())
+
+    sender = asyncio.create_task(pump())
+    try:
+        await websocket.send_json({"type": "subscribed", "job_id": job_id})
+        # Nothing is expected from the client; receiving just notices the disconnect
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        events.unsubscribe(subscription)
+        # Retrieve the sender's outcome (cancelled, or a send that failed after the disconnect)
+        await asyncio.gather(sender, return_exceptions=True)
+
+@router.get("/events/{job_id}")
+async def job_events_stream(job_id: str, request: Request):
+    """Server-Sent Events version of the job WebSocket, for clients that prefer plain HTTP."""
+    if not await run_in_threadpool(_job_exists, job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    subscription = events.subscribe(job_id)
+
+    async def stream():
+        try:
+            yield f"event: subscribed\ndata: {json.dumps({'type': 'subscribed', 'job_id': job_id})}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            events.unsubscribe(subscription)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@router.get("/events-stats")
+def get_event_stats():
+    """Published/delivered event counts and open subscriptions."""
+    return events.stats()
@@ -1,15 +1,26 @@
 # routers/interview.py
 
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List
 import crud
 import schemas
 from database import get_db
-import ai_processing
+import interview_analysis
+import interview_rollup
+import question_bank
 
 router = APIRouter()
 
+def _analysis_response(db: Session, analysis, answers) -> schemas.InterviewAnalysis:
+    response = schemas.InterviewAnalysis.model_validate(analysis)
+    response.percentile = interview_rollup.percentiles(db, analysis.job_id, [analysis.overall_score])[0]
+    response.answers = [schemas.InterviewAnswer.model_validate(answer) for answer in answers]
+    return response
+
 @router.post("/{candidate_id}/answer", response_model=schemas.InterviewAnswer)
 def create_interview_answer(
     candidate_id: str,
@@ -25,12 +36,14 @@ def create_interview_answer(
     db_answer = crud.create_interview_answer(db=db, answer=answer)
     
     try:
-        # Process answer with AI
-        ai_analysis = ai_processing.analyze_interview_answer(answer.answer)
-        crud.update_interview_answer_analysis(
+        # Process answer with AI; the candidate's interview rollup is updated with it
+        result = interview_analysis.analyze_interview_answer(answer.answer, answer.question)
+        db_answer = crud.update_interview_answer_analysis(
             db=db,
             answer_id=db_answer.id,
-            ai_analysis=ai_analysis
+            ai_analysis=result["summary"],
+            ai_score=result["score"],
+            dimensions=result["dimensions"]
         )
     except Exception as e:
         # Log error but continue
@@ -47,46 +60,65 @@ def read_interview_answers(candidate_id: str, db: Session = Depends(get_db)):
     
     return crud.get_interview_answers(db=db, candidate_id=candidate_id)
 
-@router.post("/{candidate_id}")
-def submit_interview_answers(
-    candidate_id: str,
-    answers: List[schemas.InterviewAnswerCreate],
-    db: Session = Depends(get_db)
-):
+@router.get("/{candidate_id}/questions", response_model=schemas.InterviewQuestionBank)
+def read_interview_questions(candidate_id: str, db: Session = Depends(get_db)):
+    """The questions the candidate should answer: their job's current question bank."""
     candidate = crud.get_candidate(db, candidate_id)
     if candidate is None:
         raise HTTPException(status_code=404, detail="Candidate not found")
+    return question_bank.get_bank(db, candidate.job_id)
 
-    # Save answers and trigger analysis
-    for answer_data in answers:
-        db_answer = crud.create_interview_answer(db, answer_data, candidate_id)
-
-        # Get the corresponding question (simulated)
-        questions = ai_processing.get_interview_questions(candidate.job_id) # Assuming questions are job-specific
-        question_text = questions[answer_data.question_number - 1] if 0 <= answer_data.question_number - 1 < len(questions) else f"Question {answer_data.question_number}"
-
-        # Perform analysis (this should ideally be async)
-        analysis_results = ai_processing.analyze_interview_answer(answer_data.answer_text or "", question_text)
+def _store_submission(db: Session, candidate_id: str, answers: List[schemas.InterviewAnswerSubmission]):
+    """Blocking part before the analysis (DB, and possibly generating the question bank)."""
+    candidate = crud.get_candidate(db, candidate_id)
+    if candidate is None:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    if not answers:
+        raise HTTPException(status_code=400, detail="No answers submitted")
 
-        # Update the answer with analysis results
-        crud.update_interview_answer_analysis(
-            db=db,
-            answer_id=db_answer.id,
-            ai_analysis=analysis_results["analysis"],
-            ai_score=analysis_results["score"]
-        )
+    # The job's question bank, looked up once (from the in-process cache) for the whole submission
+    bank = question_bank.get_bank(db, candidate.job_id) or {"version": None, "questions": []}
+    questions = {question["number"]: question for question in bank["questions"]}
+    rows = []
+    for answer in answers:
+        question = questions.get(answer.question_number)
+        rows.append({
+            "question_number": answer.question_number,
+            "question_bank_version": bank["version"],
+            "question": question["text"] if question else f"Question {answer.question_number}",
+            "weight": question["weight"] if question else 1.0,
+            "answer": answer.answer_text or "",
+        })
+    # A resubmission replaces the earlier interview instead of adding to its rollup
+    return candidate, rows, crud.replace_interview_answers(db, candidate, rows)
 
-    # Update candidate interview stage
-    crud.update_candidate_interview_stage(db, candidate_id, "Interview Complete")
+def _save_results(db: Session, candidate, db_answers, results) -> schemas.InterviewAnalysis:
+    analysis = crud.save_interview_analysis(db, candidate, db_answers, results)
+    return _analysis_response(db, analysis, db_answers)
 
-    return {"message": "Interview answers submitted and analysis triggered."}
+@router.post("/{candidate_id}", response_model=schemas.InterviewAnalysis)
+async def submit_interview_answers(
+    candidate_id: str,
+    answers: List[schemas.InterviewAnswerSubmission],
+    db: Session = Depends(get_db)
+):
+    # DB work runs in the thread pool so it never blocks the event loop (generating a
+    # missing question bank is an LLM round-trip); the analysis fan-out stays async
+    candidate, rows, db_answers = await run_in_threadpool(_store_submission, db, candidate_id, answers)
+    # Every answer analyzed at the same time: latency is one LLM round-trip, not one per question
+    results = await asyncio.gather(*(
+        interview_analysis.analyze_interview_answer_async(row["answer"], row["question"]) for row in rows
+    ))
+    return await run_in_threadpool(_save_results, db, candidate, db_answers, results)
 
-@router.get("/{candidate_id}/score", response_model=List[schemas.InterviewAnswer])
+@router.get("/{candidate_id}/score", response_model=schemas.InterviewAnalysis)
 def get_interview_score(candidate_id: str, db: Session = Depends(get_db)):
     # Add dummy authentication check here later
     candidate = crud.get_candidate(db, candidate_id)
     if candidate is None:
         raise HTTPException(status_code=404, detail="Candidate not found")
 
-    answers = crud.get_interview_answers_for_candidate(db, candidate_id)
-    return answers 
\ No newline at end of file
+    analysis = crud.get_interview_analysis(db, candidate_id)
+    if analysis is None:
+        raise HTTPException(status_code=404, detail="Interview not analyzed yet")
+    return _analysis_response(db, analysis, crud.get_interview_answers_for_candidate(db, candidate_id))
@@ -1,26 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import List
 import crud
 import schemas
 from database import get_db
+import question_bank
+import response_cache
+import version_stamps
 
 router = APIRouter()
 
 @router.post("/", response_model=schemas.Job)
-def create_job(job: schemas.JobCreate, db: Session = Depends(get_db)):
+def create_job(job: schemas.JobCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     # Add dummy authentication check here later
-    return crud.create_job(db=db, job=job)
+    db_job = crud.create_job(db=db, job=job)
+    # Interview questions are generated after the response, not on the first interview
+    background_tasks.add_task(question_bank.warm, db_job.id)
+    return db_job
+
+@router.put("/{job_id}", response_model=schemas.Job)
+def update_job(job_id: str, job: schemas.JobUpdate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    # Add dummy authentication check here later
+    db_job = crud.update_job(db=db, job_id=job_id, job=job)
+    if db_job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    background_tasks.add_task(question_bank.warm, job_id)
+    return db_job
 
 @router.get("/", response_model=List[schemas.Job])
-def read_jobs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_jobs(request: Request, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
      # Add dummy authentication check here later
-    jobs = crud.get_jobs(db, skip=skip, limit=limit)
-    return jobs
+    # Served from the response cache / 304 until a job is created or changed
+    version = version_stamps.current(db, version_stamps.JOBS_SCOPE)
+    return response_cache.cached_json(
+        request, f"jobs?skip={skip}&limit={limit}", version, List[schemas.Job],
+        lambda: crud.get_jobs(db, skip=skip, limit=limit)
+    )
 
 @router.get("/{job_id}", response_model=schemas.Job)
-def read_job(job_id: str, db: Session = Depends(get_db)):
-    db_job = crud.get_job(db, job_id=job_id)
-    if db_job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
-    return db_job 
\ No newline at end of file
+def read_job(job_id: str, request: Request, db: Session = Depends(get_db)):
+    def build():
+        db_job = crud.get_job(db, job_id=job_id)
+        if db_job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return db_job
+
+    version = version_stamps.current(db, version_stamps.job_scope(job_id))
+    return response_cache.cached_json(
+        request, f"job:{job_id}", version, schemas.Job, build, not_found="Job not found"
+    ) 
\ No newline at end of file
@@ -1,6 +1,6 @@
 # schemas.py
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import List, Optional
 from datetime import datetime
 
@@ -16,6 +16,15 @@ class JobBase(BaseModel):
 class JobCreate(JobBase):
     pass
 
+class JobUpdate(BaseModel):
+    # Only the fields sent are changed
+    title: Optional[str] = None
+    description: Optional[str] = None
+    requirements: Optional[str] = None
+    location: Optional[str] = None
+    salary_range: Optional[str] = None
+    status: Optional[str] = None
+
 class Job(JobBase):
     id: str
     created_at: datetime
@@ -40,12 +49,90 @@ class Candidate(CandidateBase):
     created_at: datetime
     status: str
     resume_path: Optional[str] = None
+    resume_filename: Optional[str] = None
     ai_score: Optional[float] = None
     ai_analysis: Optional[str] = None
+    ai_status: Optional[str] = None
+    interview_stage: Optional[str] = None
 
     class Config:
         from_attributes = True
 
+class CandidateSummary(CandidateBase):
+    """Candidate without the (large) AI analysis text, for list views."""
+    id: str
+    created_at: datetime
+    status: str
+    resume_filename: Optional[str] = None
+    ai_score: Optional[float] = None
+    ai_status: Optional[str] = None
+    interview_stage: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class CandidatePage(BaseModel):
+    items: List[Candidate]
+    next_cursor: Optional[str] = None
+    limit: int
+
+class CandidateSummaryPage(BaseModel):
+    """A page without the AI analysis text (include_analysis not set)."""
+    items: List[CandidateSummary]
+    next_cursor: Optional[str] = None
+    limit: int
+
+def candidate_page(rows, next_cursor: Optional[str], limit: int, include_analysis: bool):
+    """The page model for the requested view: CandidatePage with analysis, else CandidateSummaryPage."""
+    page_schema = CandidatePage if include_analysis else CandidateSummaryPage
+    return page_schema.model_validate({"items": rows, "next_cursor": next_cursor, "limit": limit}, from_attributes=True)
+
+class DuplicateApplicant(BaseModel):
+    """An earlier application by the same person (email/phone) or with a near-identical resume."""
+    candidate_id: str
+    matched_on: List[str] # email, phone, resume
+    similarity: Optional[float] = None # Estimated resume similarity, 0-1
+    candidate: CandidateSummary
+
+# --- Bulk Candidate Schemas ---
+
+MAX_BULK_ROWS = 10000
+
+class CandidateBulkCreate(BaseModel):
+    candidates: List[CandidateCreate] = Field(..., max_length=MAX_BULK_ROWS)
+
+class CandidateStatusUpdate(BaseModel):
+    candidate_id: str
+    status: str
+
+class CandidateBulkStatusUpdate(BaseModel):
+    updates: List[CandidateStatusUpdate] = Field(..., max_length=MAX_BULK_ROWS)
+
+class CandidateAIUpdate(BaseModel):
+    candidate_id: str
+    ai_score: Optional[float] = None
+    ai_analysis: Optional[str] = None
+    ai_status: Optional[str] = None
+
+class CandidateBulkAIUpdate(BaseModel):
+    updates: List[CandidateAIUpdate] = Field(..., max_length=MAX_BULK_ROWS)
+
+class BulkRowResult(BaseModel):
+    index: int
+    candidate_id: Optional[str] = None
+    outcome: str # created, updated, not_found, error
+    detail: Optional[str] = None
+
+class BulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkRowResult]
+
+    @classmethod
+    def from_results(cls, results) -> "BulkResult":
+        succeeded = sum(1 for r in results if r["outcome"] in ("created", "updated"))
+        return cls(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
 # --- Interview Schemas ---
 
 class InterviewAnswerBase(BaseModel):
@@ -56,19 +143,67 @@ class InterviewAnswerBase(BaseModel):
 class InterviewAnswerCreate(InterviewAnswerBase):
     pass
 
+class InterviewQuestion(BaseModel):
+    number: int
+    text: str
+    weight: float = 1.0
+
+class InterviewQuestionBank(BaseModel):
+    job_id: str
+    version: int
+    source: str # llm or template
+    questions: List[InterviewQuestion]
+
+class InterviewAnswerSubmission(BaseModel):
+    # One answer of a full interview, as posted by the interview page
+    question_number: int
+    answer_text: Optional[str] = None
+    answer_video_url: Optional[str] = None
+
 class InterviewAnswer(InterviewAnswerBase):
     id: str
     created_at: datetime
+    question_number: Optional[int] = None
+    question_bank_version: Optional[int] = None
+    weight: Optional[float] = None
     ai_analysis: Optional[str] = None
+    ai_score: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
+class InterviewScores(BaseModel):
+    """A candidate's interview rollup: weighted overall score and per-dimension means, 0-1."""
+    overall_score: Optional[float] = None
+    relevance_score: Optional[float] = None
+    clarity_score: Optional[float] = None
+    depth_score: Optional[float] = None
+    professionalism_score: Optional[float] = None
+    answer_count: int = 0
+    percentile: Optional[float] = None # Within the job, 0-100, computed at read time
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
-class InterviewAnalysis(BaseModel):
+class InterviewAnalysis(InterviewScores):
     candidate_id: str
     summary: str
-    overall_score: float
-    # Add other analysis details as needed
+    answers: List[InterviewAnswer] = []
+
+class InterviewRanking(InterviewScores):
+    """One row of the job's interview ranking, without answers or analysis text."""
+    candidate_id: str
+    name: str
+    email: str
+    status: str
+    ai_score: Optional[float] = None
+    interview_stage: Optional[str] = None
+
+class InterviewRankingPage(BaseModel):
+    items: List[InterviewRanking]
+    next_cursor: Optional[str] = None
+    limit: int
 
 # --- Dashboard Schemas ---
 
@@ -96,6 +231,14 @@ class JobDashboard(BaseModel):
     job: Job
     candidates: List[Candidate]
 
+class JobDashboardPage(BaseModel):
+    job: Job
+    candidates: CandidatePage
+
+class JobDashboardSummaryPage(BaseModel):
+    job: Job
+    candidates: CandidateSummaryPage
+
 class DashboardStats(BaseModel):
     total_candidates: int
     top_fit_count: int
@@ -106,6 +249,9 @@ class DashboardStats(BaseModel):
     interview_complete_count: int
     # Add more stats as needed
 
+class JobStats(CandidateStatusCounts, DashboardStats):
+    """Everything the job dashboard shows as counts, served from the per-job counters."""
+
 # --- Authentication Schemas (Basic) ---
 
 class Token(BaseModel):
@@ -0,0 +1,198 @@
+# screening.py
+#
+# Local rule-based resume screening that runs before any LLM call. Each check
+# looks at the parsed resume (and optionally the job and the other applicants)
+# and returns a reason when the resume looks like junk or an attempt to game
+# the scoring; flagged resumes are marked "Flagged" and never sent to the LLM.
+# Checks are pluggable: add one with register_check(name, check), choose which
+# run with SCREENING_CHECKS.
+
+import os
+import re
+from collections import Counter
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# Set to 0 to send every resume to the LLM
+SCREENING_ENABLED = os.getenv("SCREENING_ENABLED", "1") != "0"
+SCREEN_MIN_CHARS = int(os.getenv("SCREEN_MIN_CHARS", "100"))
+SCREEN_MAX_WORD_SHARE = float(os.getenv("SCREEN_MAX_WORD_SHARE", "0.15"))
+SCREEN_MAX_DUPLICATE_LINE_SHARE = float(os.getenv("SCREEN_MAX_DUPLICATE_LINE_SHARE", "0.5"))
+SCREEN_MAX_KEYWORD_DENSITY = float(os.getenv("SCREEN_MAX_KEYWORD_DENSITY", "0.3"))
+SCREEN_MAX_HIDDEN_SHARE = float(os.getenv("SCREEN_MAX_HIDDEN_SHARE", "0.02"))
+# Estimated resume similarity (MinHash, see applicant_index.py) at which another applicant's
+# resume counts as a copy; applicant_index only reports matches from RESUME_DUPLICATE_SIMILARITY
+SCREEN_DUPLICATE_SIMILARITY = float(os.getenv("SCREEN_DUPLICATE_SIMILARITY", "0.9"))
+
+# Ignored by the repetition and keyword checks
+STOPWORDS = set("""
+a an and are as at be by for from has have in is it of on or that the this to was were will with
+i my me we our you your he she they their its not but if so do did done can
+""".split())
+
+class ScreeningContext(NamedTuple):
+    resume_text: str
+    job_requirements: str = ""
+    resume_path: Optional[str] = None
+    # For the near-duplicate check: the other applicants to the job
+    db: object = None
+    job_id: Optional[str] = None
+    candidate_id: Optional[str] = None
+    email: Optional[str] = None
+    signature: Optional[List[int]] = None # MinHash of the resume text (applicant_index.minhash)
+
+class ScreeningResult(NamedTuple):
+    flagged: bool
+    reasons: List[str]
+
+    def describe(self) -> str:
+        return "Flagged by screening: " + "; ".join(self.reasons)
+
+# A check returns the reason the resume is suspicious, or None
+Check = Callable[[ScreeningContext], Optional[str]]
+
+def _words(text: str) -> List[str]:
+    return re.findall(r'\b\w+\b', text.lower())
+
+# --- Checks ---
+
+def check_length(context: ScreeningContext) -> Optional[str]:
+    length = len(context.resume_text.strip())
+    if length < SCREEN_MIN_CHARS:
+        return f"too short ({length} characters)"
+    return None
+
+def check_repetition(context: ScreeningContext) -> Optional[str]:
+    words = [word for word in _words(context.resume_text) if word not in STOPWORDS]
+    if words:
+        word, count = Counter(words).most_common(1)[0]
+        if len(words) >= 20 and count > len(words) * SCREEN_MAX_WORD_SHARE:
+            return f"repetitive: '{word}' is {count} of {len(words)} words"
+
+    lines = [line.strip().lower() for line in context.resume_text.splitlines() if len(line.split()) >= 3]
+    if len(lines) >= 10:
+        duplicate_share = 1 - len(set(lines)) / len(lines)
+        if duplicate_share > SCREEN_MAX_DUPLICATE_LINE_SHARE:
+            return f"repetitive: {duplicate_share:.0%} of lines are repeated"
+    return None
+
+def check_keyword_stuffing(context: ScreeningContext) -> Optional[str]:
+    keywords = {word for word in _words(context.job_requirements) if word not in STOPWORDS and len(word) > 1}
+    words = _words(context.resume_text)
+    if not keywords or len(words) < 50:
+        return None
+    hits = sum(1 for word in words if word in keywords)
+    if hits > len(words) * SCREEN_MAX_KEYWORD_DENSITY:
+        return f"keyword stuffing: {hits / len(words):.0%} of words are job requirement keywords"
+    return None
+
+def check_hidden_text(context: ScreeningContext) -> Optional[str]:
+    if not context.resume_path or not context.resume_path.lower().endswith(".pdf"):
+        return None
+    import parse_worker # The PDF is opened in the parse worker pool
+    stats = parse_worker.scan_hidden_text(context.resume_path)
+    if not stats or not stats["chars"]:
+        return None
+    if stats["hidden"] >= 20 and stats["hidden"] > stats["chars"] * SCREEN_MAX_HIDDEN_SHARE:
+        return f"hidden text: {stats['hidden']} of {stats['chars']} characters are white, microscopic or off-page"
+    return None
+
+def _same_resume_in_job(context: ScreeningContext) -> list:
+    """
+    Applicants to the job (this one included) whose resume is near-identical to this
+    one, oldest first, as (id, email, created_at) rows. An LSH lookup in the applicant
+    index, so the cost doesn't grow with the job's applicants. The resume must already
+    be indexed (and committed), so concurrent scoring of two copies sees both.
+    """
+    if context.db is None or context.job_id is None or context.signature is None:
+        return []
+    import applicant_index
+    from database import Candidate
+    similar = [
+        match["candidate_id"]
+        for match in applicant_index.find_duplicates(context.db, signature=context.signature, exclude_id=context.candidate_id)
+        if "resume" in match["matched_on"] and match["similarity"] >= SCREEN_DUPLICATE_SIMILARITY
+    ]
+    if not similar:
+        return []
+    rows = context.db.query(Candidate.id, Candidate.email, Candidate.created_at).filter(
+        Candidate.id.in_(similar + [context.candidate_id]), Candidate.job_id == context.job_id
+    )
+    return sorted(rows, key=lambda row: (row.created_at, row.id))
+
+def _same_person(context: ScreeningContext, email: Optional[str]) -> bool:
+    import applicant_index
+    own = applicant_index.normalize_email(context.email)
+    return own is not None and applicant_index.normalize_email(email) == own
+
+def near_duplicate_original(context: ScreeningContext) -> Optional[str]:
+    """
+    The applicant who first submitted this resume to the job, when that was someone
+    else (by normalized email); None if this applicant was first or it's their own resume.
+    """
+    copies = _same_resume_in_job(context)
+    if not copies or copies[0].id == context.candidate_id or _same_person(context, copies[0].email):
+        return None
+    return copies[0].id
+
+def later_copies(context: ScreeningContext) -> List[str]:
+    """When this applicant submitted the resume first: the later applicants (other emails) with copies of it."""
+    copies = _same_resume_in_job(context)
+    if not copies or copies[0].id != context.candidate_id:
+        return []
+    return [row.id for row in copies[1:] if not _same_person(context, row.email)]
+
+def copy_reason(original_id: str) -> str:
+    return f"near-duplicate of candidate {original_id}'s resume"
+
+def check_near_duplicate(context: ScreeningContext) -> Optional[str]:
+    """Same (or nearly the same) resume text submitted earlier to this job by someone else."""
+    original = near_duplicate_original(context)
+    return copy_reason(original) if original else None
+
+# Cheapest first; registration order is run order
+CHECKS: Dict[str, Check] = {}
+
+def register_check(name: str, check: Check):
+    CHECKS[name] = check
+
+register_check("length", check_length)
+register_check("repetition", check_repetition)
+register_check("keyword_stuffing", check_keyword_stuffing)
+register_check("near_duplicate", check_near_duplicate)
+register_check("hidden_text", check_hidden_text)
+
+def near_duplicate_enabled() -> bool:
+    return SCREENING_ENABLED and "near_duplicate" in enabled_checks()
+
+def enabled_checks() -> List[str]:
+    """SCREENING_CHECKS (comma separated names), default every registered check."""
+    names = os.getenv("SCREENING_CHECKS")
+    if not names:
+        return list(CHECKS)
+    return [name.strip() for name in names.split(",") if name.strip() in CHECKS]
+
+def screen(resume_text: str, job_requirements: str = "", resume_path: Optional[str] = None, db=None,
+           job_id: Optional[str] = None, candidate_id: Optional[str] = None, email: Optional[str] = None,
+           signature: Optional[List[int]] = None) -> ScreeningResult:
+    """
+    Runs the enabled checks on a parsed resume, stopping at the first that flags it
+    (so the costlier ones only run on plausible resumes). A failing check is skipped.
+    The near-duplicate check needs `db`, `job_id` and the resume's MinHash `signature`.
+    """
+    if not SCREENING_ENABLED:
+        return ScreeningResult(False, [])
+
+    context = ScreeningContext(resume_text, job_requirements or "", resume_path, db, job_id, candidate_id, email, signature)
+    reasons = []
+    for name in enabled_checks():
+        try:
+            reason = CHECKS[name](context)
+        except Exception as e:
+            print(f"Screening check {name} failed: {e}")
+            continue
+        if reason:
+            reasons.append(reason)
+            break
+    if reasons:
+        print(f"Flagged resume: {'; '.join(reasons)}")
+    return ScreeningResult(bool(reasons), reasons)
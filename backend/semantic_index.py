@@ -0,0 +1,180 @@
+# semantic_index.py
+
+import json
+import math
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from database import Candidate, ParsedResume
+
+# Directory holding one vector index per job
+VECTOR_DIR = Path(os.getenv("VECTOR_INDEX_DIR", "backend/static/vectors"))
+# Dimension of the hashing embedder (ignored when a local model is configured)
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "512"))
+# Optional path/name of a local sentence-transformers model; falls back to hashing
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "")
+
+TOKEN_PATTERN = re.compile(r'\b\w+\b')
+
+class HashingEmbedder:
+    """
+    CPU-only, model-free embedder: word unigrams and bigrams are hashed into a
+    fixed number of signed buckets with sublinear term frequency, then L2-normalized
+    (the "hashing trick" version of TF vectors). Cosine similarity then works as a
+    cheap relevance signal without any training or downloads.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str) -> Counter:
+        words = TOKEN_PATTERN.findall(text.lower())
+        features = Counter(words)
+        features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, count in self._features(text or "").items():
+                h = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if h & 0x80000000 else -1.0
+                vectors[row, h % self.dim] += sign * (1.0 + math.log(count))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.divide(vectors, norms, out=vectors, where=norms > 0)
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model (must already be on disk; no network access)."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"st-{os.path.basename(model_name.rstrip('/'))}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return self.model.encode(list(texts), normalize_embeddings=True).astype(np.float32)
+
+@lru_cache(maxsize=1)
+def get_embedder():
+    """Uses the configured local model when available, otherwise the hashing embedder."""
+    if EMBEDDING_MODEL:
+        try:
+            return SentenceTransformerEmbedder(EMBEDDING_MODEL)
+        except Exception as e:
+            print(f"Could not load embedding model {EMBEDDING_MODEL}, using hashing embedder: {e}")
+    return HashingEmbedder()
+
+def top_k(vectors: np.ndarray, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Indices and cosine scores of the k best rows (vectors are already normalized)."""
+    scores = vectors @ query
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+    best = np.argpartition(-scores, k - 1)[:k]
+    best = best[np.argsort(-scores[best], kind="stable")]
+    return best, scores[best]
+
+class JobVectorIndex:
+    """
+    Append-only on-disk vector index for one job: raw float32 rows in vectors.f32
+    (searched through np.memmap, so it is never fully loaded), candidate ids in
+    ids.txt and the embedder name/dimension in meta.json.
+    """
+
+    _locks: Dict[str, threading.Lock] = {}
+    _locks_guard = threading.Lock()
+
+    def __init__(self, job_id: str, embedder=None):
+        self.job_id = job_id
+        self.embedder = embedder or get_embedder()
+        self.directory = VECTOR_DIR / job_id
+        self.vectors_path = self.directory / "vectors.f32"
+        self.ids_path = self.directory / "ids.txt"
+        self.meta_path = self.directory / "meta.json"
+        with self._locks_guard:
+            self.lock = self._locks.setdefault(job_id, threading.Lock())
+
+    def _is_compatible(self) -> bool:
+        if not self.meta_path.exists():
+            return False
+        meta = json.loads(self.meta_path.read_text())
+        return meta.get("model") == self.embedder.name and meta.get("dim") == self.embedder.dim
+
+    def _reset_locked(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.vectors_path.write_bytes(b"")
+        self.ids_path.write_text("")
+        self.meta_path.write_text(json.dumps({"model": self.embedder.name, "dim": self.embedder.dim}))
+
+    def reset(self):
+        """Drops stored vectors and starts a fresh index for the current embedder."""
+        with self.lock:
+            self._reset_locked()
+
+    def add(self, candidate_ids: Sequence[str], texts: Sequence[str]):
+        """Embeds and appends candidates. Re-adding an id supersedes its old vector."""
+        if not candidate_ids:
+            return
+        vectors = self.embedder.embed(texts)
+        with self.lock:
+            if not self._is_compatible():
+                # Embedder changed (or new job): old vectors can't be compared with new ones
+                self._reset_locked()
+            with open(self.vectors_path, "ab") as f:
+                f.write(vectors.astype(np.float32).tobytes())
+            with open(self.ids_path, "a") as f:
+                f.write("".join(f"{candidate_id}\n" for candidate_id in candidate_ids))
+
+    def search(self, query_text: str, k: int) -> List[Dict]:
+        """Top-k candidates by cosine similarity to the query text."""
+        if not self._is_compatible() or not self.vectors_path.exists() or self.vectors_path.stat().st_size == 0:
+            return []
+
+        with self.lock:
+            ids = self.ids_path.read_text().split()
+            rows = min(len(ids), self.vectors_path.stat().st_size // (4 * self.embedder.dim))
+        vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.embedder.dim))
+        query = self.embedder.embed([query_text])[0]
+
+        # Later rows supersede earlier ones for the same candidate
+        latest = {candidate_id: row for row, candidate_id in enumerate(ids[:rows])}
+        if len(latest) < rows:
+            keep = np.fromiter(sorted(latest.values()), dtype=np.int64)
+            best, scores = top_k(np.asarray(vectors[keep]), query, k)
+            best = keep[best]
+        else:
+            best, scores = top_k(vectors, query, k)
+
+        return [
+            {"candidate_id": ids[row], "similarity": round(float(score), 4)}
+            for row, score in zip(best, scores)
+        ]
+
+def rank_texts(texts: Sequence[str], query_text: str) -> np.ndarray:
+    """Cosine similarity of each text to the query, for one-off batches without an index."""
+    embedder = get_embedder()
+    if len(texts) == 0:
+        return np.zeros(0, dtype=np.float32)
+    return embedder.embed(texts) @ embedder.embed([query_text])[0]
+
+def rebuild_job_index(db: Session, job_id: str) -> int:
+    """Re-embeds every candidate of a job with stored resume text. Returns the count."""
+    rows = db.query(Candidate.id, ParsedResume.text).join(
+        ParsedResume, ParsedResume.content_hash == Candidate.resume_hash
+    ).filter(Candidate.job_id == job_id).all()
+
+    index = JobVectorIndex(job_id)
+    index.reset()
+    index.add([row.id for row in rows], [row.text for row in rows])
+    return len(rows)
@@ -0,0 +1,250 @@
+# task_queue.py
+
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, ScoringTask
+import ai_processing
+import applicant_index
+import crud
+import screening
+
+# Number of background threads scoring resumes in this process
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "2"))
+SCORING_MAX_ATTEMPTS = int(os.getenv("SCORING_MAX_ATTEMPTS", "5"))
+# Retry delay is BACKOFF_BASE * 2^(attempt-1) seconds plus jitter, capped at BACKOFF_MAX
+BACKOFF_BASE_SECONDS = float(os.getenv("SCORING_BACKOFF_BASE_SECONDS", "5"))
+BACKOFF_MAX_SECONDS = float(os.getenv("SCORING_BACKOFF_MAX_SECONDS", "300"))
+POLL_INTERVAL_SECONDS = float(os.getenv("SCORING_POLL_INTERVAL_SECONDS", "1"))
+# A task still "running" after this long is assumed to belong to a dead worker
+LEASE_SECONDS = float(os.getenv("SCORING_LEASE_SECONDS", "600"))
+# How often a running worker looks for expired leases
+REQUEUE_INTERVAL_SECONDS = float(os.getenv("SCORING_REQUEUE_INTERVAL_SECONDS", "60"))
+# Only this process runs scoring workers, so at startup every "running" task is from a
+# previous run and is requeued at once. Set to 0 when several processes share the queue.
+SCORING_SINGLE_PROCESS = os.getenv("SCORING_SINGLE_PROCESS", "1") != "0"
+
+FLAGGED = ai_processing.determine_ai_status(0.0, True)
+
+class RetryableScoringError(Exception):
+    """Scoring failed for a reason that may go away (LLM outage, rate limit...)."""
+
+def enqueue_scoring(db: Session, candidate_id: str) -> ScoringTask:
+    """Queues AI scoring for a candidate's resume."""
+    task = ScoringTask(candidate_id=candidate_id, max_attempts=SCORING_MAX_ATTEMPTS)
+    db.add(task)
+    db.commit()
+    db.refresh(task)
+    _wake_event.set()
+    return task
+
+def backoff_seconds(attempt: int) -> float:
+    """Exponential backoff with full jitter on top of the base delay."""
+    delay = min(BACKOFF_BASE_SECONDS * (2 ** max(attempt - 1, 0)), BACKOFF_MAX_SECONDS)
+    return delay + random.uniform(0, delay)
+
+def claim_next(db: Session) -> Optional[ScoringTask]:
+    """
+    Atomically moves the oldest due task from pending to running.
+    The conditional UPDATE makes it safe with several workers or processes.
+    """
+    now = datetime.utcnow()
+    candidates = db.query(ScoringTask.id).filter(
+        ScoringTask.status == "pending",
+        ScoringTask.run_after <= now
+    ).order_by(ScoringTask.run_after).limit(5).all()
+
+    for (task_id,) in candidates:
+        result = db.execute(
+            update(ScoringTask)
+            .where(ScoringTask.id == task_id, ScoringTask.status == "pending")
+            .values(status="running", attempts=ScoringTask.attempts + 1, locked_at=now, updated_at=now)
+        )
+        db.commit()
+        if result.rowcount == 1:
+            return db.get(ScoringTask, task_id)
+    return None
+
+def requeue_stale(db: Session, lease_seconds: float = None) -> int:
+    """
+    Returns tasks left running by a crashed process to the queue: those locked more
+    than `lease_seconds` (default LEASE_SECONDS) ago; 0 requeues every running task.
+    """
+    lease_seconds = LEASE_SECONDS if lease_seconds is None else lease_seconds
+    cutoff = datetime.utcnow() - timedelta(seconds=lease_seconds)
+    result = db.execute(
+        update(ScoringTask)
+        .where(ScoringTask.status == "running", ScoringTask.locked_at < cutoff)
+        .values(status="pending", locked_at=None, run_after=datetime.utcnow())
+    )
+    db.commit()
+    return result.rowcount
+
+def score_candidate(db: Session, candidate_id: str):
+    """Runs the AI analysis for one candidate and stores the result."""
+    candidate = crud.get_candidate(db, candidate_id)
+    if candidate is None:
+        return # Candidate was deleted, nothing to do
+    if not candidate.resume_path or not os.path.exists(candidate.resume_path):
+        crud.update_candidate_ai_analysis(
+            db, candidate_id, 0.0, "Resume file not found", ai_status="AI Processing Failed"
+        )
+        return
+
+    resume_text = ai_processing.load_resume_text(candidate.resume_path, candidate.resume_hash)
+    copy_check = None
+    if not ai_processing.is_parse_failure(resume_text):
+        # Indexed and committed before screening, so two workers scoring copies of the same
+        # resume at the same time see each other. Committing also means the analysis below
+        # (which writes through other sessions) never waits on this transaction's write lock.
+        signature = applicant_index.minhash(resume_text)
+        applicant_index.index_resume(db, candidate, resume_text, signature)
+        db.commit()
+
+        # Local screening first: junk and gamed resumes never reach the LLM
+        result = screening.screen(
+            resume_text, candidate.job.requirements, candidate.resume_path, db=db, job_id=candidate.job_id,
+            candidate_id=candidate.id, email=candidate.email, signature=signature
+        )
+        if result.flagged:
+            _flag(db, candidate_id, result.describe())
+            return
+        if screening.near_duplicate_enabled():
+            copy_check = screening.ScreeningContext(
+                resume_text, db=db, job_id=candidate.job_id, candidate_id=candidate.id,
+                email=candidate.email, signature=signature
+            )
+            # This applicant was first: copies that were already scored are flagged now
+            for copy_id in screening.later_copies(copy_check):
+                copy = crud.get_candidate(db, copy_id)
+                if copy.ai_status != FLAGGED:
+                    _flag(db, copy_id, screening.ScreeningResult(True, [screening.copy_reason(candidate_id)]).describe())
+
+        # Index the resume for semantic pre-ranking (reused scores too, so
+        # pre-ranking sees every screened applicant)
+        try:
+            import semantic_index # Imported on first use: it pulls in numpy
+            semantic_index.JobVectorIndex(candidate.job_id).add([candidate.id], [resume_text])
+        except Exception as e:
+            print(f"Could not index candidate {candidate.id}: {e}")
+
+        # A near-identical resume already scored against the same requirements: reuse its score
+        duplicate = applicant_index.reusable_analysis(db, candidate, signature)
+        if duplicate is not None:
+            print(f"Reusing the analysis of candidate {duplicate.id} for near-duplicate {candidate.id}")
+            crud.update_candidate_ai_analysis(
+                db, candidate_id, duplicate.ai_score, duplicate.ai_analysis, ai_status=duplicate.ai_status
+            )
+            return
+
+    ai_score, ai_analysis = ai_processing.analyze_resume(
+        candidate.resume_path, candidate.job.requirements, candidate.resume_hash
+    )
+    if ai_processing.is_analysis_failure(ai_analysis):
+        raise RetryableScoringError(ai_analysis)
+
+    # An earlier applicant's copy may have been indexed while the LLM was running
+    original = screening.near_duplicate_original(copy_check) if copy_check else None
+    if original is not None:
+        _flag(db, candidate_id, screening.ScreeningResult(True, [screening.copy_reason(original)]).describe())
+        return
+
+    crud.update_candidate_ai_analysis(
+        db, candidate_id, ai_score, ai_analysis,
+        ai_status=ai_processing.determine_ai_status(ai_score, False)
+    )
+
+def _flag(db: Session, candidate_id: str, reason: str):
+    crud.update_candidate_ai_analysis(db, candidate_id, None, reason, ai_status=FLAGGED)
+
+def run_task(db: Session, task: ScoringTask):
+    """Executes a claimed task, scheduling a retry or marking it failed on error."""
+    try:
+        score_candidate(db, task.candidate_id)
+        task.status = "done"
+        task.last_error = None
+    except Exception as e:
+        db.rollback()
+        print(f"Scoring task {task.id} attempt {task.attempts} failed: {e}")
+        task.last_error = str(e)
+        if task.attempts >= task.max_attempts:
+            task.status = "failed"
+            crud.update_candidate_ai_analysis(
+                db, task.candidate_id, None, f"AI processing failed: {e}", ai_status="AI Processing Failed"
+            )
+        else:
+            task.status = "pending"
+            task.run_after = datetime.utcnow() + timedelta(seconds=backoff_seconds(task.attempts))
+    task.locked_at = None
+    db.commit()
+
+def queue_stats(db: Session) -> Dict[str, int]:
+    counts = dict(db.query(ScoringTask.status, func.count(ScoringTask.id)).group_by(ScoringTask.status).all())
+    return {status: counts.get(status, 0) for status in ("pending", "running", "done", "failed")}
+
+# --- Worker threads ---
+
+_stop_event = threading.Event()
+_wake_event = threading.Event()
+_workers: List[threading.Thread] = []
+_requeue_lock = threading.Lock()
+_next_requeue_at = 0.0
+
+def _requeue_due() -> bool:
+    """True for one worker once every REQUEUE_INTERVAL_SECONDS."""
+    global _next_requeue_at
+    with _requeue_lock:
+        now = time.monotonic()
+        if now < _next_requeue_at:
+            return False
+        _next_requeue_at = now + REQUEUE_INTERVAL_SECONDS
+        return True
+
+def _worker_loop():
+    while not _stop_event.is_set():
+        with SessionLocal() as db:
+            try:
+                # Leases of workers in crashed processes expire while this one runs, too
+                if _requeue_due():
+                    requeued = requeue_stale(db)
+                    if requeued:
+                        print(f"Requeued {requeued} stale scoring tasks")
+                task = claim_next(db)
+                if task is not None:
+                    run_task(db, task)
+                    continue
+            except Exception as e:
+                print(f"Scoring worker error: {e}")
+        # Nothing due: sleep until the poll interval passes or a new task is queued
+        _wake_event.wait(POLL_INTERVAL_SECONDS)
+        _wake_event.clear()
+
+def start_workers(count: int = SCORING_WORKERS):
+    """Starts the background scoring workers (called on application startup)."""
+    if _workers:
+        return
+    _stop_event.clear()
+    with SessionLocal() as db:
+        # A single process restarting within the lease would otherwise leave its tasks stuck
+        requeued = requeue_stale(db, lease_seconds=0 if SCORING_SINGLE_PROCESS else None)
+        if requeued:
+            print(f"Requeued {requeued} stale scoring tasks")
+    for index in range(count):
+        worker = threading.Thread(target=_worker_loop, name=f"scoring-worker-{index}", daemon=True)
+        worker.start()
+        _workers.append(worker)
+
+def stop_workers(timeout: float = 5.0):
+    """Signals the workers to stop after their current task."""
+    _stop_event.set()
+    _wake_event.set()
+    for worker in _workers:
+        worker.join(timeout)
+    _workers.clear()
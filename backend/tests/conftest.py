@@ -0,0 +1,45 @@
+# tests/conftest.py
+#
+# The backend modules use flat imports (`import crud`) and read their settings
+# at import time, so the test database and the offline LLM provider are set up
+# here, before any test imports them. Run from the repository root or backend:
+#
+#   python -m pytest -q
+
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_test_dir = tempfile.mkdtemp(prefix="talent-acquisition-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_test_dir, 'test.db')}"
+os.environ["LLM_PROVIDER"] = "offline"
+os.environ["RESUME_BLOB_DIR"] = os.path.join(_test_dir, "blobs")
+os.environ["VECTOR_INDEX_DIR"] = os.path.join(_test_dir, "vectors")
+
+import pytest
+
+# Importing database migrates the test database. Do it here, the way main.py does it
+# first, because one migration step imports applicant_index, which imports database.
+import database # noqa: F401
+
+@pytest.fixture
+def db():
+    from database import SessionLocal
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+@pytest.fixture
+def job(db):
+    """A fresh job, so tests don't see each other's candidates."""
+    import crud
+    import schemas
+    return crud.create_job(db, schemas.JobCreate(
+        title="Backend Engineer", description="Builds APIs", requirements="Python, SQL", location="Remote", salary_range="-"
+    ))
@@ -0,0 +1,89 @@
+# tests/test_ai_router.py
+
+import hashlib
+import json
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+import llm_client
+import resume_text_store
+from main import app
+
+client = TestClient(app)
+
+def upload(text: str = "Python and SQL developer."):
+    return [("files", ("resume.txt", text.encode("utf-8"), "text/plain"))]
+
+@pytest.mark.parametrize("path", ["/api/ai/analyze-resumes", "/api/ai/analyze-resumes/stream"])
+@pytest.mark.parametrize("top_k", ["0", "-1"])
+def test_batch_top_k_must_be_positive(path, top_k):
+    response = client.post(path, data={"requirements": "Python", "top_k": top_k}, files=upload())
+    assert response.status_code == 422
+
+@pytest.mark.parametrize("path", ["/api/ai/prerank/{job_id}?top_k=0", "/api/ai/match/{job_id}?limit=-1"])
+def test_ranking_sizes_must_be_positive(path, job):
+    assert client.get(path.format(job_id=job.id)).status_code == 422
+
+def parsed_resumes(count: int):
+    """.docx uploads whose text is already stored under their content hash, so no parser runs."""
+    files = []
+    for index in range(count):
+        content = uuid.uuid4().bytes
+        resume_text = " ".join(
+            f"Shipped Python service {index}-{i} backed by SQL reporting tables for client team {i % 3}."
+            for i in range(15)
+        )
+        resume_text_store.save(hashlib.sha256(content).hexdigest(), resume_text)
+        files.append(("files", (f"resume{index}.docx", content, "application/octet-stream")))
+    return files
+
+def stream(stream_format: str, files, **data):
+    return client.post("/api/ai/analyze-resumes/stream", files=files,
+                       data={"requirements": "Python, SQL", "stream_format": stream_format, **data})
+
+@pytest.mark.parametrize("data", [{}, {"batched": "true"}, {"top_k": "2"}])
+def test_ndjson_stream_is_one_event_per_line(data):
+    response = stream("ndjson", parsed_resumes(3), **data)
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.text.endswith("\n")
+    events = [json.loads(line) for line in response.text.splitlines()]
+
+    assert [event["event"] for event in events] == ["result"] * 3 + ["summary"]
+    summary = events[-1]
+    assert summary["total"] == 3 and summary["failed"] == 0
+    assert sorted(r["filename"] for r in summary["ranked"]) == ["resume0.docx", "resume1.docx", "resume2.docx"]
+
+def test_sse_stream_frames_each_event():
+    response = stream("sse", parsed_resumes(3))
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.endswith("\n\n")
+    frames = [frame.split("\n") for frame in response.text[:-2].split("\n\n")]
+
+    assert [lines[0] for lines in frames] == ["event: result"] * 3 + ["event: summary"]
+    assert all(len(lines) == 2 and lines[1].startswith("data: ") for lines in frames)
+    payloads = [json.loads(lines[1][len("data: "):]) for lines in frames]
+    assert "event" not in payloads[0] # The SSE event line carries the name
+    assert all(payload["score"] is not None for payload in payloads[:3])
+    assert payloads[-1]["total"] == 3 and payloads[-1]["failed"] == 0
+
+def test_unknown_stream_format_is_rejected():
+    assert stream("xml", upload()).status_code == 400
+
+@pytest.fixture
+def unconfigured_llm():
+    llm_client.set_provider("no-such-provider")
+    yield
+    llm_client.set_provider("offline")
+
+def test_llm_stats_without_a_provider(unconfigured_llm):
+    response = client.get("/api/ai/llm/stats")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["configured"] is False and "no-such-provider" in body["error"]
+
+def test_llm_stats_of_the_configured_client():
+    body = client.get("/api/ai/llm/stats").json()
+    assert body["configured"] is True and body["provider"] == "offline"
+    assert body["breaker"] == "closed"
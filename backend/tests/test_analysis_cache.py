@@ -0,0 +1,53 @@
+# tests/test_analysis_cache.py
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+import analysis_cache
+from database import AnalysisCacheEntry, SessionLocal
+
+def stored(key: str) -> AnalysisCacheEntry:
+    with SessionLocal() as db:
+        return db.get(AnalysisCacheEntry, key)
+
+def backdate_access(key: str, seconds: float):
+    with SessionLocal() as db:
+        db.get(AnalysisCacheEntry, key).last_accessed_at = datetime.utcnow() - timedelta(seconds=seconds)
+        db.commit()
+
+@pytest.fixture
+def empty_cache():
+    analysis_cache.clear()
+    yield
+    analysis_cache.clear()
+
+def test_hits_write_the_access_time_only_when_it_is_stale(empty_cache):
+    key = uuid.uuid4().hex
+    analysis_cache.put(key, 71.0, "Good fit", "model", "v1")
+    written = stored(key).last_accessed_at
+
+    assert analysis_cache.get(key) == (71.0, "Good fit")
+    assert analysis_cache.get(key) == (71.0, "Good fit")
+    assert (stored(key).last_accessed_at, stored(key).hit_count) == (written, 0)
+
+    backdate_access(key, analysis_cache.ACCESS_WRITE_INTERVAL_SECONDS + 1)
+    analysis_cache.get(key)
+    entry = stored(key)
+    assert entry.last_accessed_at > written
+    assert entry.hit_count == 3 # The two hits held back are written with this one
+
+def test_size_is_checked_every_few_stores(empty_cache, monkeypatch):
+    monkeypatch.setattr(analysis_cache, "CACHE_MAX_ENTRIES", 2)
+    monkeypatch.setattr(analysis_cache, "EVICTION_CHECK_INTERVAL", 3)
+    monkeypatch.setattr(analysis_cache, "_stores_until_eviction_check", 4) # The fourth store checks next
+    keys = [uuid.uuid4().hex for _ in range(3)]
+    for age, key in enumerate(keys):
+        analysis_cache.put(key, 50.0, "-", "model", "v1")
+        backdate_access(key, 1000 - age) # The first key is the least recently used
+    assert analysis_cache.stats()["entries"] == 3
+
+    analysis_cache.put(uuid.uuid4().hex, 50.0, "-", "model", "v1")
+    assert analysis_cache.stats()["entries"] == 2
+    assert stored(keys[0]) is None and stored(keys[1]) is None
@@ -0,0 +1,82 @@
+# tests/test_applicant_index.py
+
+import uuid
+
+import applicant_index
+import crud
+import schemas
+
+RESUME = " ".join(
+    f"Led release {i} of the billing service: Kafka consumers, Postgres tuning and on-call runbooks for team {i % 4}."
+    for i in range(40)
+)
+OTHER_RESUME = " ".join(
+    f"Taught {i} cohorts of data visualisation with D3, Tableau and plain SVG at bootcamp site {i % 3}."
+    for i in range(40)
+)
+
+def applicant(db, job, email: str = None, phone: str = "0123456789", resume_text: str = None):
+    candidate = crud.create_candidate(db, schemas.CandidateCreate(
+        name="Applicant", email=email or f"{uuid.uuid4().hex}@example.com", phone=phone, job_id=job.id
+    ))
+    if resume_text is not None:
+        applicant_index.index_resume(db, candidate, resume_text)
+    db.commit()
+    return candidate
+
+def unique_phone() -> str:
+    return str(uuid.uuid4().int)[:10]
+
+def test_email_variants_normalize_to_one_key():
+    assert applicant_index.normalize_email("Jane.Doe+jobs@GoogleMail.com") == "janedoe@gmail.com"
+    assert applicant_index.normalize_email("jane.doe+jobs@example.com") == "jane.doe@example.com"
+    assert applicant_index.normalize_phone("+60 12-345 6789") == applicant_index.normalize_phone("012 345 6789")
+
+def test_minhash_estimates_resume_similarity():
+    original = applicant_index.minhash(RESUME)
+    assert applicant_index.similarity(original, applicant_index.minhash(RESUME)) == 1.0
+    lightly_edited = applicant_index.minhash(RESUME + " Willing to relocate.")
+    assert applicant_index.similarity(original, lightly_edited) >= applicant_index.RESUME_DUPLICATE_SIMILARITY
+    assert applicant_index.similarity(original, applicant_index.minhash(OTHER_RESUME)) < 0.1
+
+def test_signature_round_trips_through_storage():
+    signature = applicant_index.minhash(RESUME)
+    assert applicant_index.decode_signature(applicant_index.encode_signature(signature)) == signature
+
+def test_duplicate_lookup_by_identity_and_resume(db, job):
+    resume_text = RESUME.replace("billing", "ledger")
+    first = applicant(db, job, email="Sam.Lee+apply@gmail.com", phone=unique_phone(), resume_text=resume_text)
+    same_person = applicant(db, job, email="samlee@gmail.com", phone=unique_phone())
+    copied = applicant(db, job, phone=unique_phone(), resume_text=resume_text + " Willing to relocate.")
+    applicant(db, job, phone=unique_phone(), resume_text=OTHER_RESUME)
+
+    matches = {match["candidate_id"]: match for match in applicant_index.duplicates_of(db, first)}
+    assert set(matches) == {same_person.id, copied.id}
+    assert matches[same_person.id]["matched_on"] == ["email"] and matches[same_person.id]["similarity"] is None
+    assert matches[copied.id]["matched_on"] == ["resume"]
+    assert matches[copied.id]["similarity"] >= applicant_index.RESUME_DUPLICATE_SIMILARITY
+
+def test_reindexing_a_resume_replaces_its_band_keys(db, job):
+    resume_text = RESUME.replace("billing", "payroll")
+    candidate = applicant(db, job, phone=unique_phone(), resume_text=resume_text)
+    applicant_index.index_resume(db, candidate, OTHER_RESUME.replace("bootcamp", "university"))
+    db.commit()
+    matches = applicant_index.find_duplicates(db, signature=applicant_index.minhash(resume_text))
+    assert candidate.id not in [match["candidate_id"] for match in matches]
+
+def test_score_is_reused_only_for_the_same_requirements(db, job):
+    resume_text = RESUME.replace("billing", "checkout")
+    scored = applicant(db, job, phone=unique_phone(), resume_text=resume_text)
+    crud.update_candidate_ai_analysis(db, scored.id, 82.0, "Strong match", ai_status="Strong Match")
+    signature = applicant_index.minhash(resume_text)
+
+    same_requirements = crud.create_job(db, schemas.JobCreate(
+        title="Payments Engineer", description="-", requirements=" python,  SQL ", location="Remote", salary_range="-"
+    ))
+    other_requirements = crud.create_job(db, schemas.JobCreate(
+        title="Data Engineer", description="-", requirements="Spark, Airflow", location="Remote", salary_range="-"
+    ))
+    reapplied = applicant(db, same_requirements, phone=unique_phone())
+    elsewhere = applicant(db, other_requirements, phone=unique_phone())
+    assert applicant_index.reusable_analysis(db, reapplied, signature).id == scored.id
+    assert applicant_index.reusable_analysis(db, elsewhere, signature) is None
@@ -0,0 +1,93 @@
+# tests/test_blob_store.py
+
+import asyncio
+import hashlib
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+import blob_store
+import crud
+from database import ResumeBlob
+from main import app
+
+def store(db, content: bytes, age_seconds: float = 0) -> ResumeBlob:
+    sha256 = hashlib.sha256(content).hexdigest()
+    blob_store.INCOMING_DIR.mkdir(parents=True, exist_ok=True)
+    temp_path = blob_store.INCOMING_DIR / f"{uuid.uuid4().hex}.pdf"
+    temp_path.write_bytes(content)
+    blob_store.ingest_file(db, temp_path, sha256, len(content), ".pdf")
+    blob = db.get(ResumeBlob, sha256)
+    blob.created_at = datetime.utcnow() - timedelta(seconds=age_seconds)
+    db.commit()
+    return blob
+
+def test_sweep_deletes_old_unreferenced_blobs_only(db):
+    orphan = store(db, b"abandoned upload " + uuid.uuid4().bytes, age_seconds=blob_store.ORPHAN_GRACE_SECONDS + 60)
+    fresh = store(db, b"upload in progress " + uuid.uuid4().bytes)
+    orphan_sha, orphan_path, fresh_path = orphan.sha256, orphan.path, fresh.path
+
+    summary = blob_store.reconcile_ref_counts(db)
+
+    assert summary["deleted"] >= 1
+    assert db.get(ResumeBlob, orphan_sha) is None
+    assert not os.path.exists(orphan_path)
+    assert db.get(ResumeBlob, fresh.sha256) is not None
+    assert os.path.exists(fresh_path)
+
+def test_sweep_keeps_referenced_blobs_and_recounts(db, job):
+    import crud
+    import schemas
+    blob = store(db, b"resume in use " + uuid.uuid4().bytes, age_seconds=blob_store.ORPHAN_GRACE_SECONDS + 60)
+    crud.create_candidate(
+        db, schemas.CandidateCreate(name="A", email=f"{uuid.uuid4().hex}@example.com", phone="0123456789", job_id=job.id),
+        resume_path=blob.path, resume_hash=blob.sha256, ai_status="Pending", resume_filename="a.pdf"
+    )
+    blob.ref_count = 5 # Drifted
+    db.commit()
+
+    blob_store.reconcile_ref_counts(db)
+
+    db.refresh(blob)
+    assert blob.ref_count == 1
+    assert os.path.exists(blob.path)
+
+def test_reuploading_an_orphan_restarts_its_grace_period(db):
+    content = b"uploaded again " + uuid.uuid4().bytes
+    blob = store(db, content, age_seconds=blob_store.ORPHAN_GRACE_SECONDS + 60)
+    # Same bytes uploaded again; its candidate row doesn't exist yet
+    temp_path = blob_store.INCOMING_DIR / f"{uuid.uuid4().hex}.pdf"
+    temp_path.write_bytes(content)
+    blob_store.ingest_file(db, temp_path, blob.sha256, len(content), ".pdf")
+
+    blob_store.reconcile_ref_counts(db)
+
+    assert db.get(ResumeBlob, blob.sha256) is not None
+    assert os.path.exists(blob.path)
+
+def test_applications_do_blocking_work_off_the_event_loop(db, job, monkeypatch):
+    on_loop = []
+    def watched(function):
+        def call(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(function.__name__)
+            except RuntimeError:
+                pass # A worker thread, as expected
+            return function(*args, **kwargs)
+        return call
+    monkeypatch.setattr(blob_store, "ingest_file", watched(blob_store.ingest_file))
+    monkeypatch.setattr(crud, "create_candidate", watched(crud.create_candidate))
+
+    content = b"%PDF-1.4 resume " + uuid.uuid4().bytes
+    for email in ("first@example.com", "second@example.com"):
+        response = TestClient(app).post(
+            f"/api/candidates/apply/{job.id}", data={"name": "A", "email": email, "phone": "0123456789"},
+            files={"resume": ("resume.pdf", content, "application/pdf")}
+        )
+        assert response.status_code == 200
+    assert on_loop == []
+    db.expire_all()
+    assert db.get(ResumeBlob, hashlib.sha256(content).hexdigest()).ref_count == 2
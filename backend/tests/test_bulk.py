@@ -0,0 +1,56 @@
+# tests/test_bulk.py
+
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+import crud
+import job_counters
+import schemas
+from database import Candidate, engine
+
+@pytest.fixture
+def rejecting_trigger():
+    """Makes the database reject status updates to 'boom', like a constraint would."""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TRIGGER reject_boom BEFORE UPDATE OF status ON candidates WHEN NEW.status = 'boom' "
+            "BEGIN SELECT RAISE(ABORT, 'status rejected'); END"
+        ))
+    yield
+    with engine.begin() as conn:
+        conn.execute(text("DROP TRIGGER reject_boom"))
+
+def import_candidates(db, job, count: int):
+    results = crud.bulk_create_candidates(db, [
+        schemas.CandidateCreate(name=f"C{i}", email=f"{uuid.uuid4().hex}@example.com", phone="0123456789", job_id=job.id)
+        for i in range(count)
+    ])
+    assert [r["outcome"] for r in results] == ["created"] * count
+    return [r["candidate_id"] for r in results]
+
+def test_bulk_create_and_status_update(db, job):
+    ids = import_candidates(db, job, 3)
+    results = crud.bulk_update_candidate_status(db, [
+        schemas.CandidateStatusUpdate(candidate_id=ids[0], status="rejected"),
+        schemas.CandidateStatusUpdate(candidate_id="missing", status="rejected"),
+    ])
+    assert [r["outcome"] for r in results] == ["updated", "not_found"]
+    assert job_counters.get_counts(db, job.id)["status"] == {"new": 2, "rejected": 1}
+
+def test_failed_batch_is_retried_row_by_row(db, job, rejecting_trigger):
+    ids = import_candidates(db, job, 3)
+    results = crud.bulk_update_candidate_status(db, [
+        schemas.CandidateStatusUpdate(candidate_id=ids[0], status="rejected"),
+        schemas.CandidateStatusUpdate(candidate_id=ids[1], status="boom"),
+        schemas.CandidateStatusUpdate(candidate_id=ids[2], status="rejected"),
+    ])
+
+    assert [r["outcome"] for r in results] == ["updated", "error", "updated"]
+    assert "status rejected" in results[1]["detail"]
+    statuses = dict(db.query(Candidate.id, Candidate.status).filter(Candidate.id.in_(ids)))
+    assert statuses == {ids[0]: "rejected", ids[1]: "new", ids[2]: "rejected"}
+    # Counters only moved for the rows that were written
+    assert job_counters.get_counts(db, job.id)["status"] == {"new": 1, "rejected": 2}
+    assert job_counters.reconcile_counts(db, job.id) == 0
@@ -0,0 +1,70 @@
+# tests/test_candidate_pages.py
+
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+import crud
+import schemas
+from main import app
+
+client = TestClient(app)
+
+SCORES = [90.0, 80.0, None, 80.0, 70.0, None, 80.0]
+
+@pytest.fixture
+def scored_candidates(db, job):
+    """Candidates with tied and missing scores, in the order a page walk must return them."""
+    created = []
+    for score in SCORES:
+        candidate = crud.create_candidate(db, schemas.CandidateCreate(
+            name="A", email=f"{uuid.uuid4().hex}@example.com", phone="0123456789", job_id=job.id
+        ), ai_status="Pending")
+        if score is not None:
+            crud.update_candidate_ai_analysis(db, candidate.id, score, "Long analysis text", ai_status="Potential Fit")
+        created.append((score, candidate.id))
+    # Best score first, ties by id descending, unscored last
+    return [candidate_id for _, candidate_id in sorted(
+        created, key=lambda row: (row[0] is not None, row[0] or 0, row[1]), reverse=True
+    )]
+
+def walk(path: str, limit: int, **params):
+    ids, cursor, pages = [], None, 0
+    while True:
+        query = {"limit": limit, **params, **({"cursor": cursor} if cursor else {})}
+        body = client.get(path, params=query).json()
+        page = body["candidates"] if "candidates" in body else body
+        ids += [item["id"] for item in page["items"]]
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids, pages
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7])
+def test_score_pages_cross_ties_and_unscored_rows(job, scored_candidates, limit):
+    ids, pages = walk(f"/api/candidates/job/{job.id}/page", limit)
+    assert ids == scored_candidates
+    assert pages == -(-len(SCORES) // limit)
+
+def test_created_at_pages_return_every_candidate_once(job, scored_candidates):
+    ids, _ = walk(f"/api/candidates/job/{job.id}/page", 2, sort="created_at")
+    assert sorted(ids) == sorted(scored_candidates)
+    assert len(ids) == len(set(ids))
+
+def test_score_range_leaves_out_unscored_rows(job, scored_candidates):
+    ids, _ = walk(f"/api/candidates/job/{job.id}/page", 2, min_score=75)
+    assert ids == scored_candidates[:4]
+
+@pytest.mark.parametrize("path", ["/api/candidates/job/{job_id}/page", "/api/dashboard/job/{job_id}/candidates"])
+def test_each_view_has_its_own_fields(job, scored_candidates, path):
+    def first_item(**params):
+        body = client.get(path.format(job_id=job.id), params={"limit": 1, **params}).json()
+        return (body["candidates"] if "candidates" in body else body)["items"][0]
+    assert "ai_analysis" not in first_item()
+    assert first_item(include_analysis=True)["ai_analysis"] == "Long analysis text"
+
+def test_cursor_for_another_sort_is_rejected(job, scored_candidates):
+    cursor = client.get(f"/api/candidates/job/{job.id}/page", params={"limit": 1}).json()["next_cursor"]
+    response = client.get(f"/api/candidates/job/{job.id}/page", params={"sort": "created_at", "cursor": cursor})
+    assert response.status_code == 400
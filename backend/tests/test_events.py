@@ -0,0 +1,48 @@
+# tests/test_events.py
+
+import threading
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+import crud
+import events
+import schemas
+from main import app
+
+client = TestClient(app)
+
+def test_publish_counts_are_exact_across_threads():
+    before = events.stats()["published"]
+
+    def publish_many():
+        for _ in range(2000):
+            events.publish("no-subscribers", {"type": "ping"})
+
+    threads = [threading.Thread(target=publish_many) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert events.stats()["published"] - before == 8 * 2000
+
+def test_websocket_rejects_unknown_job():
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect("/api/dashboard/ws/nope") as websocket:
+            websocket.receive_json()
+    assert closed.value.code == 4404
+
+def test_websocket_receives_committed_events(db, job):
+    with client.websocket_connect(f"/api/dashboard/ws/{job.id}") as websocket:
+        assert websocket.receive_json() == {"type": "subscribed", "job_id": job.id}
+        crud.bulk_create_candidates(db, [schemas.CandidateCreate(
+            name="A", email=f"{uuid.uuid4().hex}@example.com", phone="0123456789", job_id=job.id
+        )])
+        received = [websocket.receive_json() for _ in range(2)]
+    assert {event["type"] for event in received} == {"candidates_imported", "counters"}
+    assert events.stats()["subscribers"] == 0
+
+def test_event_stream_rejects_unknown_job():
+    assert client.get("/api/dashboard/events/nope").status_code == 404
@@ -0,0 +1,97 @@
+# tests/test_interview.py
+
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+import crud
+import schemas
+from main import app
+
+client = TestClient(app)
+
+def interviewed_candidate(db, job):
+    return crud.create_candidate(
+        db, schemas.CandidateCreate(name="A", email=f"{uuid.uuid4().hex}@example.com", phone="0123456789", job_id=job.id),
+        resume_path=None, resume_hash=None, ai_status="Top Fit", resume_filename=None
+    )
+
+def submit(candidate_id, texts):
+    return client.post(f"/api/interview/{candidate_id}", json=[
+        {"question_number": number, "answer_text": text} for number, text in enumerate(texts, start=1)
+    ])
+
+def test_submission_is_analyzed_and_rolled_up(db, job):
+    candidate = interviewed_candidate(db, job)
+    response = submit(candidate.id, ["I built a Python API.", "I tuned SQL queries.", "I like the team."])
+    assert response.status_code == 200
+    body = response.json()
+    assert body["answer_count"] == 3
+    assert len(body["answers"]) == 3
+    assert body["overall_score"] is not None
+    assert client.get(f"/api/interview/{candidate.id}/score").json()["answer_count"] == 3
+
+def test_resubmission_replaces_the_earlier_interview(db, job):
+    candidate = interviewed_candidate(db, job)
+    submit(candidate.id, ["First answer one.", "First answer two.", "First answer three."])
+    response = submit(candidate.id, ["Second answer one.", "Second answer two."])
+
+    assert response.status_code == 200
+    assert response.json()["answer_count"] == 2
+    score = client.get(f"/api/interview/{candidate.id}/score").json()
+    assert score["answer_count"] == 2
+    assert [a["answer"] for a in score["answers"]] == ["Second answer one.", "Second answer two."]
+    assert score["overall_score"] == response.json()["overall_score"]
+
+def test_submission_errors(db, job):
+    assert submit("missing", ["An answer."]).status_code == 404
+    assert client.post(f"/api/interview/{interviewed_candidate(db, job).id}", json=[]).status_code == 400
+
+def ranking(job, **params):
+    return client.get(f"/api/dashboard/job/{job.id}/interviews", params=params)
+
+def walk_ranking(job, limit: int, **params):
+    items, cursor = [], None
+    while True:
+        body = ranking(job, limit=limit, **params, **({"cursor": cursor} if cursor else {})).json()
+        items += body["items"]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return items
+
+def test_interview_ranking_pages_best_first(db, job):
+    answers = [
+        ["I built a Python API serving millions of requests.", "I tuned SQL indexes for reporting.", "I mentor juniors."],
+        ["Not sure.", "No.", "Maybe."],
+        ["I wrote SQL migrations.", "I like Python.", "I enjoy teamwork."],
+    ]
+    interviewed = []
+    for texts in answers:
+        candidate = interviewed_candidate(db, job)
+        assert submit(candidate.id, texts).status_code == 200
+        interviewed.append(candidate.id)
+    interviewed_candidate(db, job) # Not interviewed yet: not ranked
+
+    items = walk_ranking(job, limit=1)
+    assert sorted(item["candidate_id"] for item in items) == sorted(interviewed)
+    assert ranking(job, limit=10).json()["items"] == items
+    scores = [item["overall_score"] for item in items]
+    assert scores == sorted(scores, reverse=True)
+    # Percentile is the share of the other interviewees scoring strictly lower
+    for item in items:
+        lower = sum(1 for score in scores if score < item["overall_score"])
+        assert item["percentile"] == pytest.approx(100 * lower / (len(scores) - 1))
+    assert "answers" not in items[0] and "ai_analysis" not in items[0]
+
+def test_interview_ranking_sorts_by_a_dimension(db, job):
+    for texts in (["Python APIs.", "SQL tuning.", "Team lead."], ["Hmm.", "No idea.", "Pass."]):
+        submit(interviewed_candidate(db, job).id, texts)
+    items = walk_ranking(job, limit=1, sort="relevance_score")
+    scores = [item["relevance_score"] for item in items]
+    assert len(items) == 2 and scores == sorted(scores, reverse=True)
+
+def test_interview_ranking_rejects_bad_requests(job):
+    assert ranking(job, sort="ai_analysis").status_code == 400
+    assert ranking(job, cursor="not-a-cursor").status_code == 400
+    assert client.get("/api/dashboard/job/missing-job/interviews").status_code == 404
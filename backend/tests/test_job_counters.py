@@ -0,0 +1,66 @@
+# tests/test_job_counters.py
+
+import uuid
+
+from sqlalchemy import update
+
+import crud
+import job_counters
+import schemas
+
+def applicant(db, job):
+    return crud.create_candidate(db, schemas.CandidateCreate(
+        name="A", email=f"{uuid.uuid4().hex}@example.com", phone="0123456789", job_id=job.id
+    ), ai_status="Pending")
+
+def matches_candidates_table(db, job) -> bool:
+    stored = {(job.id, kind, bucket): count
+              for kind, buckets in job_counters.get_counts(db, job.id).items()
+              for bucket, count in buckets.items() if count}
+    return stored == job_counters.compute_counts(db, job.id)
+
+def test_new_candidates_are_counted_in_every_bucket(db, job):
+    applicant(db, job)
+    applicant(db, job)
+    counts = job_counters.get_counts(db, job.id)
+    assert counts["total"] == {"": 2}
+    assert counts["status"] == {"new": 2}
+    assert counts["ai_status"] == {"Pending": 2}
+    assert counts["interview_stage"] == {"Applied": 2}
+
+def test_changes_move_a_candidate_between_buckets(db, job):
+    first, second = applicant(db, job), applicant(db, job)
+    crud.update_candidate_status(db, first.id, "screening")
+    crud.update_candidate_status(db, first.id, "screening") # Unchanged: no counter writes
+    crud.update_candidate_ai_analysis(db, second.id, 88.0, "Strong", ai_status="Top Fit")
+    crud.update_candidate_interview_stage(db, second.id, "Interview Sent")
+
+    counts = job_counters.get_counts(db, job.id)
+    assert counts["status"] == {"new": 1, "screening": 1}
+    assert counts["ai_status"] == {"Pending": 1, "Top Fit": 1}
+    assert counts["interview_stage"] == {"Applied": 1, "Interview Sent": 1}
+    assert crud.get_dashboard_stats(db, job.id)["top_fit_count"] == 1
+    assert matches_candidates_table(db, job)
+
+def test_bulk_updates_apply_the_aggregated_deltas(db, job):
+    candidates = [applicant(db, job) for _ in range(4)]
+    crud.bulk_update_candidate_status(db, [
+        schemas.CandidateStatusUpdate(candidate_id=c.id, status="rejected") for c in candidates[:3]
+    ] + [schemas.CandidateStatusUpdate(candidate_id=candidates[3].id, status="new")])
+
+    assert job_counters.get_counts(db, job.id)["status"] == {"new": 1, "rejected": 3}
+    assert matches_candidates_table(db, job)
+
+def test_reconcile_repairs_drift_and_then_finds_none(db, job):
+    applicant(db, job)
+    applicant(db, job)
+    counters = job_counters.counters
+    db.execute(update(counters).where(counters.c.job_id == job.id, counters.c.kind == "status").values(count=7))
+    job_counters.bump(db, job.id, "ai_status", "Top Fit", 3) # A bucket no candidate is in
+    db.commit()
+
+    assert job_counters.reconcile_counts(db, job.id) == 2
+    db.commit()
+    assert job_counters.get_counts(db, job.id)["status"] == {"new": 2}
+    assert matches_candidates_table(db, job)
+    assert job_counters.reconcile_counts(db, job.id) == 0
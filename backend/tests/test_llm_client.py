@@ -0,0 +1,57 @@
+# tests/test_llm_client.py
+
+import asyncio
+import time
+
+import pytest
+
+import llm_client
+
+class SlowTransport:
+    name = "slow"
+
+    def __init__(self, delay: float, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+
+    async def generate(self, prompt: str) -> str:
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("provider down")
+        return "ok"
+
+def half_open_client() -> llm_client.LLMClient:
+    """A client whose breaker has opened and is now letting one trial call through."""
+    breaker = llm_client.CircuitBreaker(threshold=1, reset_seconds=0.05)
+    client = llm_client.LLMClient(SlowTransport(0, fail=True), max_retries=0, breaker=breaker)
+    with pytest.raises(llm_client.LLMError):
+        client.generate_sync("prompt")
+    time.sleep(0.06)
+    assert breaker.state == "half-open"
+    return client
+
+def test_breaker_opens_and_closes_after_successful_trial():
+    client = half_open_client()
+    client.transport = SlowTransport(0)
+    assert client.generate_sync("prompt") == "ok"
+    assert client.breaker.state == "closed"
+
+def test_cancelled_half_open_trial_releases_the_breaker():
+    client = half_open_client()
+    client.transport = SlowTransport(5)
+
+    async def disconnect_early():
+        await asyncio.wait_for(client.generate("prompt"), timeout=0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(disconnect_early())
+    # The cancellation reaches the client's loop asynchronously
+    for _ in range(100):
+        if not client.breaker.trial_in_flight:
+            break
+        time.sleep(0.01)
+    assert not client.breaker.trial_in_flight
+
+    client.transport = SlowTransport(0)
+    assert client.generate_sync("prompt") == "ok"
+    assert client.breaker.state == "closed"
@@ -0,0 +1,45 @@
+# tests/test_parse_worker.py
+
+import threading
+import time
+
+import pytest
+
+import parse_worker
+
+def nap(seconds: str) -> str:
+    # Runs in the pool; the "path" is the time to sleep
+    time.sleep(float(seconds))
+    return f"slept {seconds}"
+
+@pytest.fixture
+def one_worker(monkeypatch):
+    parse_worker.shutdown()
+    monkeypatch.setattr(parse_worker, "PARSE_WORKERS", 1)
+    monkeypatch.setattr(parse_worker, "_slots", threading.BoundedSemaphore(1))
+    yield
+    parse_worker.shutdown()
+
+def test_time_waiting_for_a_worker_does_not_count(one_worker):
+    # Three 0.6s parses on one worker take ~1.8s, but each stays within its 1.5s limit
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(parse_worker._run_in_pool(nap, "0.6", 1.5)))
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["slept 0.6"] * 3
+
+def test_overrunning_parse_times_out_without_killing_the_pool(one_worker):
+    pool = parse_worker._get_pool()
+    started = time.monotonic()
+    with pytest.raises(parse_worker.ParseTimeout):
+        parse_worker._run_in_pool(nap, "10", 0.5)
+    assert time.monotonic() - started < 5
+    # The worker interrupted itself: same pool, still usable
+    assert parse_worker._get_pool() is pool
+    assert parse_worker._run_in_pool(nap, "0", 1) == "slept 0"
+
+def test_unsupported_format():
+    assert parse_worker.parse_resume("resume.txt") == "Unsupported file format"
@@ -0,0 +1,50 @@
+# tests/test_query_plans.py
+
+import pytest
+from sqlalchemy.orm import Session
+
+import migrations
+from database import Base, make_engine
+
+# The index (name prefix) each hot query should be served by; any job_id-leading
+# candidate index serves a plain job_id filter
+EXPECTED_INDEXES = {
+    "candidates for job": "ix_candidates_job_id_",
+    "candidate counts by status": "ix_candidates_job_id_status",
+    "candidates ranked by score": "ix_candidates_job_id_ai_score_id",
+    "candidates page by score": "ix_candidates_job_id_ai_score_id",
+    "candidates page by date": "ix_candidates_job_id_created_at_id",
+    "interview answers for candidate": "ix_interview_answers_candidate_id_created_at",
+}
+
+@pytest.fixture(scope="module")
+def migrated_engine():
+    engine = make_engine("sqlite://", pragmas={})
+    Base.metadata.create_all(bind=engine)
+    migrations.upgrade(engine, Base.metadata)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture(scope="module")
+def plans(migrated_engine):
+    with Session(bind=migrated_engine) as db:
+        return {label: (plan, ok) for label, plan, ok in migrations.query_plans(migrated_engine, db)}
+
+def test_every_migration_is_recorded(migrated_engine):
+    assert migrations.applied_versions(migrated_engine) == {version for version, _, _ in migrations.MIGRATIONS}
+
+def test_every_hot_query_is_checked(plans):
+    assert set(plans) == set(EXPECTED_INDEXES)
+
+@pytest.mark.parametrize("label", sorted(EXPECTED_INDEXES))
+def test_hot_query_uses_its_index(plans, label):
+    plan, ok = plans[label]
+    assert ok, f"{label} is not served by an index: {plan}"
+    assert any(EXPECTED_INDEXES[label] in step for step in plan), plan
+
+def test_unknown_names_in_a_migration_step_are_errors(migrated_engine):
+    with migrated_engine.begin() as conn:
+        with pytest.raises(ValueError):
+            migrations.create_indexes(conn, Base.metadata, ["ix_candidates_typo"])
+        with pytest.raises(ValueError):
+            migrations.add_columns(conn, Base.metadata, "candidates", ["typo"])
@@ -0,0 +1,38 @@
+# tests/test_response_cache.py
+
+import pytest
+from fastapi.testclient import TestClient
+
+import response_cache
+from main import app
+
+# Not used as a context manager: the scoring workers aren't started
+client = TestClient(app)
+
+GET_ROUTES = ["/api/jobs/{}", "/api/dashboard/job/{}", "/api/dashboard/stats/{}"]
+
+@pytest.mark.parametrize("route", GET_ROUTES)
+def test_unknown_job_is_404_even_when_conditional(route):
+    assert client.get(route.format("nope")).status_code == 404
+    assert client.get(route.format("nope"), headers={"If-None-Match": "*"}).status_code == 404
+
+def test_unknown_job_is_404_with_a_version_zero_etag():
+    version_zero = response_cache.make_etag("dashboard:nope", 0)
+    assert client.get("/api/dashboard/job/nope", headers={"If-None-Match": version_zero}).status_code == 404
+
+@pytest.mark.parametrize("route", GET_ROUTES)
+def test_etag_revalidation(route, job):
+    url = route.format(job.id)
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(url, headers={"If-None-Match": "*"}).status_code == 304
+    assert client.get(url, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+    # Any write to the job changes the ETag
+    assert client.put(f"/api/jobs/{job.id}", json={"location": "Office"}).status_code == 200
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
@@ -0,0 +1,54 @@
+# tests/test_screening.py
+
+import uuid
+
+import applicant_index
+import crud
+import schemas
+import screening
+
+RESUME = " ".join(
+    f"Worked on project {i} building Python services, SQL reporting and data pipelines for team {i % 7}."
+    for i in range(40)
+)
+
+def applicant(db, job, email: str, resume_text: str):
+    candidate = crud.create_candidate(
+        db, schemas.CandidateCreate(name="A", email=email, phone=str(uuid.uuid4().int)[:10], job_id=job.id),
+        resume_path=None, resume_hash=None, ai_status="Pending", resume_filename=None
+    )
+    applicant_index.index_resume(db, candidate, resume_text)
+    db.commit()
+    return candidate
+
+def screen(db, job, candidate, resume_text: str) -> screening.ScreeningResult:
+    return screening.screen(
+        resume_text, job.requirements, db=db, job_id=job.id, candidate_id=candidate.id,
+        email=candidate.email, signature=applicant_index.minhash(resume_text)
+    )
+
+def test_copied_resume_from_another_applicant_is_flagged(db, job):
+    original = applicant(db, job, f"{uuid.uuid4().hex}@example.com", RESUME)
+    copy = applicant(db, job, f"{uuid.uuid4().hex}@example.com", RESUME + " Available immediately.")
+    result = screen(db, job, copy, RESUME + " Available immediately.")
+    assert result.flagged
+    assert original.id in result.reasons[0]
+
+def test_same_applicant_reapplying_is_not_flagged(db, job):
+    name = uuid.uuid4().hex
+    applicant(db, job, f"{name}@gmail.com", RESUME)
+    again = applicant(db, job, f"{name}+jobs@gmail.com", RESUME)
+    assert not screen(db, job, again, RESUME).flagged
+
+def test_copy_submitted_to_another_job_is_not_flagged(db, job):
+    other_job = crud.create_job(db, schemas.JobCreate(
+        title="Data Engineer", description="Pipelines", requirements="Python", location="Remote", salary_range="-"
+    ))
+    resume_text = RESUME.replace("Python", "Go") # Not submitted by the other tests' applicants
+    applicant(db, other_job, f"{uuid.uuid4().hex}@example.com", resume_text)
+    candidate = applicant(db, job, f"{uuid.uuid4().hex}@example.com", resume_text)
+    assert not screen(db, job, candidate, resume_text).flagged
+
+def test_unrelated_resumes_are_not_flagged(db, job):
+    candidate = applicant(db, job, f"{uuid.uuid4().hex}@example.com", "Chef. " + "Cooked pasta, baked bread. " * 30)
+    assert not screen(db, job, candidate, "Nurse with ten years of ward experience, triage and patient care. " * 5).flagged
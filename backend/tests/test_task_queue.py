@@ -0,0 +1,154 @@
+# tests/test_task_queue.py
+
+import hashlib
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+import ai_processing
+import crud
+import resume_text_store
+import schemas
+import task_queue
+from database import Candidate, ScoringTask, SessionLocal
+
+def running_task(db, locked_minutes_ago: float) -> ScoringTask:
+    """A task claimed by a worker that is gone (its candidate doesn't exist, so scoring it is a no-op)."""
+    task = ScoringTask(candidate_id="missing-candidate", status="running", attempts=1,
+                       locked_at=datetime.utcnow() - timedelta(minutes=locked_minutes_ago))
+    db.add(task)
+    db.commit()
+    return task
+
+@pytest.fixture
+def stopped_workers():
+    yield
+    task_queue.stop_workers()
+
+def test_requeue_stale_only_takes_expired_leases(db):
+    expired = running_task(db, locked_minutes_ago=20)
+    recent = running_task(db, locked_minutes_ago=1)
+    task_queue.requeue_stale(db)
+    db.refresh(expired)
+    db.refresh(recent)
+    assert expired.status == "pending" and expired.locked_at is None
+    assert recent.status == "running"
+
+def test_single_process_startup_requeues_every_running_task(db, monkeypatch, stopped_workers):
+    # Crashed and restarted well within the lease
+    task = running_task(db, locked_minutes_ago=1)
+    monkeypatch.setattr(task_queue, "SCORING_SINGLE_PROCESS", True)
+    task_queue.start_workers(count=0)
+    db.refresh(task)
+    assert task.status == "pending"
+
+def test_shared_queue_startup_keeps_unexpired_leases(db, monkeypatch, stopped_workers):
+    # Another process may still be working on it
+    task = running_task(db, locked_minutes_ago=1)
+    monkeypatch.setattr(task_queue, "SCORING_SINGLE_PROCESS", False)
+    task_queue.start_workers(count=0)
+    db.refresh(task)
+    assert task.status == "running"
+    db.delete(task)
+    db.commit()
+
+def test_running_workers_reclaim_leases_that_expire_later(db, monkeypatch, stopped_workers):
+    monkeypatch.setattr(task_queue, "SCORING_SINGLE_PROCESS", False)
+    monkeypatch.setattr(task_queue, "REQUEUE_INTERVAL_SECONDS", 0.05)
+    monkeypatch.setattr(task_queue, "POLL_INTERVAL_SECONDS", 0.05)
+    task_queue.start_workers(count=1)
+    # A process that crashed after this one started
+    task = running_task(db, locked_minutes_ago=20)
+    for _ in range(100):
+        db.refresh(task)
+        if task.status == "done":
+            break
+        time.sleep(0.05)
+    assert task.status == "done"
+
+# --- Scoring ---
+
+RESUME = " ".join(
+    f"Delivered project {i}: Kubernetes migration, Terraform modules and on-call tooling for squad {i % 5}."
+    for i in range(40)
+)
+
+def applicant_with_resume(db, job, resume_text: str, email: str = None) -> Candidate:
+    """A candidate whose resume text is already stored, so scoring doesn't need a parser."""
+    content = uuid.uuid4().bytes # Each applicant's file differs; the extracted text is what matters
+    resume_hash = hashlib.sha256(content).hexdigest()
+    path = os.path.join(os.environ["RESUME_BLOB_DIR"], f"{resume_hash}.docx")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+    resume_text_store.save(resume_hash, resume_text)
+    return crud.create_candidate(
+        db, schemas.CandidateCreate(name="A", email=email or f"{uuid.uuid4().hex}@example.com", phone="0123456789", job_id=job.id),
+        resume_path=path, resume_hash=resume_hash, ai_status="Pending", resume_filename="resume.docx"
+    )
+
+def status(db, candidate: Candidate) -> str:
+    db.expire_all()
+    return db.get(Candidate, candidate.id).ai_status
+
+def test_copy_scored_before_the_original_was_indexed_is_flagged_later(db, job):
+    resume_text = RESUME.replace("Kubernetes", "Nomad")
+    original = applicant_with_resume(db, job, resume_text)
+    copy = applicant_with_resume(db, job, resume_text + " Available immediately.")
+    # The copy's worker runs first, before the original is in the index
+    task_queue.score_candidate(db, copy.id)
+    assert status(db, copy) != "Flagged"
+
+    task_queue.score_candidate(db, original.id)
+    assert status(db, original) != "Flagged"
+    assert status(db, copy) == "Flagged"
+
+def test_copy_is_rechecked_after_the_llm_call(db, job, monkeypatch):
+    resume_text = RESUME.replace("Kubernetes", "Mesos")
+    original = applicant_with_resume(db, job, resume_text)
+    copy = applicant_with_resume(db, job, resume_text + " Available immediately.")
+    analyze_resume = ai_processing.analyze_resume
+
+    def original_indexed_meanwhile(*args):
+        # While the copy waits on the LLM, another worker scores the original
+        monkeypatch.setattr(ai_processing, "analyze_resume", analyze_resume)
+        with SessionLocal() as other:
+            task_queue.score_candidate(other, original.id)
+        return analyze_resume(*args)
+
+    monkeypatch.setattr(ai_processing, "analyze_resume", original_indexed_meanwhile)
+    task_queue.score_candidate(db, copy.id)
+    assert status(db, copy) == "Flagged"
+    assert status(db, original) != "Flagged"
+
+def test_original_reapplying_after_a_copy_is_not_flagged(db, job):
+    resume_text = RESUME.replace("Kubernetes", "Swarm")
+    original = applicant_with_resume(db, job, resume_text)
+    copy = applicant_with_resume(db, job, resume_text)
+    task_queue.score_candidate(db, original.id)
+    task_queue.score_candidate(db, copy.id)
+    again = applicant_with_resume(db, job, resume_text, email=original.email.upper())
+    task_queue.score_candidate(db, again.id)
+    assert status(db, copy) == "Flagged"
+    assert status(db, again) != "Flagged"
+
+def test_reused_score_is_still_indexed_for_pre_ranking(db, job):
+    import semantic_index
+    resume_text = RESUME.replace("Kubernetes", "OpenShift")
+    first = applicant_with_resume(db, job, resume_text)
+    task_queue.score_candidate(db, first.id)
+    # The same person applies to another opening with the same requirements
+    other_job = crud.create_job(db, schemas.JobCreate(
+        title="Platform Engineer", description="Runs clusters", requirements=job.requirements, location="Remote", salary_range="-"
+    ))
+    again = applicant_with_resume(db, other_job, resume_text, email=first.email)
+    task_queue.score_candidate(db, again.id)
+
+    db.expire_all()
+    reused, scored = db.get(Candidate, again.id), db.get(Candidate, first.id)
+    assert (reused.ai_score, reused.ai_analysis) == (scored.ai_score, scored.ai_analysis)
+    hits = semantic_index.JobVectorIndex(other_job.id).search(resume_text, k=5)
+    assert [hit["candidate_id"] for hit in hits] == [again.id]
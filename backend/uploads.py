@@ -0,0 +1,61 @@
+# uploads.py
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import NamedTuple
+
+from fastapi import HTTPException, UploadFile
+
+UPLOAD_CHUNK_SIZE = 256 * 1024
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_RESUME_UPLOAD_MB", "10")) * 1024 * 1024
+
+class StoredUpload(NamedTuple):
+    path: Path
+    sha256: str
+    size: int
+
+def safe_filename(filename: str) -> str:
+    """Strips any directory part a client may send in the upload filename."""
+    name = os.path.basename((filename or "").replace("\\", "/"))
+    if name in ("", ".", ".."):
+        raise HTTPException(status_code=400, detail="Invalid upload filename")
+    return name
+
+async def save_upload(upload: UploadFile, dest_dir: Path, filename: str = None,
+                      max_bytes: int = MAX_UPLOAD_BYTES) -> StoredUpload:
+    """
+    Streams an upload to disk in fixed-size chunks instead of reading it into memory.
+    The content is hashed while it is written, the size limit is enforced as soon
+    as it is exceeded, and the file only appears under its final name (atomic rename)
+    once it is complete.
+    """
+    final_path = dest_dir / safe_filename(filename or upload.filename)
+
+    # Reject early when the client declared the size up front
+    if upload.size is not None and upload.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"File exceeds the {max_bytes // (1024 * 1024)} MB upload limit")
+
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=dest_dir, prefix=".upload-", suffix=".part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(status_code=413, detail=f"File exceeds the {max_bytes // (1024 * 1024)} MB upload limit")
+                digest.update(chunk)
+                f.write(chunk)
+        os.replace(temp_path, final_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return StoredUpload(final_path, digest.hexdigest(), size)
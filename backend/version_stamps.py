@@ -0,0 +1,32 @@
+# version_stamps.py
+#
+# Monotonic version numbers per scope, bumped by crud.py in the same transaction
+# as the write. Read endpoints derive their ETags from them, so checking whether
+# a client's copy is still current is a single primary-key lookup.
+
+from typing import Iterable
+
+from sqlalchemy import select
+
+from database import VersionStamp, upsert_increment
+
+stamps = VersionStamp.__table__
+
+JOBS_SCOPE = "jobs" # The job list
+
+def job_scope(job_id: str) -> str:
+    """A job, its candidates and its stats."""
+    return f"job:{job_id}"
+
+def bump(db, scope: str):
+    """Not committed: part of the caller's transaction."""
+    upsert_increment(db, stamps, {"scope": scope}, "version", 1)
+
+def bump_jobs(db, job_ids: Iterable[str]):
+    for job_id in set(job_ids):
+        bump(db, job_scope(job_id))
+
+def current(db, scope: str) -> int:
+    """Current version of a scope (0 if it was never written)."""
+    version = db.execute(select(stamps.c.version).where(stamps.c.scope == scope)).scalar()
+    return version or 0
@@ -27,6 +27,11 @@ export const getJob = (jobId) => {
   return api.get(`/jobs/${jobId}`);
 };
 
+export const updateJob = (jobId, changes) => {
+  // changes: any of { title, description, requirements, location, salary_range, status }
+  return api.put(`/jobs/${jobId}`, changes);
+};
+
 // --- Candidate Endpoints ---
 
 export const applyForJob = (jobId, formData) => {
@@ -49,6 +54,11 @@ export const sendInterviewLink = (candidateId) => {
 
 // --- Interview Endpoints ---
 
+export const getInterviewQuestions = (candidateId) => {
+  // { version, source, questions: [{ number, text, weight }] }
+  return api.get(`/interview/${candidateId}/questions`);
+};
+
 export const submitInterviewAnswers = (candidateId, answers) => {
   // answers: Array of { question_number, answer_text, answer_video_url }
   return api.post(`/interview/${candidateId}`, answers);